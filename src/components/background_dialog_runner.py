@@ -1,9 +1,11 @@
 import threading
-import time
 from typing import Callable, Optional, Any
 
 import flet as ft
 
+from services.background_service import TaskPriority, TaskPolicy
+from services.task_future import TaskFuture
+
 
 class BackgroundDialogRunner:
     """
@@ -11,6 +13,13 @@ class BackgroundDialogRunner:
 
     Ожидаемая сигнатура пользовательской задачи:
         task_func(progress: Callable[[float, Optional[str]], None], stop_event: threading.Event) -> Any
+
+    При process=True задача выполняется в пуле процессов BackgroundService: task_func и task_args
+    должны сериализоваться pickle, прогресс и отмена передаются между процессами.
+
+    run_pipeline показывает один диалог для многошаговой задачи (BackgroundService.pipeline):
+    прогресс шагов объединяется с весами, отмена останавливает все шаги.
+    run_jobs выполняет задания очереди заданий (JobQueueService) с продолжением после перезапуска.
     """
 
     def __init__(self, app) -> None:
@@ -24,6 +33,10 @@ class BackgroundDialogRunner:
         show_progress: bool = True,
         on_cancel: Optional[Callable[[], None]] = None,
         on_complete: Optional[Callable[[Any], None]] = None,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        policy: TaskPolicy = TaskPolicy.REJECT,
+        process: bool = False,
+        task_args: tuple = (),
     ) -> bool:
         page: ft.Page = self._app.page
         service = self._app.background_service
@@ -55,51 +68,157 @@ class BackgroundDialogRunner:
             ],
         )
 
-        throttle_seconds = 0.1  # максимум ~10 обновлений в секунду
-        last_update_ts = 0.0
-
         def worker() -> None:
-            # Получаем stop_event, который установит BackgroundService
-            stop_event = service._stop_events.get(task_name)
+            # Получаем запись задачи и stop_event, который установит BackgroundService
+            record = service.current_task()
+            stop_event = record.stop_event if record is not None else None
 
             def report_progress(value: float, message: Optional[str] = None) -> None:
-                nonlocal last_update_ts
+                if record is not None:
+                    record.progress = value
+                    if message is not None:
+                        record.message = message
                 if not show_progress:
                     return
-                now = time.time()
-                # Всегда обновляем значения в контролах, но page.update делаем редко
+                # Значения в контролах меняются сразу, а отправку обновления объединяет планировщик кадров
                 v = 0.0 if value < 0 else 1.0 if value > 1 else float(value)
                 progress_bar.value = v
                 if message is not None:
                     status_text.value = message
-                if (now - last_update_ts) >= throttle_seconds:
-                    last_update_ts = now
-                    page.update()
+                self._app.request_update(progress_bar, status_text)
 
             try:
-                status_text.value = "Выполняется..."
-                page.update()
-                result: Any = task_func(report_progress, stop_event)
-                if stop_event is None or not stop_event.is_set():
+                if show_progress:
+                    status_text.value = "Выполняется..."
+                    self._app.request_update(status_text)
+                if process:
+                    result: Any = service.run_in_process(task_func, report_progress, stop_event, *task_args)
+                else:
+                    result = task_func(report_progress, stop_event, *task_args)
+                # Результат остановленной или заменённой новым запуском задачи отбрасывается
+                if record is None or service.is_current(record):
                     if show_progress:
                         progress_bar.value = 1.0
-                    status_text.value = "Готово"
-                    page.update()
+                        status_text.value = "Готово"
+                        self._app.request_update(progress_bar, status_text)
                     if on_complete is not None:
                         try:
                             on_complete(result)
                         finally:
                             pass
             finally:
-                dlg.open = False
-                page.update()
+                if show_progress:
+                    dlg.open = False
+                    self._app.request_update()
 
         def start_wrapper():
             # Запустить задачу через BackgroundService, передав наш worker
-            return service.start_task(task_name, worker)
+            return service.start_task(task_name, worker, priority=priority, policy=policy)
 
         if show_progress:
             page.open(dlg)
             page.update()
 
-        return start_wrapper() 
\ No newline at end of file
+        started = start_wrapper()
+        if not started and show_progress:
+            # Задача отклонена (уже выполняется): диалог закрывается, иначе его нечем закрыть
+            dlg.open = False
+            page.update()
+        return started
+
+    def run_pipeline(
+        self,
+        task_name: str,
+        steps: list[tuple[float, Callable[[Any, Callable[[float, Optional[str]], None], threading.Event], Any]]],
+        *,
+        on_cancel: Optional[Callable[[], None]] = None,
+        on_complete: Optional[Callable[[Any], None]] = None,
+        priority: TaskPriority = TaskPriority.NORMAL,
+    ) -> TaskFuture:
+        """
+        Запуск многошаговой задачи с одним диалогом прогресса.
+        :param task_name: Имя задачи
+        :param steps: Список (вес, step_func(previous_result, progress, stop_event))
+        :param on_cancel: Вызывается после отмены пользователем
+        :param on_complete: Вызывается с результатом последнего шага
+        :param priority: Класс приоритета шагов
+        :return: TaskFuture всей задачи
+        """
+        page: ft.Page = self._app.page
+        service = self._app.background_service
+
+        progress_bar = ft.ProgressBar(width=420, value=0)
+        status_text = ft.Text("Выполняется...")
+        future: TaskFuture | None = None
+
+        def cancel_clicked(_: ft.ControlEvent) -> None:
+            if future is not None:
+                future.cancel()
+            if on_cancel is not None:
+                on_cancel()
+            dlg.open = False
+            page.update()
+
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(task_name),
+            content=ft.Column([
+                status_text,
+                progress_bar,
+            ], tight=True, spacing=12),
+            actions=[
+                ft.TextButton("Отмена", on_click=cancel_clicked),
+            ],
+        )
+
+        def report_progress(value: float, message: Optional[str] = None) -> None:
+            progress_bar.value = value
+            if message is not None:
+                status_text.value = message
+            self._app.request_update(progress_bar, status_text)
+
+        def on_done(done: TaskFuture) -> None:
+            dlg.open = False
+            self._app.request_update()
+            if done.cancelled():
+                return
+            if done.exception() is not None:
+                self._app.show_error(f"{task_name}: {done.exception()}")
+            elif on_complete is not None:
+                on_complete(done.result())
+
+        page.open(dlg)
+        page.update()
+        future = service.pipeline(task_name, steps, progress=report_progress, priority=priority)
+        future.add_done_callback(on_done)
+        return future
+
+    def run_jobs(
+        self,
+        task_name: str,
+        job_ids: list[int],
+        *,
+        on_complete: Optional[Callable[[Any], None]] = None,
+        priority: TaskPriority = TaskPriority.BATCH,
+    ) -> TaskFuture:
+        """
+        Выполнение (продолжение) заданий очереди заданий с одним диалогом прогресса.
+        Вес задания в общем прогрессе - количество необработанных элементов.
+        Отмена пользователем отменяет задания; при закрытии приложения они остаются незавершёнными.
+        :param task_name: Имя задачи
+        :param job_ids: Идентификаторы заданий
+        :param on_complete: Вызывается с результатом последнего задания
+        :param priority: Класс приоритета
+        :return: TaskFuture всех заданий
+        """
+        job_queue = self._app.job_queue_service
+        jobs = [job for job in map(job_queue.get_job, job_ids) if job is not None]
+
+        def cancel_jobs() -> None:
+            for job in jobs:
+                job_queue.cancel_job(job.id)
+
+        steps = [(job.remaining, lambda _, progress, stop_event, job_id=job.id:
+                  job_queue.run_job(job_id, progress, stop_event)) for job in jobs]
+        return self.run_pipeline(task_name, steps, on_cancel=cancel_jobs, on_complete=on_complete,
+                                 priority=priority)
@@ -34,6 +34,14 @@ class LinkSection:
             ]), padding=15, border_radius=8, expand=True)
         return self.link_section
 
+    def set_links(self, links: list[list[Path | str]]) -> None:
+        """
+        Заменяет ссылки в уже созданной секции без редактирования (is_edit=False).
+        :param links: Список пар [название, путь]
+        """
+        buttons = self.link_section.content.controls[-1].controls
+        buttons[:] = [self._create_fab(text, path, context_menu=False) for text, path in links]
+
     def _create_fab(self, text, path, context_menu=True):
         def on_right_click(e):
             def remove_from_favorites(e):
@@ -1,5 +1,7 @@
 import flet as ft
 
+from utils.stall_watchdog import track_stalls
+
 
 class Menu:
     """
@@ -34,6 +36,7 @@ class Menu:
 
         return self._navigation_rail
 
+    @track_stalls
     def _on_change(self, event) -> None:
         item_index = self._navigation_rail.selected_index
         page = self._menu_items[item_index][1]["page"]
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from utils.logger_config import get_logger
+
+logger = get_logger("components.page_cache")
+
+
+class PageCache:
+    """
+    Кэш экземпляров страниц для навигации.
+    Хранит последние N страниц вместе с их деревом контролов и вытесняет самые давно открытые (LRU).
+    """
+
+    def __init__(self, max_pages: int = 8):
+        """
+        Инициализация кэша страниц.
+        :param max_pages: Максимальное количество страниц в кэше
+        """
+        self._max_pages = max_pages
+        self._pages: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Получить страницу из кэша.
+        :param key: Ключ страницы (класс страницы или ("project", id))
+        :return: Экземпляр страницы или None
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key: Hashable, page: Any) -> None:
+        """
+        Добавить страницу в кэш с вытеснением самой давно открытой.
+        :param key: Ключ страницы
+        :param page: Экземпляр страницы
+        """
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self._max_pages:
+                evicted_key, _ = self._pages.popitem(last=False)
+                logger.debug("Страница вытеснена из кэша: %s", evicted_key)
+
+    def invalidate(self, key: Hashable | Callable[[Hashable], bool] | None = None) -> None:
+        """
+        Удалить страницы из кэша.
+        :param key: Ключ страницы, предикат по ключу или None для очистки всего кэша
+        """
+        with self._lock:
+            if key is None:
+                self._pages.clear()
+            elif callable(key) and not isinstance(key, type):
+                for k in [k for k in self._pages if key(k)]:
+                    del self._pages[k]
+            else:
+                self._pages.pop(key, None)
+        logger.debug("Инвалидация кэша страниц: %s", key)
@@ -1,31 +1,137 @@
+import time
+from datetime import datetime
+
 import flet as ft
 
+from services.background_service import TaskPriority, TaskRecord
+from utils.file_utils import FileUtils
+from utils.logger_config import get_logger
+from utils.process_info import ProcessInfo
+
+logger = get_logger("components.status_bar")
+
 
 class StatusBar:
-    # FIXME
-    def __init__(self, app):
+    """
+    Строка состояния с монитором фоновых задач и ресурсов процесса.
+    В свёрнутом виде обновляется только по событиям BackgroundService (запуск и завершение задач).
+    В развёрнутом виде раз в refresh_interval секунд показывает задачи с временем выполнения и прогрессом,
+    количество потоков, память процесса, частоту запросов к базе данных, попадания в кэши
+    и последнюю задержку потока интерфейса.
+    """
+    MONITOR_TASK = "status_bar_monitor"
+
+    def __init__(self, app, refresh_interval: float = 1.0):
+        """
+        Инициализация строки состояния.
+        :param app: Экземпляр основного приложения (используется app.background_service)
+        :param refresh_interval: Интервал обновления развёрнутого монитора (в секундах)
+        """
         self._app = app
-        self.progress_bar = ft.ProgressBar(0)
-        self.tasks = []
-        self.content = ft.Container(content=None)
+        self._refresh_interval = refresh_interval
+        self._expanded = False
+        self._last_sample: tuple[float, int] | None = None  # (время, количество запросов к базе данных)
 
-    def _start_progress(self):
-        self.progress_bar.value = None
+        self.progress_bar = ft.ProgressBar(value=0, width=120, visible=False)
+        self.summary_text = ft.Text("Нет фоновых задач", size=12)
+        self.toggle_button = ft.IconButton(icon=ft.Icons.EXPAND_LESS, icon_size=16,
+                                           tooltip="Монитор задач и ресурсов", on_click=self._toggle)
+        self.tasks_column = ft.Column(spacing=2)
+        self.metrics_text = ft.Text(size=12, selectable=True)
+        self.details = ft.Container(content=ft.Column([self.tasks_column, self.metrics_text], spacing=4),
+                                    visible=False)
         self.content = ft.Container(content=ft.Column([
-            self.progress_bar,
-            ft.Text(f"({len(self.tasks)})"),
-        ], expand=True))
-
-    def _stop_progress(self):
-        self.progress_bar.value = 0
-        self.content = ft.Container(content=None)
-
-    def add_task(self, task):
-        self.tasks.append(task)
-        self._start_progress()
-        self._app.page.update()
-
-    def delete_task(self, task):
-        self.tasks.remove(task)
-        self._stop_progress()
-        self._app.page.update()
+            self.details,
+            ft.Row([self.progress_bar, self.summary_text, self.toggle_button],
+                   alignment=ft.MainAxisAlignment.END),
+        ], spacing=0))
+
+        app.background_service.add_listener(self._on_task_changed)
+
+    def _tasks(self) -> list[TaskRecord]:
+        return [record for name, record in self._app.background_service.get_tasks().items()
+                if name != self.MONITOR_TASK]
+
+    def _on_task_changed(self, record: TaskRecord) -> None:
+        """Обновление краткой сводки при запуске и завершении задач"""
+        if record.name == self.MONITOR_TASK:
+            return
+        tasks = self._tasks()
+        running = sum(1 for r in tasks if r.state == TaskRecord.RUNNING)
+        queued = len(tasks) - running
+        if tasks:
+            self.summary_text.value = f"Задачи: {running}" + (f" • в очереди: {queued}" if queued else "")
+        else:
+            self.summary_text.value = "Нет фоновых задач"
+        self.progress_bar.visible = running > 0
+        self.progress_bar.value = None if running else 0
+        self._app.request_update(self.progress_bar, self.summary_text)
+
+    def _toggle(self, e) -> None:
+        self._expanded = not self._expanded
+        self.details.visible = self._expanded
+        self.toggle_button.icon = ft.Icons.EXPAND_MORE if self._expanded else ft.Icons.EXPAND_LESS
+        service = self._app.background_service
+        if self._expanded:
+            self._last_sample = None
+            service.start_periodic_task(self.MONITOR_TASK, self._refresh, initial_delay=0,
+                                        interval=self._refresh_interval, jitter=0,
+                                        priority=TaskPriority.INTERACTIVE)
+        else:
+            service.stop_task(self.MONITOR_TASK)
+        self._app.request_update(self.details, self.toggle_button)
+
+    @staticmethod
+    def _hit_rate(cache) -> str:
+        if cache is None:
+            return "—"
+        total = cache.hits + cache.misses
+        return f"{100 * cache.hits / total:.0f}%" if total else "—"
+
+    def _format_task(self, record: TaskRecord, now: float) -> str:
+        if record.state == TaskRecord.RUNNING:
+            text = f"{record.name}: {now - record.started_at:.0f} с"
+            if record.progress is not None:
+                text += f", {record.progress * 100:.0f}%"
+            if record.message:
+                text += f" — {record.message}"
+            return text
+        return f"{record.name}: в очереди {now - record.submitted_at:.0f} с ({record.priority.name})"
+
+    def _format_metrics(self) -> str:
+        app = self._app
+        metrics = app.background_service.get_metrics()
+        now = time.monotonic()
+
+        database_service = getattr(app, "database_service", None)
+        queries = database_service.queries if database_service is not None else 0
+        query_rate = "—"
+        if self._last_sample is not None and now > self._last_sample[0]:
+            query_rate = f"{(queries - self._last_sample[1]) / (now - self._last_sample[0]):.1f}/с"
+        self._last_sample = (now, queries)
+
+        rss = ProcessInfo.get_rss()
+        lines = [
+            f"Потоки: {ProcessInfo.get_thread_count()} • пул: {metrics['workers']}/{metrics['max_workers']} "
+            f"(свободно {metrics['idle_workers']}) • по расписанию: {metrics['scheduled']} • "
+            f"память: {FileUtils.format_size(rss) if rss is not None else '—'}",
+            f"Запросы к БД: {query_rate} • кэш страниц: {self._hit_rate(getattr(app, 'page_cache', None))} • "
+            f"кэш папок: {self._hit_rate(getattr(app, 'folder_cache_service', None))} • "
+            f"поиск: {self._hit_rate(getattr(app, 'project_search_service', None))}",
+        ]
+        stall = getattr(app, "last_ui_stall", None)
+        if stall is not None:
+            at, duration = stall
+            lines.append(f"Последняя задержка интерфейса: {duration:.1f} с в "
+                         f"{datetime.fromtimestamp(at).strftime('%H:%M:%S')}")
+        return "\n".join(lines)
+
+    def _refresh(self) -> None:
+        """Обновление развёрнутого монитора (задача по расписанию BackgroundService)"""
+        if not self._expanded:
+            return
+        now = time.monotonic()
+        tasks = sorted(self._tasks(), key=lambda r: (r.state != TaskRecord.RUNNING, r.submitted_at))
+        self.tasks_column.controls = [ft.Text(self._format_task(record, now), size=12) for record in tasks]
+        self.metrics_text.value = self._format_metrics()
+        self._app.request_update(self.details)
@@ -0,0 +1,121 @@
+from typing import Any, Callable
+
+import flet as ft
+
+from utils.logger_config import get_logger
+
+logger = get_logger("components.virtual_list")
+
+
+class VirtualList:
+    """
+    Виртуализированный список строк одинаковой высоты.
+    Вместо контрола на каждый элемент данных список держит постоянный набор строк (видимая область
+    и запас сверху и снизу), а пустые контейнеры над и под ними занимают высоту остальных элементов.
+    При прокрутке строки набора привязываются к новым элементам через bind_row, и в обновлении отправляются
+    только строки с изменённой привязкой и два контейнера. Поэтому память и стоимость кадра прокрутки
+    не зависят от количества элементов.
+    """
+
+    def __init__(self, app, create_row: Callable[[], ft.Control], bind_row: Callable[[ft.Control, Any], None],
+                 row_height: float = 60, pool_size: int = 40, overscan: int = 10):
+        """
+        Инициализация списка.
+        :param app: Экземпляр основного приложения (используется app.request_update)
+        :param create_row: Callable, создающий пустую строку
+        :param bind_row: Callable(строка, элемент), заполняющий строку данными элемента
+        :param row_height: Высота строки (в пикселях)
+        :param pool_size: Начальное количество строк (увеличивается под высоту окна)
+        :param overscan: Количество строк запаса выше видимой области
+        """
+        self._app = app
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._overscan = overscan
+        self._items: list = []
+        self._first = 0
+        self._top = ft.Container(height=0)
+        self._bottom = ft.Container(height=0)
+        self._slots: list[ft.Container] = []
+        self._bound: list[int | None] = []
+        self.control = ft.ListView(controls=[self._top, self._bottom], expand=True, spacing=0, padding=0,
+                                   on_scroll=self._on_scroll, on_scroll_interval=16)
+        self._grow(pool_size)
+        self.rebinds = 0
+
+    @property
+    def items(self) -> list:
+        """Элементы списка"""
+        return self._items
+
+    def _grow(self, pool_size: int) -> None:
+        """Добавление строк в набор"""
+        while len(self._slots) < pool_size:
+            slot = ft.Container(content=self._create_row(), height=self._row_height, visible=False)
+            self._slots.append(slot)
+            self._bound.append(None)
+            self.control.controls.insert(len(self.control.controls) - 1, slot)
+
+    def set_items(self, items: list) -> None:
+        """
+        Замена элементов списка с прокруткой в начало.
+        :param items: Элементы (передаются в bind_row)
+        """
+        self._items = items
+        self._first = 0
+        self._bound = [None] * len(self._slots)
+        self._bind()
+        if self.control.page is not None:
+            # До добавления на страницу контролы отрисуются вместе с ней
+            self.control.scroll_to(offset=0, duration=0)
+            self._app.request_update(self.control)
+
+    def refresh(self) -> None:
+        """Повторная привязка видимых строк (после изменения самих элементов)"""
+        self._bound = [None] * len(self._slots)
+        changed = self._bind()
+        if self.control.page is not None:
+            self._app.request_update(*changed)
+
+    def _bind(self) -> list[ft.Control]:
+        """Привязка строк набора к элементам начиная с self._first, возвращает изменённые контролы"""
+        changed: list[ft.Control] = [self._top, self._bottom]
+        count = len(self._items)
+        self._top.height = self._first * self._row_height
+        self._bottom.height = max(count - self._first - len(self._slots), 0) * self._row_height
+        for k, slot in enumerate(self._slots):
+            index = self._first + k
+            if index >= count:
+                if slot.visible:
+                    slot.visible = False
+                    self._bound[k] = None
+                    changed.append(slot)
+                continue
+            if self._bound[k] == index:
+                continue
+            self._bind_row(slot.content, self._items[index])
+            self._bound[k] = index
+            slot.visible = True
+            changed.append(slot)
+            self.rebinds += 1
+        return changed
+
+    def _on_scroll(self, e: ft.OnScrollEvent) -> None:
+        if e.pixels is None:
+            return
+        if e.viewport_dimension:
+            needed = int(e.viewport_dimension // self._row_height) + 1 + 2 * self._overscan
+            if needed > len(self._slots):
+                logger.debug("Увеличение набора строк списка до %s", needed)
+                self._grow(needed)
+                self._bound = [None] * len(self._slots)
+                self._bind()
+                self._app.request_update(self.control)
+                return
+        first = int(e.pixels // self._row_height) - self._overscan
+        first = max(0, min(first, len(self._items) - len(self._slots)))
+        if first == self._first:
+            return
+        self._first = first
+        self._app.request_update(*self._bind())
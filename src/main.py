@@ -1,33 +1,59 @@
+import time
+
+# Начало отсчёта времени до первого кадра: до импорта flet, настройки логирования и остальных модулей
+_STARTED_AT = time.perf_counter()
+
+import importlib
+import multiprocessing
 import os
+import threading
 import traceback
 from pathlib import Path
 
 import flet as ft
 
-from utils.logger_config import setup_logging, get_logger, log_exception
+from utils.logger_config import (setup_logging, get_logger, log_exception, shutdown_logging, enable_profile,
+                                 is_profile_enabled, dump_profile)
+from utils.stall_watchdog import get_stall_watchdog, track_stalls
+from utils import tracing
 
 # Настройка логирования
 logger = get_logger("main")
 
+# Страницы и модули, которые импортируются при первом открытии или фоновым прогревом после первого кадра
+LAZY_PAGES = {
+    "projects": "pages.projects_page:ProjectsPage",
+    "project": "pages.project_page:ProjectPage",
+    "settings": "pages.settings_page:SettingsPage",
+    "logs": "pages.logs_page:LogsPage",
+}
+WARM_UP_MODULES = ("pony.orm", "models.database_model", "utils.updater")
+# Сервисы, которые не нужны для первого кадра: создаются при первом обращении или фоновым прогревом
+LAZY_SERVICES = ("folder_cache_service", "project_search_service", "log_index_service")
+
 try:
-    from pages.dashboard_page import DashboardPage
-    from pages.projects_page import ProjectsPage
-    from pages.project_page import ProjectPage
-    from pages.settings_page import SettingsPage
+    with tracing.span("import: main"):
+        from pages.dashboard_page import DashboardPage
 
-    from components.menu import Menu
-    from components.status_bar import StatusBar
+        from components.menu import Menu
+        from components.status_bar import StatusBar
+        from components.page_cache import PageCache
 
-    from models.settings_model import Settings
+        from models.settings_model import Settings
 
-    from services.background_service import BackgroundService
-    from services.database_service import DatabaseService
-    from components.background_dialog_runner import BackgroundDialogRunner
+        from services.background_service import BackgroundService, TaskPriority
+        from services.database_service import DatabaseService
+        from services.project_stats_service import ProjectStatsService
+        from services.file_index_service import FileIndexService
+        from services.ui_update_service import UiUpdateService
+        from services.job_queue_service import JobQueueService
+        from services.settings_service import SettingsService
+        from services.job_handlers import ProjectStatsJobHandler, ProjectManifestJobHandler, TableExtractionJobHandler
+        from services.project_service import ProjectService
+        from components.background_dialog_runner import BackgroundDialogRunner
 
-    from utils.file_utils import FileUtils
-    from utils.updater import Updater
 
-    from version import __version__
+        from version import __version__
 
 except Exception as e:
     exc = traceback.format_exc()
@@ -57,27 +83,88 @@ class GeoOfficeApp:
         self.menu = None
         # Контейнер для основного содержимого
         self.content = None
-        self.status_bar = StatusBar(self)
+        # Кэш открытых страниц для быстрой навигации
+        self.page_cache = PageCache()
+        # Класс отображаемой страницы (None для страницы объекта)
+        self.current_page = None
+        # Планировщик обновлений интерфейса (один page.update() за кадр)
+        self.ui_update_service = UiUpdateService(self)
+        # Последняя задержка обработки событий интерфейса: (время, длительность в секундах)
+        self.last_ui_stall: tuple[float, float] | None = None
 
         self.background_service = BackgroundService(self)
+        # Строка состояния с монитором задач и ресурсов
+        self.status_bar = StatusBar(self)
+        # Сервисы из LAZY_SERVICES, созданные при первом обращении
+        self._lazy_services: dict = {}
+        self._lazy_services_lock = threading.RLock()
+        # Индекс имён файлов и статистика занимаемого места по папкам объектов
+        self.file_index_service = FileIndexService(self.storage_path)
+        self.project_stats_service = ProjectStatsService(self.storage_path, self.file_index_service)
+        # Очередь длительных заданий с продолжением после перезапуска
+        self.job_queue_service = JobQueueService(self.storage_path)
+        self.job_queue_service.register_handler(ProjectStatsJobHandler(self.project_stats_service))
+        self.job_queue_service.register_handler(TableExtractionJobHandler(self.background_service))
         # Новый раннер диалогов прогресса
         self.background_dialog_runner = BackgroundDialogRunner(self)
 
-        # Инициализация настроек
+        # Инициализация настроек (изменения записываются на диск с задержкой, см. SettingsService)
         self.settings = Settings(data=None)
+        self.settings_service = SettingsService(Path(self.storage_path) / "settings.json", self.background_service,
+                                                lambda: self.settings.to_dict())
         self.load_settings()
 
         # Инициализация базы данных
         self.database_service = DatabaseService(
             Path(self.settings.paths.file_server) / self.settings.paths.database_path)
+        self.job_queue_service.register_handler(
+            ProjectManifestJobHandler(ProjectService(self.database_service, self.storage_path)))
 
         logger.info("Приложение инициализировано")
 
+    def _lazy_service(self, name: str, create):
+        """
+        Сервис из LAZY_SERVICES: создаётся один раз при первом обращении из любого потока.
+        :param name: Имя атрибута сервиса
+        :param create: Функция создания сервиса (импортирует его модуль)
+        """
+        with self._lazy_services_lock:
+            service = self._lazy_services.get(name)
+            if service is None:
+                with tracing.span(f"import: {name}"):
+                    service = self._lazy_services[name] = create()
+            return service
+
+    @property
+    def folder_cache_service(self):
+        """Кэш списков папок объектов"""
+        def create():
+            from services.folder_cache_service import FolderCacheService
+            return FolderCacheService()
+        return self._lazy_service("folder_cache_service", create)
+
+    @property
+    def project_search_service(self):
+        """Поиск объектов с отложенным запуском и фильтрацией уточнённых запросов в памяти"""
+        def create():
+            from services.project_search_service import ProjectSearchService
+            return ProjectSearchService(self)
+        return self._lazy_service("project_search_service", create)
+
+    @property
+    def log_index_service(self):
+        """Индекс журналов приложения для страницы просмотра журналов"""
+        def create():
+            from services.log_index_service import LogIndexService
+            return LogIndexService(Path(self.storage_path) / "logs")
+        return self._lazy_service("log_index_service", create)
+
     @log_exception
+    @tracing.traced()
     def load_settings(self) -> None:
         """Чтение настроек приложения"""
         logger.debug("Чтение настроек приложения")
-        settings_data = FileUtils.load_json(Path(self.storage_path) / "settings.json")
+        settings_data = self.settings_service.load()
         if settings_data is not None:
             try:
                 self.settings = Settings(data=settings_data)
@@ -86,16 +173,22 @@ class GeoOfficeApp:
                 logger.warning(e)
         else:
             logger.info("Создание настроек по умолчанию")
-            self.save_settings()
+            self.save_settings(immediate=True)
+        if self.settings.diagnostics.trace:
+            tracing.enable()
+        if self.settings.diagnostics.profile:
+            enable_profile()
 
     @log_exception
-    def save_settings(self):
-        """Сохранение настроек приложения"""
+    def save_settings(self, immediate: bool = False):
+        """
+        Сохранение настроек приложения.
+        :param immediate: Записать файл сразу, иначе запись объединяется с последующими изменениями
+        """
         logger.debug("Сохранение настроек приложения")
-        if FileUtils.save_json(self.settings.to_dict(), Path(self.storage_path) / "settings.json"):
-            logger.info("Настройки успешно сохранены")
-        else:
-            logger.error("Ошибка сохранения настроек")
+        self.settings_service.save()
+        if immediate:
+            self.settings_service.flush()
 
     @log_exception
     def main(self, page: ft.Page):
@@ -111,19 +204,28 @@ class GeoOfficeApp:
         page.window.top = self.settings.interface.top
         page.padding = 20
 
-        page.window.prevent_close = False
+        # Закрытие окна обрабатывается в window_event_handler: сначала записываются настройки
+        page.window.prevent_close = True
+
+        # Отслеживание задержек интерфейса со снятием стеков (отчёты в logs/stalls)
+        if self.settings.diagnostics.stall_watchdog:
+            stall_watchdog = get_stall_watchdog()
+            stall_watchdog.configure(Path(self.storage_path) / "logs",
+                                     threshold=self.settings.diagnostics.stall_threshold,
+                                     on_stall=self._on_ui_stall)
+            stall_watchdog.start(page)
 
         # Установка обработчика события для окна
         def window_event_handler(e: ft.WindowEvent):
-            self.settings.interface.width = int(self.page.window.width)
-            self.settings.interface.height = int(self.page.window.height)
-            self.settings.interface.left = int(self.page.window.left)
-            self.settings.interface.top = int(self.page.window.top)
-            self.save_settings()
-            if e.data == "close":
-                # TODO: реализовать логику при page.window.prevent_close = True
-                print("CLOSE")
-                page.window.destroy()
+            try:
+                self.settings.interface.width = int(self.page.window.width)
+                self.settings.interface.height = int(self.page.window.height)
+                self.settings.interface.left = int(self.page.window.left)
+                self.settings.interface.top = int(self.page.window.top)
+                self.save_settings()
+            finally:
+                if e.data == "close":
+                    self.close_window()
         self.page.window.on_event = window_event_handler
 
         # Создание навигации
@@ -149,12 +251,56 @@ class GeoOfficeApp:
 
         page.update()
 
+        first_frame_ms = (time.perf_counter() - _STARTED_AT) * 1000
+        budget_ms = self.settings.diagnostics.startup_budget_ms
+        if first_frame_ms > budget_ms:
+            logger.warning(f"Время до первого кадра {first_frame_ms:.0f} мс превышает бюджет {budget_ms} мс")
+        else:
+            logger.info(f"Время до первого кадра: {first_frame_ms:.0f} мс (бюджет {budget_ms} мс)")
+
         logger.info("Пользовательский интерфейс инициализирован")
 
+        # База данных подключается и тяжёлые модули импортируются в фоне после первого кадра
         self.connect_database()
+        self.background_service.start_task("warm_up", self._warm_up, priority=TaskPriority.BATCH)
+
+        self.offer_unfinished_jobs()
 
-        updater = Updater(repo="maxmyslivets/GeoOffice", current_version=__version__)
-        updater.show_update_dialog(self.page)
+    def _warm_up(self):
+        """Фоновый импорт страниц и тяжёлых модулей, создание сервисов LAZY_SERVICES и запуск проверки обновлений"""
+        started = time.perf_counter()
+        for module_name in [ref.split(":")[0] for ref in LAZY_PAGES.values()] + list(WARM_UP_MODULES):
+            try:
+                with tracing.span(f"import: {module_name}"):
+                    importlib.import_module(module_name)
+            except Exception as e:
+                logger.error(f"Ошибка фонового импорта {module_name}: {e}")
+        for name in LAZY_SERVICES:
+            try:
+                getattr(self, name)
+            except Exception as e:
+                logger.error(f"Ошибка создания сервиса {name}: {e}")
+        logger.info(f"Фоновый импорт модулей завершён за {(time.perf_counter() - started) * 1000:.0f} мс")
+
+        from utils.updater import Updater
+
+        # Проверка обновлений в фоне: не чаще интервала из настроек, с кэшем последнего релиза
+        self.updater = Updater(repo="maxmyslivets/GeoOffice", current_version=__version__,
+                               cache_file=Path(self.storage_path) / "update_cache.json",
+                               api_url=self.settings.updates.api_url,
+                               check_interval=self.settings.updates.check_interval_hours * 3600)
+        self.updater.start(self.page, self.background_service)
+
+    @staticmethod
+    def resolve_page(page):
+        """
+        Класс страницы по ссылке "модуль:Класс" из LAZY_PAGES (модуль импортируется при первом открытии).
+        :param page: Класс страницы, ключ LAZY_PAGES или ссылка "модуль:Класс"
+        """
+        if isinstance(page, str):
+            module_name, class_name = LAZY_PAGES.get(page, page).split(":")
+            page = getattr(importlib.import_module(module_name), class_name)
+        return page
 
     @log_exception
     def create_menu(self):
@@ -163,9 +309,10 @@ class GeoOfficeApp:
 
         menu_items = [
             ("Доска", {"icon": ft.Icons.DASHBOARD, "page": DashboardPage}),
-            ("Объекты", {"icon": ft.Icons.ARTICLE, "page": ProjectsPage}),
+            ("Объекты", {"icon": ft.Icons.ARTICLE, "page": "projects"}),
             # ("Инструменты", {"icon": ft.Icons.BUILD, "page": ToolsPage}),
-            ("Настройки", {"icon": ft.Icons.SETTINGS, "page": SettingsPage}),
+            ("Журнал", {"icon": ft.Icons.RECEIPT_LONG, "page": "logs"}),
+            ("Настройки", {"icon": ft.Icons.SETTINGS, "page": "settings"}),
         ]
 
         # Создаем меню с категориями
@@ -188,36 +335,68 @@ class GeoOfficeApp:
         logger.debug("Основной контент создан")
 
     @log_exception
+    @track_stalls
+    @tracing.traced()
     def show_page(self, page):
         """Показать страницу"""
-        logger.debug(f"Отображение страницы: {page}")
+        logger.debug("Отображение страницы: %s", page)
         try:
-            page = page(self)
+            page_cls = self.resolve_page(page)
+            self.current_page = page_cls
+            page = self.page_cache.get(page_cls) if page_cls.cacheable else None
+            if page is None:
+                page = page_cls(self)
+                if page_cls.cacheable:
+                    self.page_cache.put(page_cls, page)
             self.content.content = page.get_scrollable_content()
             self.page.update()
             page.post_show()
         except Exception as e:
             logger.error(e)
 
+    def request_update(self, *controls, immediate: bool = False):
+        """
+        Запросить обновление интерфейса через планировщик кадров.
+        :param controls: Изменённые контролы; без аргументов обновляется вся страница
+        :param immediate: Отправить обновление сразу
+        """
+        self.ui_update_service.request_update(*controls, immediate=immediate)
+
+    @log_exception
+    def invalidate_pages(self, key=None):
+        """
+        Сбросить кэш страниц.
+        :param key: Класс страницы, ("project", id), предикат по ключу или None для всех страниц
+        """
+        self.page_cache.invalidate(key)
+
     @log_exception
+    @track_stalls
+    @tracing.traced()
     def show_project_page(self, project_id):
         """Показать страницу объекта по id"""
-        logger.debug(f"Отображение страницы объекта id={project_id}")
-        # Создаем динамическую страницу проекта
-        project_page = ProjectPage(self, project_id)
+        logger.debug("Отображение страницы объекта id=%s", project_id)
+        key = ("project", project_id)
+        self.current_page = None
+        # Берём страницу проекта из кэша или создаём новую
+        project_page = self.page_cache.get(key)
+        if project_page is None:
+            project_page = self.resolve_page("project")(self, project_id)
+            self.page_cache.put(key, project_page)
         project = project_page.project
 
         # Отображаем страницу проекта
         self.content.content = project_page.get_scrollable_content()
 
         self.page.update()
-        logger.debug(f"Страница объекта id={project.id} отображена")
+        project_page.post_show()
+        logger.debug("Страница объекта id=%s отображена", project.id)
 
     @log_exception
     def _show_snack_bar(self, message, level='info'):
         """Показать уведомление"""
         try:
-            logger.debug(f"Показ уведомления: {message}")
+            logger.debug("Показ уведомления: %s", message)
             self.page.snack_bar = ft.SnackBar(content=ft.Text(message),
                                               behavior=ft.SnackBarBehavior.FLOATING)
             self.page.snack_bar.open = True
@@ -261,13 +440,89 @@ class GeoOfficeApp:
         except Exception as e:
             logger.error(f"Ошибка показа информации: {e}")
 
+    def _on_ui_stall(self, at: float, duration: float, name: str):
+        """Запоминание последней задержки интерфейса для монитора в строке состояния"""
+        self.last_ui_stall = (at, duration)
+
+    def close_window(self):
+        """
+        Завершение работы при закрытии окна (prevent_close). Шаги выполняются независимо: ошибка шага
+        записывается в журнал и не мешает остальным, а окно закрывается в любом случае.
+        """
+        steps = [
+            ("запись настроек", self.settings_service.flush),
+            ("остановка отслеживания задержек", lambda: get_stall_watchdog().stop()),
+            ("запись трассировки", tracing.export),
+            ("запись профиля вызовов", lambda: dump_profile() if is_profile_enabled() else None),
+            ("остановка фоновых задач", self.background_service.shutdown),
+            ("завершение логирования", shutdown_logging),
+        ]
+        try:
+            for name, step in steps:
+                try:
+                    step()
+                except Exception as e:
+                    logger.error(f"Ошибка при закрытии приложения ({name}): {e}")
+        finally:
+            self.page.window.destroy()
+
+    @log_exception
+    def offer_unfinished_jobs(self):
+        """Предложить продолжить задания, прерванные закрытием приложения"""
+        jobs = self.job_queue_service.get_unfinished_jobs()
+        if not jobs:
+            return
+        logger.info(f"Найдены незавершённые задания: {len(jobs)}")
+
+        def resume(e):
+            self.page.close(banner)
+            self.background_dialog_runner.run_jobs("Продолжение заданий", [job.id for job in jobs])
+
+        def cancel(e):
+            self.page.close(banner)
+            for job in jobs:
+                self.job_queue_service.cancel_job(job.id)
+
+        def later(e):
+            self.page.close(banner)
+
+        lines = [f"• {job.title}" + (f" (выполнено {job.done} из {job.total})" if job.total else "")
+                 for job in jobs]
+        banner = ft.Banner(
+            leading=ft.Icon(ft.Icons.RESTORE, size=20),
+            content=ft.Text("Есть незавершённые задания:\n" + "\n".join(lines)),
+            actions=[
+                ft.TextButton("Продолжить", on_click=resume),
+                ft.TextButton("Отменить", on_click=cancel),
+                ft.TextButton("Позже", on_click=later),
+            ],
+        )
+        self.page.open(banner)
+
     @log_exception
     def connect_database(self):
-        try:
-            self.database_service.connection()
-        except Exception as e:
-            logger.error(f"Ошибка подключения к базе данных\n{e}")
-            self.show_error("Ошибка подключения к базе данных")
+        """
+        Подключение к базе данных в фоновой задаче.
+        До завершения подключения database_service.connecting = True, после подключения
+        кэши сбрасываются и текущая страница строится заново уже с данными.
+        """
+        @tracing.traced("connect_database")
+        def task():
+            try:
+                self.database_service.connection()
+            except Exception as e:
+                logger.error(f"Ошибка подключения к базе данных\n{e}")
+                self.show_error("Ошибка подключения к базе данных")
+                return
+            self.project_search_service.invalidate()
+            self.background_service.start_task("project_search_index", self.project_search_service.warm_up,
+                                               priority=TaskPriority.BATCH)
+            self.invalidate_pages()
+            if self.current_page is not None:
+                self.show_page(self.current_page)
+
+        self.database_service.connecting = True
+        self.background_service.start_task("Подключение к базе данных", task, priority=TaskPriority.INTERACTIVE)
 
 
 @log_exception
@@ -279,6 +534,8 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
+    # Поддержка пула процессов BackgroundService в собранном приложении
+    multiprocessing.freeze_support()
     # Настройка логирования при запуске
     setup_logging("GeoOffice")
     logger.info("Запуск приложения GeoOffice")
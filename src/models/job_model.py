@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class Job:
+    """
+    Модель задания очереди заданий (JobQueueService).
+    :param id: Идентификатор задания
+    :param kind: Вид задания (имя зарегистрированного обработчика)
+    :param key: Ключ задания; новое задание с тем же ключом заменяет незавершённое
+    :param title: Название задания для интерфейса
+    :param params: Параметры задания (сериализуются в JSON)
+    :param state: Состояние: pending, running, paused, done, cancelled, failed
+    :param total: Количество элементов задания (None, пока элементы не определены)
+    :param done: Количество обработанных элементов
+    :param created_at: Время создания (timestamp)
+    :param updated_at: Время последнего изменения (timestamp)
+    :param error: Текст ошибки, если задание завершилось ошибкой
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    PAUSED = "paused"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    id: int
+    kind: str
+    key: str
+    title: str
+    params: dict[str, Any] = field(default_factory=dict)
+    state: str = PENDING
+    total: int | None = None
+    done: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    error: str | None = None
+
+    @property
+    def unfinished(self) -> bool:
+        """Задание можно продолжить"""
+        return self.state in (self.PENDING, self.RUNNING, self.PAUSED)
+
+    @property
+    def remaining(self) -> int:
+        """Количество необработанных элементов (неизвестно - 1)"""
+        return max(self.total - self.done, 0) if self.total is not None else 1
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class LogEntry:
+    """
+    Модель записи журнала приложения (формат detailed_formatter, см. GeoOfficeLogger).
+    :param timestamp: Время записи
+    :param level: Уровень (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    :param logger: Имя логгера (например GeoOffice.services.database_service)
+    :param location: Файл и строка вызова ("database_service.py:115")
+    :param function: Имя функции
+    :param message: Текст сообщения вместе с трассировкой исключения
+    :param source: Имя файла журнала, из которого прочитана запись
+    """
+    timestamp: datetime
+    level: str
+    logger: str
+    location: str
+    function: str
+    message: str
+    source: str
+
+    @property
+    def summary(self) -> str:
+        """Первая строка сообщения"""
+        return self.message.split("\n", 1)[0]
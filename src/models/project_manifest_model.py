@@ -0,0 +1,54 @@
+import json
+import uuid as uuid_lib
+from dataclasses import dataclass, field, asdict
+from typing import Any
+
+MARKER_NAME = ".geo_office_project"
+MANIFEST_SCHEMA_VERSION = 1
+
+
+@dataclass
+class ProjectManifest:
+    """
+    Модель манифеста проекта, хранящегося в файле-маркере .geo_office_project.
+    Пустой маркер (старый формат) манифеста не содержит.
+    :param number: Номер проекта
+    :param name: Название проекта
+    :param customer: Заказчик
+    :param status: Статус проекта (active, completed, archived)
+    :param project_id: id проекта в базе данных
+    :param uuid: Постоянный идентификатор проекта, не меняющийся при переименовании и переносе папки
+    :param schema_version: Версия формата манифеста
+    """
+    number: str
+    name: str
+    customer: str = ""
+    status: str = ""
+    project_id: int | None = None
+    uuid: str = field(default_factory=lambda: str(uuid_lib.uuid4()))
+    schema_version: int = MANIFEST_SCHEMA_VERSION
+
+    def to_json(self) -> str:
+        """Сериализация в JSON для записи в маркер"""
+        return json.dumps(asdict(self), ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ProjectManifest':
+        """Создать из словаря, игнорируя неизвестные поля более новых версий формата"""
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ProjectManifest | None':
+        """
+        Разбор содержимого маркера.
+        :param text: Содержимое файла .geo_office_project
+        :return: Манифест или None, если маркер пустой или в неизвестном формате
+        """
+        if not text.strip():
+            return None
+        try:
+            data = json.loads(text)
+            return cls.from_dict(data) if isinstance(data, dict) else None
+        except (ValueError, TypeError):
+            return None
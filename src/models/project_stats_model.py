@@ -0,0 +1,34 @@
+from dataclasses import dataclass, field, asdict
+from typing import Any
+
+
+@dataclass
+class ProjectStats:
+    """
+    Модель статистики папки проекта.
+    :param path: Путь к папке проекта (относительно папки проектов)
+    :param signature: Отпечаток папок проекта [количество папок, количество записей, наибольший mtime папки]
+    :param total_size: Общий размер файлов в байтах
+    :param files_count: Количество файлов
+    :param extensions: Количество и размер файлов по расширениям {".dwg": [count, size]}
+    :param last_modified_file: Последний изменённый файл (относительно папки проекта)
+    :param last_modified_time: Время изменения последнего файла (timestamp)
+    :param scanned_at: Время сканирования (timestamp)
+    """
+    path: str
+    signature: list
+    total_size: int = 0
+    files_count: int = 0
+    extensions: dict[str, list[int]] = field(default_factory=dict)
+    last_modified_file: str | None = None
+    last_modified_time: float | None = None
+    scanned_at: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Конвертация в словарь"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ProjectStats':
+        """Создать из словаря"""
+        return cls(**data)
@@ -32,6 +32,34 @@ class Paths:
     database_path: str
 
 
+@dataclass
+class Diagnostics:
+    """
+    Модель настроек диагностики. Раздел необязателен в файле настроек.
+    :param stall_watchdog: Отслеживать задержки интерфейса (StallWatchdog)
+    :param stall_threshold: Порог задержки интерфейса для отчёта со стеками (в секундах)
+    :param startup_budget_ms: Бюджет времени от запуска до первого кадра (в миллисекундах)
+    :param trace: Записывать трассировку (logs/trace_*.json), также включается переменной GEOOFFICE_TRACE
+    :param profile: Собирать профиль вызовов функций (logs/profile_*.txt), также включается переменной GEOOFFICE_PROFILE
+    """
+    stall_watchdog: bool = True
+    stall_threshold: float = 1.0
+    startup_budget_ms: int = 1500
+    trace: bool = False
+    profile: bool = False
+
+
+@dataclass
+class Updates:
+    """
+    Модель настроек проверки обновлений. Раздел необязателен в файле настроек.
+    :param check_interval_hours: Интервал между проверками обновлений (в часах)
+    :param api_url: Адрес API релизов (GitHub API или тестовый сервер)
+    """
+    check_interval_hours: float = 24.0
+    api_url: str = "https://api.github.com"
+
+
 @dataclass
 class Settings:
     """
@@ -39,10 +67,14 @@ class Settings:
     :param data: Словарь настроек из JSON
     :param interface: Настройки интерфейса
     :param paths: Настройки путей
+    :param diagnostics: Настройки диагностики
+    :param updates: Настройки проверки обновлений
     """
     data: dict[str, Any] | None
     interface: Interface | None = None
     paths: Paths | None = None
+    diagnostics: Diagnostics | None = None
+    updates: Updates | None = None
 
     def __post_init__(self):
         """Автоматическая инициализация после создания объекта"""
@@ -58,8 +90,12 @@ class Settings:
         try:
             interface = Interface(**self.data['interface'])
             paths = Paths(**self.data['paths'])
+            diagnostics = Diagnostics(**self.data.get('diagnostics', {}))
+            updates = Updates(**self.data.get('updates', {}))
             self.interface = interface
             self.paths = paths
+            self.diagnostics = diagnostics
+            self.updates = updates
         except Exception as e:
             raise Warning(f"Не удалось загрузить настройки, используются настройки по умолчанию.\nОшибка:\n{e}")
 
@@ -71,6 +107,8 @@ class Settings:
         return {
             'interface': asdict(self.interface),
             'paths': asdict(self.paths),
+            'diagnostics': asdict(self.diagnostics),
+            'updates': asdict(self.updates),
         }
 
     def init_default_settings(self) -> None:
@@ -91,6 +129,8 @@ class Settings:
             ],
             database_path='\\geo_office.db'
         )
+        self.diagnostics = Diagnostics()
+        self.updates = Updates()
 
     def add_favorite_folder(self, name: str, path: str) -> None:
         """Добавляет папку в избранное"""
@@ -9,6 +9,8 @@ class BasePage(ABC):
     Базовый абстрактный класс для всех страниц приложения GeoOffice.
     Определяет базовые методы для работы с UI и уведомлениями.
     """
+    # Можно ли хранить экземпляр страницы в кэше навигации (см. GeoOfficeApp.page_cache)
+    cacheable = True
 
     @log_exception
     def __init__(self, app):
@@ -22,7 +24,7 @@ class BasePage(ABC):
         
         # Получаем логгер для конкретной страницы
         self.logger = get_logger(f"pages.{self.__class__.__name__.lower()}")
-        self.logger.debug(f"Инициализация страницы {self.__class__.__name__}")
+        self.logger.debug("Инициализация страницы %s", self.__class__.__name__)
 
     @abstractmethod
     def get_content(self):
@@ -41,10 +43,13 @@ class BasePage(ABC):
     def get_scrollable_content(self):
         """
         Возвращает содержимое страницы с прокруткой.
+        Дерево контролов строится один раз и переиспользуется до вызова invalidate().
         :return: Flet Container с прокручиваемым содержимым
         """
+        if self._content is not None:
+            return self._content
         self.logger.debug("Создание прокручиваемого контента")
-        content = ft.Container(
+        self._content = ft.Container(
             content=ft.Column([
                 self.get_content()
             ], scroll=ft.ScrollMode.AUTO, expand=True),
@@ -52,7 +57,11 @@ class BasePage(ABC):
             expand=True
         )
         self.logger.debug("Прокручиваемый контент создан")
-        return content
+        return self._content
+
+    def invalidate(self):
+        """Сбросить построенное дерево контролов, чтобы при следующем показе оно было создано заново."""
+        self._content = None
     
     @log_exception
     def update_page(self):
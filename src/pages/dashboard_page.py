@@ -1,9 +1,14 @@
 import sys
+from pathlib import Path
+
 import flet as ft
 
 from .base_page import BasePage
 from components.link_section import LinkSection
+from services.background_service import TaskPriority
+from services.job_handlers import ProjectStatsJobHandler
 from services.project_service import ProjectService
+from utils.file_utils import FileUtils
 from utils.logger_config import log_exception
 
 sys.path.append("..")
@@ -20,6 +25,7 @@ class DashboardPage(BasePage):
         super().__init__(app)
         self.page = None
         self.project_service = ProjectService(app.database_service)
+        self.storage_section: ft.Container | None = None
 
     def get_content(self):
         """
@@ -31,8 +37,11 @@ class DashboardPage(BasePage):
                                                     links=self.app.settings.paths.favorite_folders,
                                                     is_edit=True)
 
+        self.storage_section = self.create_storage_section()
+
         return ft.Column([
             link_section,
+            self.storage_section,
             # self.create_statistics_section(),
         ])
 
@@ -71,3 +80,90 @@ class DashboardPage(BasePage):
             border_radius=8,
             expand=True
         )
+
+    @log_exception
+    def create_storage_section(self):
+        """Создание секции занимаемого места по объектам (из сохранённой статистики)"""
+        summary = self.app.project_stats_service.get_summary()
+        largest = [
+            ft.ListTile(
+                leading=ft.Icon(ft.Icons.FOLDER, color=ft.Colors.GREY_700),
+                title=ft.Text(stats.path),
+                subtitle=ft.Text(f"{FileUtils.format_size(stats.total_size)} • файлов: {stats.files_count}",
+                                 size=11, color=ft.Colors.GREY_500),
+                dense=True,
+            )
+            for stats in summary["largest"]
+        ]
+        return ft.Container(
+            ft.Column([
+                ft.Row([
+                    ft.Text("Занимаемое место", size=20, weight=ft.FontWeight.BOLD),
+                    ft.Row([
+                        ft.ElevatedButton(icon=ft.Icons.SYNC, text="Обновить статистику",
+                                          on_click=lambda e: self.start_stats_scan()),
+                        ft.IconButton(icon=ft.Icons.MANAGE_SEARCH, tooltip="Пересканировать все объекты",
+                                      on_click=lambda e: self.start_stats_scan(force=True)),
+                    ], spacing=5),
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                ft.Text(f"Объектов: {summary['projects_count']} • "
+                        f"файлов: {summary['files_count']} • "
+                        f"всего: {FileUtils.format_size(summary['total_size'])}"),
+                ft.Column(largest),
+            ]),
+            padding=15,
+            border_radius=8,
+            expand=True
+        )
+
+    @log_exception
+    def start_stats_scan(self, force: bool = False):
+        """
+        Запуск фонового сбора статистики по папкам объектов.
+        :param force: Сканировать все объекты, в том числе с неизменным отпечатком папок
+        """
+        if not self.app.database_service.connected:
+            if self.app.database_service.connecting:
+                self.app.show_info("Подключение к базе данных...")
+            else:
+                self.app.show_error("База данных не подключена")
+            return
+
+        projects_root = Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder
+
+        def create_job(_, progress, stop_event):
+            progress(0.0, "Чтение списка объектов...")
+            project_paths = [p.path for p in self.app.database_service.get_all_projects()]
+            job_ids.append(self.app.job_queue_service.create_job(
+                ProjectStatsJobHandler.kind, "Статистика объектов",
+                {"projects_root": str(projects_root), "project_paths": project_paths, "force": force}))
+            if stop_event.is_set():
+                self.app.job_queue_service.cancel_job(job_ids[0])
+            progress(1.0)
+            return job_ids[0]
+
+        def scan(job_id, progress, stop_event):
+            return self.app.job_queue_service.run_job(job_id, progress, stop_event)
+
+        def on_cancel():
+            for job_id in job_ids:
+                self.app.job_queue_service.cancel_job(job_id)
+            self.app.show_warning("Сбор статистики прерван пользователем")
+
+        def on_complete(summary):
+            if summary is None:
+                return
+            new_section = self.create_storage_section()
+            self.storage_section.content = new_section.content
+            self.page.update()
+
+        # Сканирование выполняется как задание очереди заданий: после закрытия приложения
+        # оно продолжится с необработанных объектов
+        job_ids: list[int] = []
+        self.app.background_dialog_runner.run_pipeline(
+            task_name="Статистика объектов",
+            steps=[(1, create_job), (19, scan)],
+            on_cancel=on_cancel,
+            on_complete=on_complete,
+            priority=TaskPriority.BATCH,
+        )
@@ -0,0 +1,193 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+import flet as ft
+
+from .base_page import BasePage
+from models.log_entry_model import LogEntry
+from services.background_service import TaskPriority, TaskPolicy
+from utils.logger_config import log_exception
+from utils.stall_watchdog import track_stalls
+
+
+class LogsPage(BasePage):
+    """Страница приложения GeoOffice. Просмотр и поиск журналов приложения по индексу LogIndexService."""
+
+    PERIODS = {
+        "hour": ("Последний час", timedelta(hours=1)),
+        "day": ("Сутки", timedelta(days=1)),
+        "week": ("Неделя", timedelta(days=7)),
+        "month": ("Месяц", timedelta(days=31)),
+        "all": ("Всё время", None),
+    }
+    LEVEL_COLORS = {
+        "DEBUG": ft.Colors.GREY_500,
+        "INFO": ft.Colors.GREEN,
+        "WARNING": ft.Colors.ORANGE,
+        "ERROR": ft.Colors.RED,
+        "CRITICAL": ft.Colors.RED_900,
+    }
+    TIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d")
+    LIMIT = 500
+
+    def __init__(self, app):
+        """
+        Инициализация страницы.
+        :param app: Экземпляр основного приложения
+        """
+        super().__init__(app)
+        self.page = None
+        self.period_dropdown: ft.Dropdown | None = None
+        self.since_field: ft.TextField | None = None
+        self.until_field: ft.TextField | None = None
+        self.level_dropdown: ft.Dropdown | None = None
+        self.module_dropdown: ft.Dropdown | None = None
+        self.search_field: ft.TextField | None = None
+        self.status_text: ft.Text | None = None
+        self.loading_indicator: ft.ProgressRing | None = None
+        self.results_list: ft.ListView | None = None
+        self._current_query_id: int = 0
+
+    def get_content(self):
+        """
+        Формирует и возвращает содержимое страницы (UI-компоненты Flet).
+        :return: Flet Column с элементами интерфейса
+        """
+        self.page = self.app.page
+        self.period_dropdown = ft.Dropdown(
+            label="Период", value="day", width=160, dense=True,
+            options=[ft.dropdown.Option(key, label) for key, (label, _) in self.PERIODS.items()],
+            on_change=self.on_filter_change,
+        )
+        self.since_field = ft.TextField(label="С", hint_text="ГГГГ-ММ-ДД ЧЧ:ММ", width=170, dense=True,
+                                        on_submit=self.on_filter_change)
+        self.until_field = ft.TextField(label="По", hint_text="ГГГГ-ММ-ДД ЧЧ:ММ", width=170, dense=True,
+                                        on_submit=self.on_filter_change)
+        self.level_dropdown = ft.Dropdown(
+            label="Уровень", value=str(logging.DEBUG), width=140, dense=True,
+            options=[ft.dropdown.Option(str(level), logging.getLevelName(level))
+                     for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR)],
+            on_change=self.on_filter_change,
+        )
+        self.module_dropdown = ft.Dropdown(label="Модуль", value="", width=320, dense=True,
+                                           options=[ft.dropdown.Option("", "Все модули")],
+                                           on_change=self.on_filter_change)
+        self.search_field = ft.TextField(hint_text="Текст...", prefix_icon=ft.Icons.SEARCH, dense=True,
+                                         expand=True, on_submit=self.on_filter_change)
+        self.status_text = ft.Text("", size=12, color=ft.Colors.GREY_600)
+        self.loading_indicator = ft.ProgressRing(visible=False, width=20, height=20)
+        self.results_list = ft.ListView(expand=True, spacing=0, padding=0)
+
+        return ft.Column([
+            ft.Row([
+                ft.Text("Журнал приложения", size=20, weight=ft.FontWeight.BOLD),
+                ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Обновить", on_click=self.on_filter_change),
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            ft.Row([self.period_dropdown, self.since_field, self.until_field, self.level_dropdown,
+                    self.module_dropdown], wrap=True, spacing=10),
+            ft.Row([self.search_field, self.loading_indicator], spacing=10),
+            self.status_text,
+            ft.Container(content=self.results_list, expand=True),
+        ], expand=True)
+
+    @log_exception
+    def post_show(self):
+        self.query_logs()
+
+    @log_exception
+    @track_stalls
+    def on_filter_change(self, e):
+        """Обработчик изменения фильтров: новый запрос заменяет выполняющийся"""
+        self.query_logs()
+
+    def _parse_time(self, field: ft.TextField) -> datetime | None:
+        value = (field.value or "").strip()
+        field.error_text = None
+        if not value:
+            return None
+        for time_format in self.TIME_FORMATS:
+            try:
+                return datetime.strptime(value, time_format)
+            except ValueError:
+                continue
+        field.error_text = "Формат ГГГГ-ММ-ДД ЧЧ:ММ"
+        return None
+
+    @log_exception
+    def query_logs(self):
+        """Запускает поиск по журналам в фоне и отображает последние найденные записи"""
+        since = self._parse_time(self.since_field)
+        until = self._parse_time(self.until_field)
+        period = self.PERIODS[self.period_dropdown.value][1]
+        if since is None and period is not None:
+            since = (until or datetime.now()) - period
+        min_level = int(self.level_dropdown.value)
+        module = self.module_dropdown.value or None
+        text = (self.search_field.value or "").strip() or None
+
+        self._current_query_id += 1
+        query_id = self._current_query_id
+        self.loading_indicator.visible = True
+        if not self.app.log_index_service.get_stats()["files"]:
+            self.status_text.value = "Индексация журналов..."
+        self.app.request_update(self.loading_indicator, self.status_text, self.since_field, self.until_field)
+
+        def task(progress, stop_event):
+            started = time.perf_counter()
+            total, entries = self.app.log_index_service.query(since, until, min_level, module, text, self.LIMIT)
+            return total, entries, self.app.log_index_service.get_modules(), time.perf_counter() - started
+
+        def on_complete(result):
+            if result is None or query_id != self._current_query_id:
+                return
+            total, entries, modules, duration = result
+            self._show_entries(total, entries, duration)
+            self._update_modules(modules)
+            self.loading_indicator.visible = False
+            self.app.request_update()
+
+        self.app.background_dialog_runner.run(
+            task_name="log_query",
+            task_func=task,
+            show_progress=False,
+            on_complete=on_complete,
+            priority=TaskPriority.INTERACTIVE,
+            policy=TaskPolicy.REPLACE,
+        )
+
+    def _update_modules(self, modules: list[str]) -> None:
+        if len(self.module_dropdown.options) == len(modules) + 1:
+            return
+        self.module_dropdown.options = [ft.dropdown.Option("", "Все модули")] + \
+                                       [ft.dropdown.Option(module) for module in modules]
+
+    def _show_entries(self, total: int, entries: list[LogEntry], duration: float) -> None:
+        shown = f", показаны последние {len(entries)}" if total > len(entries) else ""
+        self.status_text.value = f"Найдено записей: {total}{shown} ({duration * 1000:.0f} мс)"
+        self.results_list.controls = [self._render_entry(entry) for entry in entries]
+
+    def _render_entry(self, entry: LogEntry) -> ft.Control:
+        color = self.LEVEL_COLORS.get(entry.level, ft.Colors.GREY_700)
+        return ft.ListTile(
+            leading=ft.Text(entry.level, color=color, weight=ft.FontWeight.BOLD, size=12, width=70),
+            title=ft.Text(entry.summary, size=13, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            subtitle=ft.Text(f"{entry.timestamp:%Y-%m-%d %H:%M:%S} • {entry.logger} • {entry.location} • "
+                             f"{entry.function}()", size=11, color=ft.Colors.GREY_500),
+            on_click=lambda e, item=entry: self.show_entry(item),
+            dense=True,
+        )
+
+    @log_exception
+    def show_entry(self, entry: LogEntry):
+        """Диалог с полным текстом записи (включая трассировку исключения)"""
+        dlg = ft.AlertDialog(
+            title=ft.Text(f"{entry.level} {entry.timestamp:%Y-%m-%d %H:%M:%S}"),
+            content=ft.Column([
+                ft.Text(f"{entry.logger} • {entry.location} • {entry.function}() • {entry.source}",
+                        size=12, color=ft.Colors.GREY_600, selectable=True),
+                ft.Text(entry.message, selectable=True, font_family="Consolas", size=12),
+            ], tight=True, scroll=ft.ScrollMode.AUTO, width=800),
+            actions=[ft.TextButton("Закрыть", on_click=lambda e: self.page.close(dlg))],
+        )
+        self.page.open(dlg)
@@ -1,11 +1,11 @@
-import os
-
 import flet as ft
+from datetime import datetime
 from pathlib import Path
 
 from .base_page import BasePage
 from models.project_model import Project
 from services.project_service import ProjectService
+from utils.file_utils import FileUtils
 from utils.logger_config import log_exception
 from components.link_section import LinkSection
 
@@ -28,6 +28,7 @@ class ProjectPage(BasePage):
         # UI компоненты
         self.project_info_card = None
         self.deadline_card = None
+        self.link_section: LinkSection | None = None
         navigation_panel = None
         tools_panel = None
         documents_list = None
@@ -54,6 +55,7 @@ class ProjectPage(BasePage):
             ft.Divider(height=20),
             self.create_link_section(),
             self.create_project_info_card(),
+            self.create_storage_card(),
             self.create_deadline_card(),
         ])
 
@@ -103,18 +105,79 @@ class ProjectPage(BasePage):
                 expand=True
             ), expand=True)     # FIXME: Сделать горизонтальную прокрутку
 
-    def create_link_section(self):
-        project_path = self.project.get_path(
+    def _get_project_path(self) -> Path:
+        return self.project.get_path(
             Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder)
-        try:
-            links = [[name, Path(project_path) / name]
-                     for name in os.listdir(project_path) if (Path(project_path) / name).is_dir()]
-        except FileNotFoundError as e:
-            self.app.show_warning(e)
-            links = []
+
+    def _build_links(self, folder_names: list[str]) -> list[list]:
+        project_path = self._get_project_path()
+        links = [[name, project_path / name] for name in folder_names]
         links.insert(0, [self.project.number, project_path])
-        link_section = LinkSection(self.app).create(title="Быстрый доступ", links=links, is_edit=False)
-        return link_section
+        return links
+
+    def create_link_section(self):
+        """Создание секции быстрого доступа из кэшированного списка папок (без обращения к диску)"""
+        folder_names = self.app.folder_cache_service.get(self._get_project_path()) or []
+        self.link_section = LinkSection(self.app)
+        return self.link_section.create(title="Быстрый доступ", links=self._build_links(folder_names),
+                                        is_edit=False)
+
+    @log_exception
+    def post_show(self):
+        self.refresh_link_section()
+
+    @log_exception
+    def refresh_link_section(self):
+        """Фоновое обновление списка папок и замена ссылок в уже отображённой секции"""
+        project_path = self._get_project_path()
+
+        def task():
+            try:
+                folder_names, changed = self.app.folder_cache_service.refresh(project_path)
+            except FileNotFoundError as e:
+                self.app.show_warning(e)
+                return
+            if changed:
+                self.link_section.set_links(self._build_links(folder_names))
+                self.app.request_update()
+
+        self.app.background_service.start_task(f"project_folders:{project_path}", task)
+
+    @log_exception
+    def create_storage_card(self):
+        """Создание карточки занимаемого места (из сохранённой статистики, без обращения к диску)"""
+        stats = self.app.project_stats_service.get(self.project.path)
+        if stats is None:
+            rows = [ft.Text("Статистика ещё не собрана. Обновите её на главной странице.",
+                            color=ft.Colors.GREY_600)]
+        else:
+            extensions = sorted(stats.extensions.items(), key=lambda item: item[1][1], reverse=True)[:8]
+            rows = [
+                ft.Row([ft.Text("Размер", weight=ft.FontWeight.BOLD),
+                        ft.Text(FileUtils.format_size(stats.total_size))]),
+                ft.Row([ft.Text("Файлов", weight=ft.FontWeight.BOLD), ft.Text(str(stats.files_count))]),
+                ft.Row([ft.Text("Последний изменённый", weight=ft.FontWeight.BOLD),
+                        ft.SelectionArea(ft.Text(stats.last_modified_file or "-"))]),
+                ft.Row([
+                    ft.Text(f"{ext or 'без расширения'}: {count} ({FileUtils.format_size(size)})", size=12)
+                    for ext, (count, size) in extensions
+                ], wrap=True),
+            ]
+            if stats.last_modified_time is not None:
+                rows[2].controls.append(ft.Text(
+                    datetime.fromtimestamp(stats.last_modified_time).strftime("%d.%m.%Y %H:%M"),
+                    color=ft.Colors.GREY_600))
+        return ft.Card(content=ft.Container(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text("Занимаемое место", size=20, weight=ft.FontWeight.BOLD),
+                    ]),
+                    ft.Column(rows),
+                ], spacing=10, alignment=ft.MainAxisAlignment.START),
+                padding=ft.padding.only(left=10, right=10, top=15, bottom=15),
+                border_radius=8,
+                expand=True
+            ), expand=True)
 
     @log_exception
     def create_deadline_card(self):
@@ -1,16 +1,21 @@
-import re
 from pathlib import Path
 
 import flet as ft
 
 from .base_page import BasePage
 from components.banners import BannerDiffProjects
+from components.virtual_list import VirtualList
+from services.background_service import TaskPriority, TaskPolicy
+from services.job_handlers import ProjectManifestJobHandler
 from services.project_service import ProjectService
+from utils.file_utils import FileUtils
 from utils.logger_config import log_exception
+from utils.stall_watchdog import track_stalls
 
 
 class ProjectsPage(BasePage):
     """Страница приложения GeoOffice. Содержит функционал поиска и создания проектов."""
+    HIGHLIGHT_STYLE = ft.TextStyle(weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE)
 
     def __init__(self, app):
         """
@@ -21,18 +26,17 @@ class ProjectsPage(BasePage):
         self.page = None
         self.search_query = ""
         self.results_container = None
-        self.results_list = None
+        self.results_view: VirtualList | None = None
         self.loading_indicator = None
         self.search_field = None
-        self.project_service = ProjectService(self.app.database_service)
-
-        # Пагинация/ленивая загрузка
-        self._all_results: list[tuple] = []  # (project_id, number, name, customer)
-        self._loaded_count: int = 0
-        self._page_size: int = 100
-        self._max_controls: int = 600  # ограничение числа одновременно отрисованных элементов
-        self._is_loading_page: bool = False
+        self.file_search_button = None
+        self._file_search_mode: bool = False
+        self.project_service = ProjectService(self.app.database_service, self.app.storage_path)
+
+        # Результаты: (project_id, number, name, customer) или файлы из индекса
+        self._results_file_mode: bool = False  # режим поиска, в котором получены отображаемые результаты
         self._current_search_id: int = 0
+        self._shown_query: str | None = None  # запрос, для которого отображены результаты
 
     def get_content(self):
         """
@@ -54,17 +58,18 @@ class ProjectsPage(BasePage):
             height=40,
             expand=True
         )
+        self.file_search_button = ft.IconButton(
+            icon=ft.Icons.INSERT_DRIVE_FILE_OUTLINED,
+            selected_icon=ft.Icons.INSERT_DRIVE_FILE,
+            selected=self._file_search_mode,
+            tooltip="Поиск файлов во всех объектах",
+            on_click=self.on_file_search_toggle,
+        )
         self.loading_indicator = ft.ProgressRing(visible=False, width=30, height=30)
 
-        # Контейнер результатов теперь ListView с прокруткой
-        self.results_list = ft.ListView(
-            expand=True,
-            spacing=0,
-            padding=0,
-            auto_scroll=False,
-            on_scroll=self._on_results_scroll,
-        )
-        self.results_container = ft.Container(content=self.results_list, expand=True)
+        # Список результатов с постоянным набором строк, привязываемых к результатам при прокрутке
+        self.results_view = VirtualList(self.app, self._create_row, self._bind_row)
+        self.results_container = ft.Container(content=self.results_view.control, expand=True)
 
         return ft.Column([
             ft.Row([
@@ -84,6 +89,7 @@ class ProjectsPage(BasePage):
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             ft.Row([
                 self.search_field,
+                self.file_search_button,
                 self.loading_indicator
             ], spacing=10, expand=True),
             self.results_container,
@@ -91,137 +97,132 @@ class ProjectsPage(BasePage):
 
     @log_exception
     def post_show(self):
+        # При повторном показе страницы из кэша результаты текущего запроса уже отображены
+        if self._shown_query == self.search_query:
+            return
         self.project_search()
         self.page.update()
 
     @log_exception
+    @track_stalls
     def on_query_change(self, e):
         """
-        Обработчик изменения строкипоиска.
+        Обработчик изменения строки поиска.
+        Поиск откладывается до паузы в наборе (см. ProjectSearchService), поэтому здесь только
+        показывается индикатор загрузки.
         """
         self.search_query = e.control.value
-        self.results_container.content = ft.Text("Поиск...", color=ft.Colors.GREY_500)
-        self.page.update()
         # Увеличиваем идентификатор поиска и запускаем новый
         self._current_search_id += 1
         self.project_search()
 
     @log_exception
-    def _render_items(self, items: list[tuple]) -> list[ft.Control]:
-        controls: list[ft.Control] = []
-        query_text = self.search_query.strip()
-        highlight_re = re.compile(re.escape(query_text), re.IGNORECASE) if query_text else None
-        for project_id, number, name, customer in items:
-            text = f"{number} {name}"
-            icon = ft.Icons.DESCRIPTION
-            display_name = []
-            if highlight_re:
-                last = 0
-                for m in highlight_re.finditer(text):
-                    if m.start() > last:
-                        display_name.append(ft.Text(text[last:m.start()]))
-                    display_name.append(
-                        ft.Text(text[m.start():m.end()], weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE))
-                    last = m.end()
-                if last < len(text):
-                    display_name.append(ft.Text(text[last:]))
-                if not display_name:
-                    display_name = [ft.Text(text)]
-            else:
-                display_name = [ft.Text(text)]
-
-            controls.append(
-                ft.ListTile(
-                    leading=ft.Icon(icon, color=ft.Colors.GREY_700),
-                    title=ft.Row(display_name, spacing=0),
-                    subtitle=ft.Text(customer, size=11, color=ft.Colors.GREY_500),
-                    on_click=lambda e, pid=project_id: self.app.show_project_page(pid),
-                    dense=True,
-                )
-            )
-        return controls
+    @track_stalls
+    def on_file_search_toggle(self, e):
+        """
+        Переключение между поиском объектов и поиском файлов по индексу.
+        """
+        self._file_search_mode = not self._file_search_mode
+        self.file_search_button.selected = self._file_search_mode
+        self.search_field.hint_text = "Имя файла... (.dwg - фильтр по расширению)" \
+            if self._file_search_mode else "Название объекта..."
+        self._current_search_id += 1
+        self.project_search()
 
-    @log_exception
-    def _reset_results(self):
-        self._all_results = []
-        self._loaded_count = 0
-        if isinstance(self.results_container.content, ft.ListView):
-            self.results_container.content.controls.clear()
-        else:
-            self.results_container.content = self.results_list
-        self.page.update()
+    def _create_row(self) -> ft.ListTile:
+        return ft.ListTile(
+            leading=ft.Icon(ft.Icons.DESCRIPTION, color=ft.Colors.GREY_700),
+            title=ft.Text(max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            subtitle=ft.Text(size=11, color=ft.Colors.GREY_500, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            on_click=self._on_row_click,
+            dense=True,
+        )
 
-    @log_exception
-    def _load_next_page(self):
-        if self._loaded_count >= len(self._all_results):
-            return
-        if self._is_loading_page:
+    def _bind_row(self, row: ft.ListTile, item: tuple) -> None:
+        """Заполнение строки списка результатом поиска (объект или файл из индекса)"""
+        row.data = item
+        if self._results_file_mode:
+            project, rel_path, name, size, mtime = item
+            row.leading.name = ft.Icons.INSERT_DRIVE_FILE
+            row.title.value, row.title.spans = name, []
+            row.subtitle.value = f"{project} • {rel_path} • {FileUtils.format_size(size)}"
             return
-        self._is_loading_page = True
-        end = min(self._loaded_count + self._page_size, len(self._all_results))
-        batch = self._all_results[self._loaded_count:end]
-        new_controls = self._render_items(batch)
-        self.results_list.controls.extend(new_controls)
-        self._loaded_count = end
-
-        # Ограничиваем число отрисованных элементов
-        if len(self.results_list.controls) > self._max_controls:
-            trim = len(self.results_list.controls) - self._max_controls
-            del self.results_list.controls[:trim]
-        self._is_loading_page = False
-        self.page.update()
+        project_id, number, name, customer, highlights = item
+        row.leading.name = ft.Icons.DESCRIPTION
+        row.title.value, row.title.spans = None, self._highlight(f"{number} {name}", highlights)
+        row.subtitle.value = customer
+
+    @staticmethod
+    def _highlight(text: str, highlights: tuple[tuple[int, int], ...]) -> list[ft.TextSpan]:
+        """
+        Фрагменты текста с выделением совпадений по смещениям, вычисленным поиском
+        (см. ProjectSearchService.highlight_spans).
+        """
+        spans: list[ft.TextSpan] = []
+        last = 0
+        for start, end in highlights:
+            if start > last:
+                spans.append(ft.TextSpan(text[last:start]))
+            spans.append(ft.TextSpan(text[start:end], ProjectsPage.HIGHLIGHT_STYLE))
+            last = end
+        if last < len(text) or not spans:
+            spans.append(ft.TextSpan(text[last:]))
+        return spans
 
     @log_exception
-    def _on_results_scroll(self, e: ft.OnScrollEvent):
-        # Если докрутили до низа — догружаем следующую порцию (с защитой от повторных вызовов)
-        if e.pixels is not None and e.max_scroll_extent is not None:
-            near_bottom = (e.max_scroll_extent - e.pixels) < 200
-            if near_bottom and not self._is_loading_page:
-                self._load_next_page()
+    def _on_row_click(self, e):
+        if self._results_file_mode:
+            project, rel_path, *_ = e.control.data
+            projects_root = Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder
+            FileUtils.open_in_explorer(str(projects_root / project / rel_path))
+        else:
+            self.app.show_project_page(e.control.data[0])
 
     @log_exception
     def project_search(self):
         """
         Запускает поиск по объектам и обновляет UI с результатами.
         """
-        self.loading_indicator.visible = True
-        self.page.update()
+        if not self.loading_indicator.visible:
+            self.loading_indicator.visible = True
+            self.app.request_update(self.loading_indicator)
 
         empty_result_text = ft.Text("Ничего не найдено")
 
-        if not self.app.database_service.connected:
-            self.results_container.content = empty_result_text
-            self.app.show_error("База данных не подключена")
+        if not self.app.database_service.connected and not self._file_search_mode:
+            if self.app.database_service.connecting:
+                # Страница будет построена заново после подключения (GeoOfficeApp.connect_database)
+                self.results_container.content = ft.Text("Подключение к базе данных...")
+            else:
+                self.results_container.content = empty_result_text
+                self.app.show_error("База данных не подключена")
             self.loading_indicator.visible = False
             self.page.update()
         else:
-            # Останавливаем предыдущую задачу поиска, если она ещё выполняется
-            if "project_search" in self.app.background_service.get_tasks().keys():
-                self.app.background_service.stop_task("project_search")
-
             # Снимок текущего идентификатора поиска
             search_id = self._current_search_id
 
-            # Очистим предыдущие результаты сразу, чтобы не мелькали старые
-            self._reset_results()
+            query = self.search_query
+            file_mode = self._file_search_mode
 
             def task(progress, stop_event):
-                return self.app.database_service.search_project(self.search_query, sorted_from_modified_date=True)
+                if file_mode:
+                    return self.app.file_index_service.search(query)
+                return self.app.project_search_service.search(query, stop_event)
 
-            def on_complete(results: list):
-                # Игнорируем устаревший результат
-                if search_id != self._current_search_id:
+            def on_complete(results: list | None):
+                # Игнорируем устаревший или отменённый результат
+                if results is None or search_id != self._current_search_id:
                     return
-                self._reset_results()
+                self._shown_query = query
+                self._results_file_mode = file_mode
+                self.results_view.set_items(results)
                 if len(results) > 0:
-                    self._all_results = results
-                    # Рендерим первую страницу
-                    self._load_next_page()
-                    self.results_container.content = self.results_list
+                    self.results_container.content = self.results_view.control
                 else:
                     self.results_container.content = empty_result_text
                 self.loading_indicator.visible = False
-                self.page.update()
+                self.app.request_update()
 
             def on_cancel():
                 # Игнорируем устаревшую отмену
@@ -239,10 +240,15 @@ class ProjectsPage(BasePage):
                 show_progress=False,
                 on_cancel=on_cancel,
                 on_complete=on_complete,
+                priority=TaskPriority.INTERACTIVE,
+                # Предыдущий поиск получает сигнал остановки без ожидания его завершения
+                policy=TaskPolicy.REPLACE,
             )
 
     @log_exception
-    def show_diff_projects_result(self, only_in_files, only_in_database):
+    def show_diff_projects_result(self, only_in_files, only_in_database, moved=None):
+        moved = moved or []
+        projects_root = Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder
 
         def find_exist(text):
             self.page.close(dlg)
@@ -267,6 +273,23 @@ class ProjectsPage(BasePage):
             # self.app.project_service.delete_project(project_id)   # TODO: допилить метод `project_service.delete_project`
             self.app.show_warning("Функция в разработке")
 
+        def import_new(text):
+            self.page.close(dlg)
+            project = self.project_service.import_project(projects_root, text)
+            if project is None:
+                self.app.show_warning(f"Маркер объекта `{text}` не содержит данных объекта. "
+                                      f"Создайте проект объекта вручную.")
+                return
+            self.app.project_search_service.update_project(project.id)
+            self.app.show_info(f"Объект {project.number} добавлен в базу данных")
+
+        def apply_move(old_path, new_path, project_id):
+            self.page.close(dlg)
+            self.project_service.move_project(project_id, new_path)
+            self.app.project_search_service.update_project(project_id)
+            self.app.invalidate_pages(("project", project_id))
+            self.app.show_info(f"Путь объекта изменён: `{old_path}` -> `{new_path}`")
+
         content = ft.Container(
             content = ft.Column([
                 ft.Column([
@@ -285,7 +308,7 @@ class ProjectsPage(BasePage):
                                 ft.PopupMenuItem(
                                     icon=ft.Icons.ADD,
                                     text="Добавить в базу данных",
-                                    on_click=lambda e, t=text: self.app.show_warning("Функция в разработке")
+                                    on_click=lambda e, t=text: import_new(t)
                                 ),
                                 ft.PopupMenuItem(
                                     icon=ft.Icons.EDIT,
@@ -326,18 +349,51 @@ class ProjectsPage(BasePage):
                     )
                     for text in only_in_database
                 ] if len(only_in_database) > 0 else [ft.ListTile(title=ft.Text("..."))]),
+                ft.Column([
+                    ft.Text("Перемещены", size=20, weight=ft.FontWeight.BOLD),
+                    ft.Text("Папка объекта была переименована или перенесена. Объект найден по данным "
+                            "маркера папки, необходимо обновить путь в базе данных.",
+                            size=14, weight=ft.FontWeight.W_200),
+                ]),
+                ft.Column([
+                    ft.ListTile(
+                        leading=ft.Icon(ft.Icons.DRIVE_FILE_MOVE),
+                        title=ft.Text(new_path),
+                        subtitle=ft.Text(old_path, size=11, color=ft.Colors.GREY_500),
+                        trailing=ft.IconButton(
+                            icon=ft.Icons.CHECK,
+                            tooltip="Обновить путь",
+                            on_click=lambda e, o=old_path, n=new_path, pid=project_id: apply_move(o, n, pid)
+                        )
+                    )
+                    for old_path, new_path, project_id in moved
+                ] if len(moved) > 0 else [ft.ListTile(title=ft.Text("..."))]),
             ], scroll=ft.ScrollMode.AUTO, expand=True),
         )
         dlg = ft.AlertDialog(content=content,)
         self.page.open(dlg)
 
+    @log_exception
+    def start_manifest_backfill(self, projects: list[list]):
+        """
+        Запуск задания записи манифестов в маркеры проектов, созданных до появления манифестов.
+        Задание продолжается после перезапуска приложения, если было прервано.
+        :param projects: Список [путь проекта, id проекта] из результата проверки различий
+        """
+        projects_root = Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder
+        job_id = self.app.job_queue_service.create_job(
+            ProjectManifestJobHandler.kind, "Запись манифестов проектов",
+            {"projects_root": str(projects_root), "projects": {path: project_id for path, project_id in projects}})
+
+        def on_complete(count):
+            if count is not None:
+                self.app.show_info(f"Записано манифестов проектов: {count}")
+
+        self.app.background_dialog_runner.run_jobs("Запись манифестов проектов", [job_id], on_complete=on_complete)
+
     @log_exception
     def start_diff_project(self):
         """Запуск сравнения проектов с отображением прогресса и возможностью отмены"""
-        # Останавливаем предыдущую задачу, если она существует
-        if "diff_projects" in self.app.background_service.get_tasks().keys():
-            self.app.background_service.stop_task("diff_projects")
-
         projects_root = Path(self.app.settings.paths.file_server) / self.app.settings.paths.projects_folder
 
         def task(progress, stop_event):
@@ -348,24 +404,35 @@ class ProjectsPage(BasePage):
                 return
             count_only_in_files = len(diff.get("only_in_files", []))
             count_only_in_database = len(diff.get("only_in_database", []))
-            text = "Требуется обновление базы данных."
-            if (count_only_in_files + count_only_in_database) > 0:
+            count_moved = len(diff.get("moved", []))
+            without_manifest = diff.get("without_manifest", [])
+            banner = BannerDiffProjects(self.app)
+            lines, actions = [], {}
+            if (count_only_in_files + count_only_in_database + count_moved) > 0:
+                lines.append("Требуется обновление базы данных.")
                 if count_only_in_files > 0:
-                    text += f"\nНет в базе данных: {count_only_in_files}"
+                    lines.append(f"Нет в базе данных: {count_only_in_files}")
                 if count_only_in_database > 0:
-                    text += f"\nНет в файловой системе: {count_only_in_database}"
-                banner = BannerDiffProjects(self.app)
-                banner.create(text,
-                              {
-                                  "Обновить": lambda e: (
-                                      banner.close_banner(e),
-                                      self.show_diff_projects_result(diff["only_in_files"], diff["only_in_database"])
-                                  ),
-                                  "Отмена": banner.close_banner
-                              })
-                banner.show()
-            else:
+                    lines.append(f"Нет в файловой системе: {count_only_in_database}")
+                if count_moved > 0:
+                    lines.append(f"Перемещены: {count_moved}")
+                actions["Обновить"] = lambda e: (
+                    banner.close_banner(e),
+                    self.show_diff_projects_result(diff["only_in_files"], diff["only_in_database"], diff["moved"])
+                )
+            if without_manifest:
+                # Маркеры не изменяются при проверке: манифесты записываются отдельным заданием по запросу
+                lines.append(f"Маркеры без манифеста (созданы в старой версии): {len(without_manifest)}")
+                actions["Записать манифесты"] = lambda e: (
+                    banner.close_banner(e),
+                    self.start_manifest_backfill(without_manifest)
+                )
+            if not actions:
                 self.app.show_info("База данных актуальна")
+                return
+            actions["Отмена"] = banner.close_banner
+            banner.create("\n".join(lines), actions)
+            banner.show()
 
         self.app.background_dialog_runner.run(
             task_name="Проверка различий проектов",
@@ -373,4 +440,6 @@ class ProjectsPage(BasePage):
             show_progress=True,
             on_cancel=lambda: self.app.show_warning("Проверка прервана пользователем"),
             on_complete=on_complete,
+            priority=TaskPriority.BATCH,
+            policy=TaskPolicy.REPLACE,  # повторная проверка останавливает предыдущую
         )
@@ -14,6 +14,9 @@ class SettingsPage(BasePage):
     Страница настроек приложения.
     Позволяет управлять автосохранением, темой, экспортом/импортом данных и сбросом настроек.
     """
+    # Поля страницы отражают текущие настройки, поэтому страница всегда создаётся заново
+    cacheable = False
+
     def __init__(self, app):
         super().__init__(app)
         # Настройка интерфейса
@@ -156,6 +159,7 @@ class SettingsPage(BasePage):
 
         self.dark_mode_switch.value = False
         self._dark_mode_change(None)
+        self.app.invalidate_pages()
 
         self.app.page.update()
 
@@ -194,8 +198,10 @@ class SettingsPage(BasePage):
             self.app.settings.paths.database_path = self.path_database_text_field.value
             self.app.database_service = DatabaseService(self.app.settings.paths.database_path)
             self.app.database_service.connection()
+            self.app.project_search_service.invalidate()
             self.app.save_settings()
         else:
             self.path_database_text_field.error_text = "Неверный путь"
 
+        self.app.invalidate_pages()
         self.app.page.update()
@@ -5,7 +5,8 @@ from pathlib import Path
 import flet as ft
 from .base_page import BasePage
 from ..models.wood_waste_model import Project, Parameters
-from ..services.wood_waste_service.table_extraction import ExtractTable
+from ..services.background_service import TaskPriority
+from ..services.job_handlers import TableExtractionJobHandler
 from ..utils.file_utils import FileUtils
 
 
@@ -200,11 +201,23 @@ class WoodWastePage(BasePage):
     def _extraction_action(self):
         # FIXME: добавить structure в параметры обработки
         # FIXME: добавить выборочную обработку
-        ExtractTable(
-            structure=(("A", 'номер'), ("B", 'порода'), ("C", 'количество'), ("D", 'высота'), ("E", 'диаметр')),
-            input_dir=self.project.project_path / "dxf", output_dir=self.project.project_path / "xls"
-        ).extraction()
-        self._init_project(self.project.project_path)
+        # Разбор DXF - вычислительная задача, поэтому файлы разбираются в пуле процессов.
+        # Извлечение выполняется как задание очереди заданий и продолжается после перезапуска приложения
+        input_dir = self.project.project_path / "dxf"
+        job_id = self.app.job_queue_service.create_job(
+            TableExtractionJobHandler.kind, "Извлечение таблиц",
+            {
+                "structure": [["A", 'номер'], ["B", 'порода'], ["C", 'количество'], ["D", 'высота'],
+                              ["E", 'диаметр']],
+                "input_dir": str(input_dir),
+                "output_dir": str(self.project.project_path / "xls"),
+            },
+            key=f"{TableExtractionJobHandler.kind}:{input_dir}")
+        self.app.background_dialog_runner.run_jobs(
+            "Извлечение таблиц", [job_id],
+            on_complete=lambda count: self._init_project(self.project.project_path),
+            priority=TaskPriority.BATCH,
+        )
 
     def _create_container(self, name: str, title: str):
         exception = Exception('В WoodWastePage._create_container() ожидается "dxf", "xls" или "out".')
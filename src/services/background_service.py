@@ -1,143 +1,731 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import random
 import threading
 import time
-from typing import Dict, Callable, Any
-import flet as ft
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum, IntEnum
+from typing import Dict, Callable, Any, Optional
 
-from utils.logger_config import get_logger, log_exception
+from services.task_future import TaskFuture, ProgressAggregator
+from utils.logger_config import get_logger, log_exception, get_worker_log_queue, setup_worker_logging
 
 logger = get_logger("services.background_service")
 
 
+class TaskPriority(IntEnum):
+    """Класс приоритета задачи: задачи с меньшим значением выбираются из очереди первыми"""
+    INTERACTIVE = 0  # поиск и другие действия, результат которых ждёт пользователь
+    NORMAL = 1
+    BATCH = 2  # сканирование, извлечение таблиц и другие длительные задачи
+
+
+class TaskPolicy(str, Enum):
+    """Политика запуска задачи с именем, под которым уже есть активная задача"""
+    REPLACE = "replace"  # остановить текущую задачу и запустить новую
+    QUEUE = "queue"  # запустить новую после завершения текущей
+    REJECT = "reject"  # не запускать новую
+
+
+def _process_entry(task_func: Callable, args: tuple, progress_queue, stop_event) -> Any:
+    """
+    Точка входа задачи в процессе пула.
+    Передаёт прогресс в родительский процесс через очередь (не чаще 20 раз в секунду).
+    """
+    last_sent = 0.0
+
+    def progress(value: float, message: Optional[str] = None) -> None:
+        nonlocal last_sent
+        now = time.monotonic()
+        if value < 1.0 and message is None and (now - last_sent) < 0.05:
+            return
+        last_sent = now
+        try:
+            progress_queue.put_nowait((value, message))
+        except Exception:
+            pass
+
+    return task_func(progress, stop_event, *args)
+
+
+class TaskRecord:
+    """
+    Запись о фоновой задаче.
+    :param name: Имя задачи
+    :param func: Функция задачи без аргументов
+    :param priority: Класс приоритета
+    :param generation: Номер запуска задачи с этим именем (для отбрасывания устаревших результатов)
+    :param stop_event: Событие остановки (например, общее с TaskFuture)
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+    def __init__(self, name: str, func: Callable, priority: TaskPriority, generation: int = 0,
+                 stop_event: Optional[threading.Event] = None):
+        self.name = name
+        self.generation = generation
+        self.func = func
+        self.priority = priority
+        self.stop_event = stop_event or threading.Event()
+        self.done_event = threading.Event()
+        self.state = self.QUEUED
+        self.submitted_at = time.monotonic()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.thread: threading.Thread | None = None
+        self.batch_slot = False  # занимает ли задача слот пакетных задач пула
+        self.future: TaskFuture | None = None
+        self.progress: float | None = None  # последний сообщённый прогресс [0..1]
+        self.message: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (self.DONE, self.CANCELLED)
+
+    def is_alive(self) -> bool:
+        """Задача ещё не завершена (совместимо с threading.Thread.is_alive)"""
+        return not self.finished
+
+    def __repr__(self):
+        return (f"TaskRecord(name={self.name!r}, generation={self.generation}, "
+                f"priority={self.priority.name}, state={self.state})")
+
+
+class ScheduledTask:
+    """
+    Задача планировщика BackgroundService: отложенная (interval=None) или периодическая.
+    :param name: Имя задачи
+    :param func: Функция задачи без аргументов
+    :param interval: Интервал между запусками (в секундах) или None для однократной задачи
+    :param priority: Класс приоритета запуска в пуле
+    :param jitter: Случайное отклонение времени запуска (доля интервала)
+    :param max_backoff: Максимальная задержка после ошибок (в секундах)
+    """
+
+    def __init__(self, name: str, func: Callable, interval: float | None, priority: TaskPriority,
+                 jitter: float = 0.0, max_backoff: float | None = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.jitter = jitter
+        self.max_backoff = max_backoff or (interval * 8 if interval else 0.0)
+        self.planned = 0.0  # плановое время запуска без учёта случайного отклонения
+        self.due = 0.0  # фактическое время запуска
+        self.runs = 0
+        self.failures = 0
+        self.missed = 0
+        self.cancelled = False
+
+    def __repr__(self):
+        return (f"ScheduledTask(name={self.name!r}, interval={self.interval}, runs={self.runs}, "
+                f"failures={self.failures}, missed={self.missed})")
+
+
 class BackgroundService:
     """
     Сервис для управления фоновыми задачами.
     Предотвращает утечки памяти путем централизованного управления потоками.
+    Задачи выполняются ограниченным пулом потоков с приоритетами: интерактивные задачи выбираются
+    из очереди раньше пакетных, а один поток пула всегда остаётся свободным от пакетных задач.
+    Вычислительные задачи на чистом Python можно выполнить в пуле процессов (run_in_process),
+    чтобы они не удерживали GIL интерфейса.
+    Многошаговые задачи составляются из TaskFuture (submit, then, gather, pipeline): следующий шаг
+    ставится в очередь сразу после предыдущего, прогресс шагов объединяется с весами, а отмена
+    родительской задачи передаётся всем дочерним.
+    Отложенные и периодические задачи обслуживает один поток планировщика с кучей таймеров:
+    он только ставит задачи в пул в назначенное время.
     """
 
-    def __init__(self, app):
-        """Инициализация сервиса фоновых задач"""
+    def __init__(self, app, max_workers: int | None = None):
+        """
+        Инициализация сервиса фоновых задач.
+        :param app: Экземпляр основного приложения
+        :param max_workers: Максимальное количество потоков пула
+        """
         self._app = app
-        self._tasks: Dict[str, threading.Thread] = {}
-        self._stop_events: Dict[str, threading.Event] = {}
+        self._max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._idle_timeout = 60.0
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._waiting: Dict[str, deque[TaskRecord]] = {}
+        self._heap: list[tuple[int, int, TaskRecord]] = []
+        self._seq = itertools.count()
         self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._workers: set[threading.Thread] = set()
+        self._idle_workers = 0
+        self._running_batch = 0
+        self._completed = 0
+        self._generations: Dict[str, int] = {}
+        self._local = threading.local()
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._process_manager = None
+        self._timers: list[tuple[float, int, ScheduledTask]] = []
+        self._scheduled: Dict[str, ScheduledTask] = {}
+        self._timer_cond = threading.Condition()
+        self._scheduler: threading.Thread | None = None
+        self._listeners: list[Callable[[TaskRecord], None]] = []
         logger.info("Инициализирован сервис фоновых задач")
 
-    def get_tasks(self) -> Dict[str, threading.Thread]:
-        return self._tasks
+    def get_tasks(self) -> Dict[str, TaskRecord]:
+        """Активные (ожидающие и выполняющиеся) задачи по именам"""
+        with self._lock:
+            return dict(self._tasks)
+
+    def add_listener(self, listener: Callable[[TaskRecord], None]) -> None:
+        """
+        Подписка на изменения задач: listener(record) вызывается при постановке задачи в очередь,
+        её запуске и завершении в потоке, изменившем задачу, поэтому должен быть быстрым.
+        :param listener: Callable(record: TaskRecord)
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[TaskRecord], None]) -> None:
+        """Отписка от изменений задач"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, record: TaskRecord) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(record)
+            except Exception as e:
+                logger.error(f"Ошибка в обработчике изменений задач: {e}")
+
+    def set_progress(self, value: float, message: Optional[str] = None) -> None:
+        """
+        Сохранить прогресс задачи, выполняющейся в текущем потоке (для монитора задач).
+        :param value: Прогресс [0..1]
+        :param message: Сообщение о ходе выполнения
+        """
+        record = self.current_task()
+        if record is not None:
+            record.progress = value
+            if message is not None:
+                record.message = message
+
+    def current_task(self) -> Optional[TaskRecord]:
+        """Запись задачи, выполняющейся в текущем потоке"""
+        return getattr(self._local, "record", None)
+
+    def current_stop_event(self) -> Optional[threading.Event]:
+        """Событие остановки задачи, выполняющейся в текущем потоке"""
+        record = self.current_task()
+        return record.stop_event if record is not None else None
+
+    def is_current(self, record: TaskRecord) -> bool:
+        """
+        Проверка актуальности задачи: она не остановлена и не заменена более новым запуском с тем же именем.
+        Используется, чтобы отбрасывать результаты устаревших задач.
+        :param record: Запись задачи
+        """
+        return not record.stop_event.is_set() and self._generations.get(record.name) == record.generation
 
-    def start_task(self, task_name: str, task_func: Callable):
+    def start_task(self, task_name: str, task_func: Callable,
+                   priority: TaskPriority = TaskPriority.NORMAL,
+                   policy: TaskPolicy = TaskPolicy.REJECT,
+                   stop_event: Optional[threading.Event] = None,
+                   future: Optional[TaskFuture] = None) -> bool:
+        """
+        Ставит задачу в очередь пула.
+        :param task_name: Имя задачи
+        :param task_func: Функция задачи без аргументов
+        :param priority: Класс приоритета
+        :param policy: Политика при наличии активной задачи с тем же именем
+        :param stop_event: Событие остановки задачи (по умолчанию создаётся новое)
+        :param future: TaskFuture, который отмечается отменённым, если задача снята до выполнения
+        :return: True если задача принята, False если отклонена
+        """
         with self._lock:
-            if task_name in self._tasks and self._tasks[task_name].is_alive():
+            current = self._tasks.get(task_name)
+            if current is not None and not current.finished and policy == TaskPolicy.REJECT:
                 logger.warning(f"Задача {task_name} уже запущена")
                 return False
+            # Поколение выделяется только принятой задаче: отклонённый запуск не делает текущую задачу устаревшей
+            record = TaskRecord(task_name, task_func, priority, self._next_generation_locked(task_name),
+                                stop_event=stop_event)
+            record.future = future
+            if current is not None and not current.finished:
+                if policy == TaskPolicy.QUEUE:
+                    self._waiting.setdefault(task_name, deque()).append(record)
+                    logger.info(f"Задача {task_name} поставлена в очередь за текущей")
+                    return True
+                self._cancel_locked(current)
+            self._tasks[task_name] = record
+            self._enqueue_locked(record)
+
+        logger.info(f"Запущена фоновая задача: {task_name}")
+        self._notify(record)
+        return True
+
+    def _next_generation_locked(self, task_name: str) -> int:
+        generation = self._generations.get(task_name, 0) + 1
+        self._generations[task_name] = generation
+        return generation
+
+    def _enqueue_locked(self, record: TaskRecord) -> None:
+        heapq.heappush(self._heap, (int(record.priority), next(self._seq), record))
+        if self._idle_workers == 0 and len(self._workers) < self._max_workers:
+            worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"BackgroundWorker-{len(self._workers) + 1}")
+            self._workers.add(worker)
+            worker.start()
+        else:
+            self._cond.notify()
+
+    def _next_record_locked(self) -> TaskRecord | None:
+        """Выбор следующей задачи из очереди с учётом лимита пакетных задач"""
+        while self._heap:
+            _, _, record = self._heap[0]
+            if record.finished:
+                heapq.heappop(self._heap)
+                continue
+            if record.stop_event.is_set():
+                # Отменённая задача снимается с очереди без учёта лимита: поток только завершает её запись
+                heapq.heappop(self._heap)
+                return record
+            batch_limit = max(1, self._max_workers - 1)
+            if record.priority == TaskPriority.BATCH and self._running_batch >= batch_limit:
+                return None
+            heapq.heappop(self._heap)
+            return record
+        return None
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                record = self._next_record_locked()
+                while record is None:
+                    self._idle_workers += 1
+                    notified = self._cond.wait(self._idle_timeout)
+                    self._idle_workers -= 1
+                    record = self._next_record_locked()
+                    if record is None and not notified:
+                        self._workers.discard(threading.current_thread())
+                        return
+                record.state = TaskRecord.RUNNING
+                record.started_at = time.monotonic()
+                record.thread = threading.current_thread()
+                if record.priority == TaskPriority.BATCH:
+                    record.batch_slot = True
+                    self._running_batch += 1
+            self._run(record)
+
+    def _run(self, record: TaskRecord) -> None:
+        self._local.record = record
+        self._notify(record)
+        try:
+            if not record.stop_event.is_set():
+                record.func()
+        except Exception as e:
+            logger.exception(f"Ошибка в фоновой задаче {record.name}: {e}")
+        finally:
+            self._local.record = None
+            self._finish(record)
+
+    def _finish(self, record: TaskRecord) -> None:
+        """Завершение задачи: удаление из реестра и запуск следующей задачи с тем же именем"""
+        with self._cond:
+            if record.batch_slot:
+                record.batch_slot = False
+                self._running_batch -= 1
+            record.state = TaskRecord.CANCELLED if record.stop_event.is_set() else TaskRecord.DONE
+            record.finished_at = time.monotonic()
+            self._completed += 1
+            if self._tasks.get(record.name) is record:
+                waiting = self._waiting.get(record.name)
+                if waiting:
+                    following = waiting.popleft()
+                    self._tasks[record.name] = following
+                    self._enqueue_locked(following)
+                else:
+                    del self._tasks[record.name]
+                    self._waiting.pop(record.name, None)
+            self._cond.notify_all()
+            record.done_event.set()
+        if record.future is not None:
+            # Задача, снятая до выполнения или не завершившая свой TaskFuture, считается отменённой
+            record.future.set_cancelled()
+        self._notify(record)
+        logger.debug("Задача %s завершена", record.name)
+
+    def _cancel_locked(self, record: TaskRecord) -> None:
+        """
+        Сигнал остановки задаче. Ещё не начатая задача остаётся в очереди и снимается с неё
+        ближайшим свободным потоком без выполнения, чтобы завершить её TaskFuture.
+        """
+        record.stop_event.set()
 
-            # Создаем событие для остановки
-            stop_event = threading.Event()
-            self._stop_events[task_name] = stop_event
+    def submit(self, task_name: str, task_func: Callable[[Callable[[float, Optional[str]], None], threading.Event], Any],
+               *, priority: TaskPriority = TaskPriority.NORMAL, policy: TaskPolicy = TaskPolicy.QUEUE,
+               progress: Optional[Callable[[float, Optional[str]], None]] = None,
+               future: Optional[TaskFuture] = None) -> TaskFuture:
+        """
+        Ставит задачу в очередь пула и возвращает её TaskFuture.
+        :param task_name: Имя задачи
+        :param task_func: Функция задачи task_func(progress, stop_event) -> результат
+        :param priority: Класс приоритета
+        :param policy: Политика при наличии активной задачи с тем же именем
+        :param progress: Callable(value, message) для получения прогресса
+        :param future: Готовый TaskFuture (используется продолжениями then)
+        :return: TaskFuture задачи; при отклонении задачи он завершается ошибкой RuntimeError
+        """
+        future = future or TaskFuture(self, task_name)
+
+        def report(value: float, message: Optional[str] = None) -> None:
+            self.set_progress(value, message)
+            if progress is not None:
+                progress(value, message)
+
+        def runner():
+            try:
+                result = task_func(report, future.stop_event)
+            except Exception as e:
+                logger.exception(f"Ошибка в фоновой задаче {task_name}: {e}")
+                future.set_exception(e)
+                return
+            if future.stop_event.is_set():
+                future.set_cancelled()
+            else:
+                future.set_result(result)
+
+        if not self.start_task(task_name, runner, priority=priority, policy=policy,
+                               stop_event=future.stop_event, future=future):
+            future.set_exception(RuntimeError(f"Задача {task_name} отклонена"))
+        return future
+
+    def pipeline(self, task_name: str,
+                 steps: list[tuple[float, Callable[[Any, Callable[[float, Optional[str]], None], threading.Event], Any]]],
+                 *, progress: Optional[Callable[[float, Optional[str]], None]] = None,
+                 priority: TaskPriority = TaskPriority.NORMAL) -> TaskFuture:
+        """
+        Последовательная многошаговая задача: каждый шаг ставится в очередь сразу после завершения
+        предыдущего и получает его результат. Прогресс шагов объединяется пропорционально весам.
+        :param task_name: Имя задачи (шаги получают имена task_name[i])
+        :param steps: Список (вес, step_func(previous_result, progress, stop_event)); первый шаг получает None
+        :param progress: Callable(value, message) для общего прогресса
+        :param priority: Класс приоритета шагов
+        :return: TaskFuture всей задачи: результат последнего шага, отмена останавливает все шаги
+        """
+        parent = TaskFuture(self, task_name)
+        aggregator = ProgressAggregator(progress, [weight for weight, _ in steps])
+        future: TaskFuture | None = None
+        for index, (_, step_func) in enumerate(steps):
+            step_name = f"{task_name}[{index}]"
+            if future is None:
+                future = self.submit(step_name, lambda p, s, f=step_func: f(None, p, s),
+                                     priority=priority, progress=aggregator.part(index))
+            else:
+                future = future.then(step_func, step_name, progress=aggregator.part(index), priority=priority)
+            parent.add_child(future)
+        if future is None:
+            parent.set_result(None)
+            return parent
+
+        def on_done(last: TaskFuture) -> None:
+            if last.cancelled():
+                parent.set_cancelled()
+            elif last.exception() is not None:
+                parent.set_exception(last.exception())
+            else:
+                parent.set_result(last.result())
+
+        future.add_done_callback(on_done)
+        return parent
+
+    def _get_process_pool(self) -> tuple[ProcessPoolExecutor, Any]:
+        """Ленивое создание пула процессов и менеджера для очередей прогресса и событий отмены"""
+        with self._lock:
+            if self._process_pool is None:
+                self._process_manager = multiprocessing.Manager()
+                # Процессы пула не открывают файлы журналов, записи передаются в основной процесс
+                self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                         initializer=setup_worker_logging,
+                                                         initargs=(get_worker_log_queue(),))
+                logger.info("Создан пул процессов для вычислительных задач")
+            return self._process_pool, self._process_manager
+
+    @log_exception
+    def run_in_process(self, task_func: Callable, progress: Callable[[float, Optional[str]], None],
+                       stop_event: Optional[threading.Event], *args) -> Any:
+        """
+        Выполняет задачу в пуле процессов, сохраняя контракт task_func(progress, stop_event, *args).
+        Вызывается из потока фоновой задачи и блокирует его до завершения процесса: прогресс
+        пересылается в progress, установка stop_event передаётся в процесс для кооперативной отмены.
+        task_func и args должны сериализоваться pickle (функция уровня модуля).
+        :param task_func: Функция задачи
+        :param progress: Callable(value: float [0..1], message: Optional[str]) в родительском процессе
+        :param stop_event: Событие остановки задачи в родительском процессе
+        :param args: Дополнительные аргументы task_func
+        :return: Результат task_func
+        """
+        pool, manager = self._get_process_pool()
+        progress_queue = manager.Queue()
+        remote_stop_event = manager.Event()
+        future = pool.submit(_process_entry, task_func, args, progress_queue, remote_stop_event)
+
+        def drain(timeout: float | None) -> None:
+            try:
+                value, message = progress_queue.get(timeout=timeout) if timeout else progress_queue.get_nowait()
+                progress(value, message)
+                while True:
+                    value, message = progress_queue.get_nowait()
+                    progress(value, message)
+            except queue.Empty:
+                pass
+
+        while not future.done():
+            if stop_event is not None and stop_event.is_set() and not remote_stop_event.is_set():
+                remote_stop_event.set()
+            drain(timeout=0.1)
+        drain(timeout=None)
+        return future.result()
+
+    def start_process_task(self, task_name: str, task_func: Callable, *args,
+                           progress: Optional[Callable[[float, Optional[str]], None]] = None,
+                           priority: TaskPriority = TaskPriority.BATCH,
+                           policy: TaskPolicy = TaskPolicy.REJECT) -> bool:
+        """
+        Ставит в очередь задачу, которая выполняется в пуле процессов (см. run_in_process).
+        :param task_name: Имя задачи
+        :param task_func: Функция уровня модуля task_func(progress, stop_event, *args)
+        :param progress: Callable(value, message) для получения прогресса
+        :param priority: Класс приоритета
+        :param policy: Политика при наличии активной задачи с тем же именем
+        :return: True если задача принята, False если отклонена
+        """
+        def runner():
+            self.run_in_process(task_func, progress or (lambda value, message=None: None),
+                                self.current_stop_event(), *args)
+
+        return self.start_task(task_name, runner, priority=priority, policy=policy)
+
+    @log_exception
+    def shutdown(self):
+        """Останавливает все задачи и завершает пул процессов"""
+        self.stop_all_tasks()
+        with self._lock:
+            pool, manager = self._process_pool, self._process_manager
+            self._process_pool = self._process_manager = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+    def _schedule_locked(self, task: ScheduledTask, planned: float, jitter: bool = False) -> None:
+        """
+        Постановка задачи в кучу таймеров.
+        :param jitter: Случайно отклонить время запуска (очередной запуск периодической задачи);
+            первый запуск выполняется точно через заданную задержку, и запуск не назначается раньше текущего времени
+        """
+        task.planned = planned
+        spread = task.jitter * (task.interval or 0.0) if jitter else 0.0
+        task.due = max(planned + (random.uniform(-spread, spread) if spread else 0.0), time.monotonic())
+        heapq.heappush(self._timers, (task.due, next(self._seq), task))
+        if self._scheduler is None:
+            self._scheduler = threading.Thread(target=self._scheduler_loop, daemon=True,
+                                               name="BackgroundScheduler")
+            self._scheduler.start()
+        self._timer_cond.notify()
+
+    def _scheduler_loop(self) -> None:
+        while True:
+            with self._timer_cond:
+                while True:
+                    while self._timers and self._timers[0][2].cancelled:
+                        heapq.heappop(self._timers)
+                    if not self._timers:
+                        self._timer_cond.wait()
+                        continue
+                    delay = self._timers[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._timer_cond.wait(delay)
+                _, _, task = heapq.heappop(self._timers)
+            self._dispatch(task)
+
+    def _dispatch(self, task: ScheduledTask) -> None:
+        """Запуск задачи планировщика в пуле"""
+        def runner():
+            try:
+                task.func()
+                task.failures = 0
+            except Exception as e:
+                task.failures += 1
+                logger.error(f"Ошибка в задаче по расписанию {task.name} (подряд: {task.failures}): {e}")
+            finally:
+                task.runs += 1
+                self._reschedule(task)
+
+        if task.interval is None:
+            # Отложенный запуск не теряется: если задача с тем же именем выполняется, он выполнится после неё
+            self.start_task(task.name, runner, priority=task.priority, policy=TaskPolicy.QUEUE)
+        elif not self.start_task(task.name, runner, priority=task.priority, policy=TaskPolicy.REJECT):
+            # Предыдущий запуск периодической задачи ещё выполняется: этот запуск объединяется с ним
+            task.missed += 1
+            self._reschedule(task)
+
+    def _reschedule(self, task: ScheduledTask) -> None:
+        """
+        Планирование следующего запуска после завершения текущего.
+        Пропущенные запуски (долгое выполнение, сон компьютера) объединяются в один немедленный,
+        после ошибок интервал увеличивается вдвое за каждую ошибку подряд, но не больше max_backoff.
+        """
+        with self._timer_cond:
+            if task.cancelled or task.interval is None:
+                if self._scheduled.get(task.name) is task:
+                    del self._scheduled[task.name]
+                return
+            now = time.monotonic()
+            if task.failures:
+                self._schedule_locked(task, now + min(task.interval * 2 ** task.failures, task.max_backoff))
+                return
+            planned = task.planned + task.interval
+            if planned <= now:
+                missed = int((now - planned) // task.interval)
+                if missed:
+                    task.missed += missed
+                    logger.debug("Задача по расписанию %s: объединено пропущенных запусков %s", task.name, missed)
+                planned = now
+            self._schedule_locked(task, planned, jitter=True)
 
-            # Создаем и запускаем поток
-            thread = threading.Thread(target=task_func, daemon=True, name=f"BackgroundTask-{task_name}")
-            self._tasks[task_name] = thread
-            thread.start()
+    def _add_scheduled(self, task: ScheduledTask, delay: float) -> bool:
+        with self._timer_cond:
+            if task.name in self._scheduled:
+                logger.warning(f"Задача {task.name} уже запланирована")
+                return False
+            self._scheduled[task.name] = task
+            self._schedule_locked(task, time.monotonic() + delay)
+        return True
+
+    @log_exception
+    def schedule_once(self, task_name: str, task_func: Callable, delay: float,
+                      priority: TaskPriority = TaskPriority.NORMAL) -> bool:
+        """
+        Запускает задачу в пуле через заданное время.
 
-            logger.info(f"Запущена фоновая задача: {task_name}")
+        :param task_name: Уникальное имя задачи
+        :param task_func: Функция для выполнения
+        :param delay: Задержка перед запуском (в секундах)
+        :param priority: Класс приоритета
+        :return: True если задача запланирована, False если задача с этим именем уже запланирована
+        """
+        if self._add_scheduled(ScheduledTask(task_name, task_func, None, priority), delay):
+            logger.info(f"Запланирована задача {task_name} через {delay:.1f} с")
             return True
+        return False
 
     @log_exception
     def start_periodic_task(self, task_name: str, task_func: Callable,
                             initial_delay: float = 1.0,
-                            interval: float = 30 * 60) -> bool:
+                            interval: float = 30 * 60,
+                            jitter: float = 0.1,
+                            max_backoff: float | None = None,
+                            priority: TaskPriority = TaskPriority.BATCH) -> bool:
         """
         Запускает периодическую задачу.
+        Ожидание выполняет общий поток планировщика, а сама задача выполняется в пуле.
 
         :param task_name: Уникальное имя задачи
         :param task_func: Функция для выполнения
         :param initial_delay: Задержка перед первым запуском (в секундах)
         :param interval: Интервал между выполнениями (в секундах)
+        :param jitter: Случайное отклонение времени запуска (доля интервала), чтобы задачи не совпадали
+        :param max_backoff: Максимальный интервал после ошибок подряд (по умолчанию 8 интервалов)
+        :param priority: Класс приоритета
         :return: True если задача запущена, False если уже запущена
         """
-        with self._lock:
-            if task_name in self._tasks and self._tasks[task_name].is_alive():
-                logger.warning(f"Задача {task_name} уже запущена")
-                return False
-
-            # Создаем событие для остановки
-            stop_event = threading.Event()
-            self._stop_events[task_name] = stop_event
-
-            def periodic_wrapper():
-                """Обертка для периодического выполнения задачи"""
-                try:
-                    # Первоначальная задержка
-                    if stop_event.wait(initial_delay):
-                        return  # Задача остановлена
-
-                    # Первый запуск
-                    task_func()
-
-                    # Периодическое выполнение
-                    while not stop_event.wait(interval):
-                        try:
-                            task_func()
-                        except Exception as e:
-                            logger.error(f"Ошибка в периодической задаче {task_name}: {e}")
-                            # Пауза перед следующей попыткой
-                            if stop_event.wait(60):
-                                break
-
-                except Exception as e:
-                    logger.exception(f"Критическая ошибка в задаче {task_name}: {e}")
-                finally:
-                    logger.debug(f"Задача {task_name} завершена")
-
-            # Создаем и запускаем поток
-            thread = threading.Thread(target=periodic_wrapper, daemon=True, name=f"BackgroundTask-{task_name}")
-            self._tasks[task_name] = thread
-            thread.start()
-
+        task = ScheduledTask(task_name, task_func, interval, priority, jitter, max_backoff)
+        if self._add_scheduled(task, initial_delay):
             logger.info(f"Запущена периодическая задача: {task_name}")
             return True
+        return False
+
+    def get_scheduled_tasks(self) -> Dict[str, ScheduledTask]:
+        """Запланированные (отложенные и периодические) задачи по именам"""
+        with self._timer_cond:
+            return dict(self._scheduled)
 
     @log_exception
     def stop_task(self, task_name: str) -> bool:
         """
-        Останавливает задачу.
+        Останавливает задачу и снимает с очереди ожидающие задачи с тем же именем.
+        Не ждёт завершения: задача получает сигнал остановки и удаляется из реестра своим потоком,
+        поэтому метод можно вызывать из обработчиков интерфейса.
 
         :param task_name: Имя задачи для остановки
-        :return: True если задача остановлена, False если не найдена
+        :return: True если сигнал остановки отправлен, False если задача не найдена
         """
+        with self._timer_cond:
+            scheduled = self._scheduled.pop(task_name, None)
+            if scheduled is not None:
+                # Запись в куче таймеров удаляется потоком планировщика
+                scheduled.cancelled = True
+                self._timer_cond.notify()
         with self._lock:
-            if task_name not in self._tasks:
+            record = self._tasks.get(task_name)
+            if record is None:
+                if scheduled is not None:
+                    logger.info(f"Задача {task_name} снята с расписания")
+                    return True
                 logger.warning(f"Задача {task_name} не найдена")
                 return False
-
+            waiting = list(self._waiting.pop(task_name, ()))
+            for following in waiting:
+                following.stop_event.set()
+                following.state = TaskRecord.CANCELLED
+                following.finished_at = time.monotonic()
+                following.done_event.set()
             # Сигнализируем остановку
-            if task_name in self._stop_events:
-                self._stop_events[task_name].set()
+            self._cancel_locked(record)
+            if record.state == TaskRecord.QUEUED or record.finished:
+                del self._tasks[task_name]
 
-            # Ждем завершения потока (максимум 5 секунд)
-            thread = self._tasks[task_name]
-            thread.join(timeout=5.0)
+        for following in waiting:
+            if following.future is not None:
+                following.future.set_cancelled()
 
-            # Удаляем из словарей
-            del self._tasks[task_name]
-            if task_name in self._stop_events:
-                del self._stop_events[task_name]
-
-            logger.info(f"Задача {task_name} остановлена")
-            return True
+        logger.info(f"Задача {task_name} остановлена")
+        return True
 
     @log_exception
     def stop_all_tasks(self):
         """Останавливает все задачи"""
-        task_names = list(self._tasks.keys())
+        task_names = set(self.get_tasks()) | set(self.get_scheduled_tasks())
         for task_name in task_names:
             self.stop_task(task_name)
         logger.info("Все фоновые задачи остановлены")
 
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Метрики пула: количество потоков, выполняющихся задач и глубина очереди по приоритетам.
+        :return: Словарь с метриками
+        """
+        with self._lock:
+            queued = {priority.name: 0 for priority in TaskPriority}
+            for _, _, record in self._heap:
+                if not record.finished and not record.stop_event.is_set():
+                    queued[record.priority.name] += 1
+            return {
+                "max_workers": self._max_workers,
+                "workers": len(self._workers),
+                "idle_workers": self._idle_workers,
+                "running": sum(1 for r in self._tasks.values() if r.state == TaskRecord.RUNNING),
+                "queued": queued,
+                "waiting": sum(len(q) for q in self._waiting.values()),
+                "completed": self._completed,
+                "scheduled": len(self._scheduled),
+            }
+
     def __del__(self):
         """Деструктор - останавливает все задачи при удалении объекта"""
         try:
-            self.stop_all_tasks()
+            self.shutdown()
         except:
-            pass  # Игнорируем ошибки при удалении
\ No newline at end of file
+            pass  # Игнорируем ошибки при удалении
@@ -1,16 +1,45 @@
+import functools
 from pathlib import Path
-from typing import Any
+from typing import Any, TYPE_CHECKING
 from datetime import datetime
 
-from pony.orm import Database as PonyDatabase, select
-from pony.orm import db_session, desc
-
-from models.database_model import Database
+from utils import tracing
 from utils.logger_config import log_exception, get_logger
 
+if TYPE_CHECKING:
+    from pony.orm import Database as PonyDatabase
+
 logger = get_logger("services.database_service")
 
 
+def _count_query(func):
+    """
+    Учёт обращений к базе данных для монитора в строке состояния (DatabaseService.queries)
+    и интервал трассировки db.<метод>, если трассировка включена.
+    """
+    span_name = f"db.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self.queries += 1
+        with tracing.span(span_name):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+def _db_session(func):
+    """
+    db_session Pony ORM с отложенным импортом: pony импортируется при первом обращении к базе данных
+    (в фоновой задаче подключения), а не при запуске приложения.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        from pony.orm import db_session
+        with db_session:
+            return func(*args, **kwargs)
+    return wrapper
+
+
 class DatabaseService:
     """
     Сервис для работы с базой данных проектов.
@@ -23,25 +52,36 @@ class DatabaseService:
         :param path: Путь к файлу базы данных
         """
         self._path = Path(path)
-        self.db: PonyDatabase | None = None
+        self.db: 'PonyDatabase | None' = None
         self.models: Any = None
         self.connected = False
+        self.connecting = False
+        self.queries = 0
 
     @log_exception
-    @db_session
+    @tracing.traced("db.connection")
+    @_db_session
     def connection(self) -> None:
+        from pony.orm import Database as PonyDatabase
+        from models.database_model import Database
+
         logger.info(f"Инициализация базы данных: {self._path}")
-        self.db = PonyDatabase()
-        self.db.bind(provider='sqlite', filename=str(self._path))
-        # Инициализация моделей
-        self.models = Database(self.db).models
-        # Генерируем схемы таблиц
-        self.db.generate_mapping()
-        self.connected = True
+        self.connecting = True
+        try:
+            self.db = PonyDatabase()
+            self.db.bind(provider='sqlite', filename=str(self._path))
+            # Инициализация моделей
+            self.models = Database(self.db).models
+            # Генерируем схемы таблиц
+            self.db.generate_mapping()
+            self.connected = True
+        finally:
+            self.connecting = False
         logger.info("База данных успешно инициализирована")
 
     @log_exception
-    @db_session
+    @_count_query
+    @_db_session
     def create_project(self, number: str, name: str, customer: str,
                        chief_engineer: str, status: str, address: str, path: str) -> Any:
         """
@@ -65,29 +105,47 @@ class DatabaseService:
             address=address,
             path=path
         )
-        logger.debug(f"Создан новый проект: {project}")
+        logger.debug("Создан новый проект: %s", project)
         return project
 
     @log_exception
-    @db_session
+    @_count_query
+    @_db_session
     def get_project_from_id(self, project_id: int) -> Any:
-        logger.debug(f"Получение проекта по id: id={project_id}")
+        logger.debug("Получение проекта по id: id=%s", project_id)
         return self.models.Project[project_id]
 
     @log_exception
-    @db_session
+    @_count_query
+    @_db_session
     def get_project_from_path(self, path: str | Path) -> Any:
-        logger.debug(f"Получение проекта по пути: path={path}")
+        logger.debug("Получение проекта по пути: path=%s", path)
         return self.models.Project.select_by_sql("SELECT * FROM Объекты WHERE path = $path")[0]
 
     @log_exception
-    @db_session
+    @_count_query
+    @_db_session
+    def update_project_path(self, project_id: int, path: str) -> None:
+        """
+        Изменение пути к папке проекта.
+        :param project_id: id проекта
+        :param path: Новый путь к папке проекта
+        """
+        project = self.models.Project[project_id]
+        logger.debug("Изменение пути проекта id=%s: %s -> %s", project_id, project.path, path)
+        project.path = path
+        project.modified_date = datetime.now()
+
+    @log_exception
+    @_count_query
+    @_db_session
     def get_all_projects(self) -> list[Any]:
-        logger.debug(f"Получение всех проектов")
+        logger.debug("Получение всех проектов")
         return self.models.Project.select()[:]
 
     @log_exception
-    @db_session
+    @_count_query
+    @_db_session
     def search_project(self, query: str, sorted_from_modified_date: bool = False) -> list[Any]:
         """
         Поиск проектов по названию.
@@ -95,6 +153,8 @@ class DatabaseService:
         :param sorted_from_modified_date: Сортировка по времени последнего редактирования
         :return: Список кортежей
         """
+        from pony.orm import desc
+
         query = query.lower()
         if sorted_from_modified_date:
             projects = self.models.Project.select().order_by(desc(self.models.Project.modified_date))[:]
@@ -105,3 +165,27 @@ class DatabaseService:
             if query in f"{project.number.lower()} {project.name.lower()} {project.customer.lower()}":
                 results.append((project.id, project.number, project.name, project.customer))
         return results
+
+    @log_exception
+    @_count_query
+    @_db_session
+    def get_search_documents(self, modified_since: datetime | None = None) -> list[tuple]:
+        """
+        Поля проектов для индекса поиска (ProjectSearchIndex).
+        :param modified_since: Только проекты, изменённые не раньше этого времени (None - все проекты)
+        :return: Список кортежей (project_id, number, name, customer, address, modified_timestamp)
+        """
+        if modified_since is None:
+            projects = self.models.Project.select()[:]
+        else:
+            projects = self.models.Project.select(lambda p: p.modified_date >= modified_since)[:]
+        return [(project.id, project.number, project.name, project.customer, project.address,
+                 project.modified_date.timestamp() if isinstance(project.modified_date, datetime) else 0.0)
+                for project in projects]
+
+    @log_exception
+    @_count_query
+    @_db_session
+    def count_projects(self) -> int:
+        """Количество проектов в базе данных"""
+        return self.models.Project.select().count()
@@ -0,0 +1,156 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.file_index_service")
+
+
+class FileIndexService:
+    """
+    Индекс имён файлов во всех папках проектов.
+    Хранится в SQLite в хранилище приложения и заполняется сканером статистики проектов
+    (см. ProjectStatsService). Поиск по подстроке имени выполняется через триграммы,
+    короткие запросы (меньше трёх символов) - по префиксу имени.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            path TEXT PRIMARY KEY,
+            signature TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            project TEXT NOT NULL,
+            rel_path TEXT NOT NULL,
+            name TEXT NOT NULL,
+            name_lower TEXT NOT NULL,
+            ext TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_project ON files(project);
+        CREATE INDEX IF NOT EXISTS files_name_lower ON files(name_lower);
+        CREATE TABLE IF NOT EXISTS trigrams (
+            tri TEXT NOT NULL,
+            file_id INTEGER NOT NULL,
+            PRIMARY KEY (tri, file_id)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, storage_path: str | Path):
+        """
+        Инициализация индекса.
+        :param storage_path: Папка хранилища приложения
+        """
+        self._db_path = Path(storage_path) / "file_index.db"
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        logger.info("Инициализирован индекс файлов проектов")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def get_signature(self, project_path: str) -> list | None:
+        """
+        Отпечаток папки проекта, с которым проект был проиндексирован.
+        :param project_path: Путь к папке проекта (Project.path)
+        :return: Отпечаток или None, если проект не индексировался
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT signature FROM projects WHERE path = ?", (project_path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @log_exception
+    def replace_project(self, project_path: str, signature: list,
+                        files: list[tuple[str, str, str, int, float]]) -> None:
+        """
+        Заменить записи проекта в индексе.
+        :param project_path: Путь к папке проекта (Project.path)
+        :param signature: Отпечаток папки проекта
+        :param files: Список (относительный путь, имя, расширение, размер, mtime)
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._delete_project(conn, project_path)
+                for rel_path, name, ext, size, mtime in files:
+                    name_lower = name.lower()
+                    cursor = conn.execute(
+                        "INSERT INTO files (project, rel_path, name, name_lower, ext, size, mtime) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (project_path, rel_path, name, name_lower, ext, size, mtime))
+                    conn.executemany("INSERT OR IGNORE INTO trigrams (tri, file_id) VALUES (?, ?)",
+                                     [(tri, cursor.lastrowid) for tri in self._trigrams(name_lower)])
+                conn.execute("INSERT OR REPLACE INTO projects (path, signature) VALUES (?, ?)",
+                             (project_path, json.dumps(signature)))
+
+    @staticmethod
+    def _delete_project(conn: sqlite3.Connection, project_path: str) -> None:
+        conn.execute("DELETE FROM trigrams WHERE file_id IN (SELECT id FROM files WHERE project = ?)",
+                     (project_path,))
+        conn.execute("DELETE FROM files WHERE project = ?", (project_path,))
+        conn.execute("DELETE FROM projects WHERE path = ?", (project_path,))
+
+    @log_exception
+    def retain_projects(self, project_paths: set[str]) -> None:
+        """
+        Удалить из индекса проекты, которых нет в списке.
+        :param project_paths: Актуальные пути проектов
+        """
+        with self._lock:
+            conn = self._connection()
+            indexed = {row[0] for row in conn.execute("SELECT path FROM projects")}
+            with conn:
+                for project_path in indexed - set(project_paths):
+                    self._delete_project(conn, project_path)
+
+    @log_exception
+    def search(self, query: str, limit: int = 500) -> list[tuple[str, str, str, int, float]]:
+        """
+        Поиск файлов по имени во всех проектах.
+        Слова, начинающиеся с точки, считаются фильтром по расширению (например, "план .dwg").
+        :param query: Поисковый запрос
+        :param limit: Максимальное количество результатов
+        :return: Список (путь проекта, относительный путь, имя, размер, mtime), новые файлы первыми
+        """
+        words = query.lower().split()
+        extensions = [w for w in words if w.startswith(".") and len(w) > 1]
+        text = " ".join(w for w in words if w not in extensions)
+        if not text and not extensions:
+            return []
+
+        conditions, params = [], []
+        if len(text) >= 3:
+            trigrams = sorted(self._trigrams(text))
+            conditions.append(
+                f"id IN (SELECT file_id FROM trigrams WHERE tri IN ({','.join('?' * len(trigrams))}) "
+                f"GROUP BY file_id HAVING COUNT(*) = ?)")
+            params.extend(trigrams)
+            params.append(len(trigrams))
+            conditions.append("instr(name_lower, ?) > 0")
+            params.append(text)
+        elif text:
+            conditions.append("name_lower >= ? AND name_lower < ?")
+            params.extend([text, text + "\uffff"])
+        if extensions:
+            conditions.append(f"ext IN ({','.join('?' * len(extensions))})")
+            params.extend(extensions)
+        params.append(limit)
+
+        with self._lock:
+            return self._connection().execute(
+                f"SELECT project, rel_path, name, size, mtime FROM files WHERE {' AND '.join(conditions)} "
+                f"ORDER BY mtime DESC LIMIT ?", params).fetchall()
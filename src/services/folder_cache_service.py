@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.folder_cache_service")
+
+
+class FolderCacheService:
+    """
+    Кэш списков подпапок для страниц объектов.
+    Хранит последние прочитанные списки в порядке LRU и проверяет их актуальность по mtime папки,
+    чтобы повторное открытие объекта не требовало обращений к сетевой папке в потоке интерфейса.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Инициализация кэша.
+        :param max_entries: Максимальное количество папок в кэше
+        """
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, list[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        logger.info("Инициализирован кэш списков папок")
+
+    def get(self, path: str | Path) -> list[str] | None:
+        """
+        Получить список подпапок из кэша без обращения к диску.
+        :param path: Путь к папке
+        :return: Список имён подпапок или None, если папки нет в кэше
+        """
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    @log_exception
+    def refresh(self, path: str | Path) -> tuple[list[str], bool]:
+        """
+        Проверить актуальность кэша по mtime папки и при необходимости перечитать список подпапок.
+        Выполняется в фоновом потоке.
+        :param path: Путь к папке
+        :return: Кортеж (список имён подпапок, признак изменения относительно кэша)
+        :raises FileNotFoundError: Если папка не существует
+        """
+        key = str(path)
+        try:
+            mtime = os.stat(key).st_mtime
+        except FileNotFoundError:
+            self.invalidate(key)
+            raise
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            return list(entry[1]), False
+
+        logger.debug("Чтение списка подпапок: %s", key)
+        with os.scandir(key) as it:
+            names = sorted(e.name for e in it if e.is_dir())
+
+        with self._lock:
+            self._entries[key] = (mtime, names)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        changed = entry is None or entry[1] != names
+        return list(names), changed
+
+    def invalidate(self, path: str | Path | None = None) -> None:
+        """
+        Удалить папку из кэша.
+        :param path: Путь к папке; если не указан, кэш очищается полностью
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(path), None)
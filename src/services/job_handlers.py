@@ -0,0 +1,96 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from services.job_queue_service import JobHandler
+from utils.logger_config import get_logger
+
+logger = get_logger("services.job_handlers")
+
+
+class ProjectStatsJobHandler(JobHandler):
+    """
+    Задание сканирования папок проектов: элемент - путь проекта.
+    Параметры: projects_root, project_paths, force (необязательный, сканировать все проекты).
+    """
+    kind = "project_stats"
+
+    def __init__(self, project_stats_service, workers: int = 8):
+        """
+        :param project_stats_service: ProjectStatsService
+        :param workers: Количество параллельно сканируемых проектов
+        """
+        self._stats_service = project_stats_service
+        self.workers = workers
+
+    def items(self, params: dict[str, Any]) -> list[str]:
+        return list(params["project_paths"])
+
+    def process(self, params: dict[str, Any], item: str, stop_event: threading.Event) -> bool:
+        return self._stats_service.update_project(params["projects_root"], item, stop_event,
+                                                  force=params.get("force", False))
+
+    def finish(self, params: dict[str, Any], results: dict[str, Any]) -> dict[str, Any]:
+        logger.info(f"Статистика проектов обновлена: пересканировано {sum(results.values())} "
+                    f"из {len(params['project_paths'])}")
+        return self._stats_service.finish_scan(params["project_paths"])
+
+
+class ProjectManifestJobHandler(JobHandler):
+    """
+    Задание записи манифестов в маркеры проектов базы данных, созданных до появления манифестов:
+    элемент - путь проекта. Параметры: projects_root, projects ({путь проекта: id проекта}).
+    """
+    kind = "project_manifests"
+
+    def __init__(self, project_service, workers: int = 4):
+        """
+        :param project_service: ProjectService
+        :param workers: Количество параллельно записываемых маркеров
+        """
+        self._project_service = project_service
+        self.workers = workers
+
+    def items(self, params: dict[str, Any]) -> list[str]:
+        return sorted(params["projects"])
+
+    def process(self, params: dict[str, Any], item: str, stop_event: threading.Event) -> str:
+        return self._project_service.backfill_manifest(params["projects_root"], item, params["projects"][item]).uuid
+
+    def finish(self, params: dict[str, Any], results: dict[str, Any]) -> int:
+        # uuid записываются в реестр один раз для всего задания, а не после каждого маркера
+        self._project_service.register_manifests({uuid: params["projects"][path] for path, uuid in results.items()})
+        logger.info(f"Манифесты проектов записаны: {len(results)} из {len(params['projects'])}")
+        return len(results)
+
+
+class TableExtractionJobHandler(JobHandler):
+    """
+    Задание извлечения таблиц из DXF файлов: элемент - имя DXF файла.
+    Каждый файл разбирается в пуле процессов BackgroundService.
+    Параметры: structure, input_dir, output_dir.
+    """
+    kind = "extract_tables"
+
+    def __init__(self, background_service):
+        """
+        :param background_service: BackgroundService
+        """
+        self._background_service = background_service
+        self.workers = os.cpu_count() or 1
+
+    def items(self, params: dict[str, Any]) -> list[str]:
+        return sorted(file.name for file in Path(params["input_dir"]).glob("*.dxf"))
+
+    def process(self, params: dict[str, Any], item: str, stop_event: threading.Event) -> str:
+        # ezdxf и openpyxl импортируются только при извлечении таблиц, а не при запуске приложения
+        from services.wood_waste_service.table_extraction import extract_table_file
+
+        structure = tuple(tuple(column) for column in params["structure"])
+        return self._background_service.run_in_process(
+            extract_table_file, lambda value, message=None: None, stop_event,
+            structure, Path(params["input_dir"]) / item, Path(params["output_dir"]))
+
+    def finish(self, params: dict[str, Any], results: dict[str, Any]) -> int:
+        return len(results)
@@ -0,0 +1,319 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from models.job_model import Job
+from utils import tracing
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.job_queue_service")
+
+
+class JobHandler(ABC):
+    """
+    Обработчик заданий одного вида.
+    Задание делится на элементы (файлы, папки проектов), каждый элемент обрабатывается независимо,
+    поэтому прерванное задание продолжается с первого необработанного элемента.
+    """
+    # Вид задания, под которым обработчик регистрируется в JobQueueService
+    kind = ""
+    # Количество элементов, обрабатываемых параллельно
+    workers = 1
+
+    @abstractmethod
+    def items(self, params: dict[str, Any]) -> list[str]:
+        """
+        Список элементов задания. Вызывается один раз при первом запуске задания.
+        :param params: Параметры задания
+        """
+        pass
+
+    @abstractmethod
+    def process(self, params: dict[str, Any], item: str, stop_event: threading.Event) -> Any:
+        """
+        Обработка одного элемента.
+        :param params: Параметры задания
+        :param item: Элемент
+        :param stop_event: threading.Event для отмены
+        :return: Результат элемента (сериализуется в JSON)
+        """
+        pass
+
+    def finish(self, params: dict[str, Any], results: dict[str, Any]) -> Any:
+        """
+        Завершение задания после обработки всех элементов.
+        :param params: Параметры задания
+        :param results: Результаты успешно обработанных элементов
+        :return: Результат задания
+        """
+        return results
+
+
+class JobQueueService:
+    """
+    Очередь длительных заданий, сохраняемая в SQLite в хранилище приложения.
+    Для каждого задания хранятся параметры, список элементов и отметки об их обработке (контрольные точки),
+    поэтому задание, прерванное закрытием или аварийным завершением приложения, продолжается после
+    перезапуска без повторной обработки готовых элементов.
+    Задание выполняется в фоновой задаче BackgroundService (см. run_job).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            title TEXT NOT NULL,
+            params TEXT NOT NULL,
+            state TEXT NOT NULL,
+            total INTEGER,
+            done INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+        CREATE TABLE IF NOT EXISTS job_items (
+            job_id INTEGER NOT NULL,
+            item TEXT NOT NULL,
+            state TEXT NOT NULL,
+            result TEXT,
+            PRIMARY KEY (job_id, item)
+        ) WITHOUT ROWID;
+    """
+
+    ITEM_PENDING = "pending"
+    ITEM_DONE = "done"
+    ITEM_FAILED = "failed"
+
+    def __init__(self, storage_path: str | Path, commit_interval: float = 0.5, keep_days: int = 30):
+        """
+        Инициализация очереди заданий.
+        :param storage_path: Папка хранилища приложения
+        :param commit_interval: Как часто фиксировать контрольные точки элементов (в секундах)
+        :param keep_days: Сколько дней хранить записи завершённых заданий
+        """
+        self._db_path = Path(storage_path) / "jobs.db"
+        self._commit_interval = commit_interval
+        self._keep_days = keep_days
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._handlers: dict[str, JobHandler] = {}
+        logger.info("Инициализирована очередь заданий")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            self._conn.execute("DELETE FROM jobs WHERE state IN (?, ?, ?) AND updated_at < ?",
+                               (Job.DONE, Job.CANCELLED, Job.FAILED,
+                                time.time() - self._keep_days * 24 * 3600))
+            self._conn.commit()
+        return self._conn
+
+    def register_handler(self, handler: JobHandler) -> None:
+        """
+        Регистрация обработчика заданий.
+        :param handler: Обработчик с заполненным атрибутом kind
+        """
+        self._handlers[handler.kind] = handler
+
+    @staticmethod
+    def _row_to_job(row: tuple) -> Job:
+        job_id, kind, key, title, params, state, total, done, created_at, updated_at, error = row
+        return Job(id=job_id, kind=kind, key=key, title=title, params=json.loads(params), state=state,
+                   total=total, done=done, created_at=created_at, updated_at=updated_at, error=error)
+
+    def get_job(self, job_id: int) -> Job | None:
+        """Задание по идентификатору"""
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_unfinished_jobs(self) -> list[Job]:
+        """Незавершённые задания зарегистрированных видов (для продолжения после перезапуска)"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT * FROM jobs WHERE state IN (?, ?, ?) ORDER BY id",
+                (Job.PENDING, Job.RUNNING, Job.PAUSED)).fetchall()
+        return [job for job in map(self._row_to_job, rows) if job.kind in self._handlers]
+
+    @log_exception
+    def create_job(self, kind: str, title: str, params: dict[str, Any], key: str | None = None) -> int:
+        """
+        Создание задания. Незавершённое задание с тем же ключом отменяется.
+        :param kind: Вид задания
+        :param title: Название задания
+        :param params: Параметры задания (должны сериализоваться в JSON)
+        :param key: Ключ задания (по умолчанию - вид задания)
+        :return: Идентификатор задания
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Нет обработчика заданий вида {kind}")
+        key = key or kind
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                superseded = [row[0] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND state IN (?, ?, ?)",
+                    (key, Job.PENDING, Job.RUNNING, Job.PAUSED))]
+                for old_id in superseded:
+                    self._close_job_locked(conn, old_id, Job.CANCELLED)
+                cursor = conn.execute(
+                    "INSERT INTO jobs (kind, key, title, params, state, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, key, title, json.dumps(params, ensure_ascii=False), Job.PENDING, now, now))
+        logger.info(f"Создано задание {cursor.lastrowid}: {title}")
+        return cursor.lastrowid
+
+    @staticmethod
+    def _close_job_locked(conn: sqlite3.Connection, job_id: int, state: str, error: str | None = None) -> None:
+        """Перевод задания в конечное состояние с удалением контрольных точек элементов"""
+        conn.execute("UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+                     (state, error, time.time(), job_id))
+        conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+
+    @log_exception
+    def cancel_job(self, job_id: int) -> None:
+        """Отмена задания пользователем: задание больше не предлагается продолжить"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._close_job_locked(conn, job_id, Job.CANCELLED)
+        logger.info(f"Задание {job_id} отменено")
+
+    def _prepare_items(self, job: Job, handler: JobHandler) -> list[str]:
+        """
+        Список необработанных элементов; при первом запуске элементы определяются обработчиком.
+        При продолжении задания повторно обрабатываются и элементы, завершившиеся ошибкой
+        (например, недоступная в прошлый раз папка).
+        """
+        if job.total is None:
+            items = handler.items(job.params)
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO job_items (job_id, item, state) VALUES (?, ?, ?)",
+                                     [(job.id, item, self.ITEM_PENDING) for item in items])
+                    conn.execute("UPDATE jobs SET total = ?, done = 0 WHERE id = ?", (len(items), job.id))
+            job.total, job.done = len(items), 0
+            return items
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT item FROM job_items WHERE job_id = ? AND state IN (?, ?)",
+                (job.id, self.ITEM_PENDING, self.ITEM_FAILED)).fetchall()
+        return [row[0] for row in rows]
+
+    def _process_item(self, handler: JobHandler, params: dict[str, Any], item: str,
+                      stop_event: threading.Event) -> tuple[str, Any]:
+        try:
+            with tracing.span(f"job.{handler.kind}.item", item=item):
+                return self.ITEM_DONE, handler.process(params, item, stop_event)
+        except Exception as e:
+            logger.warning(f"Ошибка обработки элемента {item} задания {handler.kind}: {e}")
+            return self.ITEM_FAILED, str(e)
+
+    def _iter_results(self, handler: JobHandler, params: dict[str, Any], items: list[str],
+                      stop_event: threading.Event) -> Iterator[tuple[str, str, Any]]:
+        """Обработка элементов (параллельно, если обработчик это допускает) до отмены"""
+        if handler.workers <= 1:
+            for item in items:
+                if stop_event.is_set():
+                    return
+                yield item, *self._process_item(handler, params, item, stop_event)
+            return
+        with ThreadPoolExecutor(max_workers=handler.workers, thread_name_prefix=f"Job-{handler.kind}") as executor:
+            futures = {executor.submit(self._process_item, handler, params, item, stop_event): item
+                       for item in items}
+            for future in as_completed(futures):
+                if stop_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return
+                yield futures[future], *future.result()
+
+    @log_exception
+    @tracing.traced()
+    def run_job(self, job_id: int, progress: Callable[[float, Optional[str]], None],
+                stop_event: threading.Event) -> Any:
+        """
+        Выполнение или продолжение задания. Вызывается в фоновой задаче.
+        Обработанные элементы отмечаются в базе не реже раза в commit_interval секунд.
+        :param job_id: Идентификатор задания
+        :param progress: Callable(value: float [0..1], message: Optional[str])
+        :param stop_event: threading.Event для отмены; отменённое задание приостанавливается
+        :return: Результат задания (JobHandler.finish) или None, если задание приостановлено
+        """
+        job = self.get_job(job_id)
+        if job is None or not job.unfinished:
+            logger.warning(f"Задание {job_id} не найдено или уже завершено")
+            return None
+        handler = self._handlers[job.kind]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                # Задание могло быть отменено, пока фоновая задача ждала в очереди
+                started = conn.execute(
+                    "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state IN (?, ?, ?)",
+                    (Job.RUNNING, time.time(), job_id, Job.PENDING, Job.RUNNING, Job.PAUSED)).rowcount
+        if not started:
+            return None
+
+        try:
+            items = self._prepare_items(job, handler)
+            done = job.total - len(items)
+            progress(done / job.total if job.total else 0.0, f"{job.title}: {done}/{job.total}")
+            logger.info(f"Задание {job_id} ({job.title}): осталось {len(items)} из {job.total}")
+
+            last_commit = time.monotonic()
+            for item, state, result in self._iter_results(handler, job.params, items, stop_event):
+                if stop_event.is_set():
+                    # Результат элемента, прерванного отменой, не сохраняется
+                    break
+                done += 1
+                now = time.monotonic()
+                with self._lock:
+                    conn.execute("UPDATE job_items SET state = ?, result = ? WHERE job_id = ? AND item = ?",
+                                 (state, json.dumps(result, ensure_ascii=False), job_id, item))
+                    if now - last_commit >= self._commit_interval:
+                        conn.execute("UPDATE jobs SET done = ?, updated_at = ? WHERE id = ?",
+                                     (done, time.time(), job_id))
+                        conn.commit()
+                        last_commit = now
+                progress(done / job.total, f"{job.title}: {done}/{job.total}")
+
+            with self._lock:
+                conn.execute("UPDATE jobs SET done = ?, updated_at = ? WHERE id = ?", (done, time.time(), job_id))
+                if stop_event.is_set():
+                    # Задание, отменённое пользователем (cancel_job), остаётся отменённым
+                    conn.execute("UPDATE jobs SET state = ? WHERE id = ? AND state = ?",
+                                 (Job.PAUSED, job_id, Job.RUNNING))
+                conn.commit()
+            if stop_event.is_set():
+                logger.info(f"Задание {job_id} приостановлено: обработано {done} из {job.total}")
+                return None
+
+            with self._lock:
+                rows = conn.execute("SELECT item, result FROM job_items WHERE job_id = ? AND state = ?",
+                                    (job_id, self.ITEM_DONE)).fetchall()
+            if len(rows) < job.total:
+                logger.warning(f"Задание {job_id} ({job.title}): элементов с ошибкой {job.total - len(rows)}")
+            result = handler.finish(job.params, {item: json.loads(value) for item, value in rows})
+        except Exception as e:
+            with self._lock:
+                with conn:
+                    self._close_job_locked(conn, job_id, Job.FAILED, str(e))
+            raise
+
+        with self._lock:
+            with conn:
+                self._close_job_locked(conn, job_id, Job.DONE)
+        logger.info(f"Задание {job_id} ({job.title}) завершено")
+        return result
@@ -0,0 +1,352 @@
+import bisect
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+from models.log_entry_model import LogEntry
+from utils import tracing
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.log_index_service")
+
+# Заголовок записи detailed_formatter: "время | логгер | уровень | файл:строка | функция() | сообщение"
+HEADER_RE = re.compile(
+    rb"^(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d) \| (\S+) \| ([A-Z]+) *\| ([^|\n]*) \| ([^|\n]*)\(\) \| ",
+    re.MULTILINE)
+LEVELS = {b"DEBUG": 10, b"INFO": 20, b"WARNING": 30, b"ERROR": 40, b"CRITICAL": 50}
+
+
+class _LogFile:
+    """Проиндексированная часть файла журнала: колонки смещений, времени, уровней и логгеров записей"""
+
+    def __init__(self, path: Path, key: tuple):
+        self.path = path
+        self.key = key
+        self.size = 0  # проиндексировано байт (до конца последней полной строки)
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.times = array("d")
+        self.levels = array("B")
+        self.names = array("I")
+        self.hashes = array("q")
+        self.visible = bytearray()  # 0 - копия записи из другого файла журнала
+        self.counts: Counter = Counter()
+        # Непрерывные участки видимых записей [run_starts[k], run_ends[k])
+        self.run_starts = array("Q")
+        self.run_ends = array("Q")
+
+    def set_visible(self, i: int, visible: int) -> None:
+        if i == len(self.visible):
+            self.visible.append(visible)
+        else:
+            self.visible[i] = visible
+        if not visible:
+            return
+        if self.run_ends and self.run_ends[-1] == i:
+            self.run_ends[-1] = i + 1
+        else:
+            self.run_starts.append(i)
+            self.run_ends.append(i + 1)
+
+    def runs(self, lo: int, hi: int):
+        """Участки видимых записей в диапазоне индексов [lo, hi)"""
+        k = bisect.bisect_right(self.run_ends, lo)
+        while k < len(self.run_starts) and self.run_starts[k] < hi:
+            yield max(self.run_starts[k], lo), min(self.run_ends[k], hi)
+            k += 1
+
+
+class LogIndexService:
+    """
+    Индекс журналов приложения для просмотра и поиска (LogsPage).
+    Индексируются все файлы журнала в папке logs, включая ротированные: основной журнал, журнал ошибок
+    и ежедневные журналы. Файлы читаются через отображение в память (mmap), для каждой записи в памяти
+    хранятся только смещение, время, уровень и логгер. Файлы отслеживаются по номеру inode, поэтому после
+    ротации переименованный файл не индексируется заново, а у дописываемого файла индексируются только
+    новые байты. Одна и та же запись попадает в несколько файлов (основной, ежедневный, ошибок) и
+    показывается один раз - из первого по имени файла (основной журнал раньше ежедневных и журнала ошибок),
+    копии в остальных файлах при поиске не читаются. Поиск текста выполняется по байтам отображения
+    порциями, ASCII-символы приводятся к нижнему регистру bytes.lower(), поэтому регулярное выражение
+    для латиницы и цифр остаётся строкой без альтернатив.
+    """
+    CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, log_dir: str | Path, pattern: str = "*.log*"):
+        """
+        :param log_dir: Папка журналов
+        :param pattern: Шаблон имён файлов журнала
+        """
+        self._log_dir = Path(log_dir)
+        self._pattern = pattern
+        self._files: dict[tuple, _LogFile] = {}
+        self._names: list[str] = []
+        self._name_ids: dict[bytes, int] = {}
+        self._max_counts: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_key(path: Path, stat: os.stat_result) -> tuple:
+        return (stat.st_dev, stat.st_ino) if stat.st_ino else (str(path),)
+
+    @log_exception
+    @tracing.traced()
+    def refresh(self) -> bool:
+        """
+        Обновление индекса: новые файлы индексируются, у дописанных индексируются только новые байты,
+        удалённые при ротации файлы исключаются.
+        :return: Индекс изменился
+        """
+        with self._lock:
+            seen = set()
+            changed = removed = False
+            for path in sorted(self._log_dir.glob(self._pattern)):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                key = self._file_key(path, stat)
+                seen.add(key)
+                log_file = self._files.get(key)
+                if log_file is None or stat.st_size < log_file.size:
+                    # Новый файл или файл перезаписан с начала
+                    removed |= log_file is not None
+                    log_file = self._files[key] = _LogFile(path, key)
+                log_file.path = path
+                if stat.st_size > log_file.size:
+                    changed |= self._index_file(log_file)
+
+            for key in set(self._files) - seen:
+                del self._files[key]
+                removed = True
+            if removed:
+                self._rebuild_visibility()
+            return changed or removed
+
+    def _index_file(self, log_file: _LogFile) -> bool:
+        """Индексирование байтов файла, дописанных после предыдущего обновления"""
+        try:
+            with open(log_file.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.rfind(b"\n", log_file.size) + 1
+                if end <= log_file.size:
+                    return False
+                added = self._index_range(log_file, mm, log_file.size, end)
+        except (OSError, ValueError) as e:
+            logger.warning("Не удалось прочитать журнал %s: %s", log_file.path, e)
+            return False
+        log_file.size = end
+        logger.debug("Журнал %s: проиндексировано записей %s", log_file.path.name, added)
+        return True
+
+    def _index_range(self, log_file: _LogFile, mm: mmap.mmap, start: int, end: int) -> int:
+        # Запись продолжается до начала следующей (строки трассировки исключения относятся к записи),
+        # поэтому конец последней записи файла сдвигается при каждом дописывании
+        starts, ends, times, levels, names = (log_file.starts, log_file.ends, log_file.times,
+                                              log_file.levels, log_file.names)
+        previous = len(starts) - 1
+        last_stamp = None
+        timestamp = 0.0
+        added = 0
+        for match in HEADER_RE.finditer(mm, start, end):
+            position = match.start()
+            if previous >= 0:
+                ends[previous] = position
+            stamp = match.group(1, 2, 3, 4, 5, 6)
+            if stamp != last_stamp:
+                last_stamp = stamp
+                timestamp = datetime(*map(int, stamp)).timestamp()
+            name = match.group(7)
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._name_ids[name] = len(self._names)
+                self._names.append(name.decode("utf-8", "replace"))
+            line_end = mm.find(b"\n", match.end(), end)
+            key = hash(mm[position:line_end])
+
+            starts.append(position)
+            ends.append(end)
+            times.append(timestamp)
+            levels.append(LEVELS.get(match.group(8), 0))
+            names.append(name_id)
+            log_file.hashes.append(key)
+            log_file.set_visible(previous + 1, self._count_copy(log_file, key))
+            previous = len(starts) - 1
+            added += 1
+        if added == 0 and previous >= 0:
+            ends[previous] = end
+        return added
+
+    def _count_copy(self, log_file: _LogFile, key: int) -> int:
+        """
+        Учёт копий записи: n-е вхождение записи в файле видимо, только если ни в одном другом файле
+        нет n вхождений той же записи (одинаковые записи одной секунды различаются номером вхождения).
+        """
+        log_file.counts[key] += 1
+        count = log_file.counts[key]
+        if count > self._max_counts.get(key, 0):
+            self._max_counts[key] = count
+            return 1
+        return 0
+
+    def _rebuild_visibility(self) -> None:
+        self._max_counts.clear()
+        for log_file in sorted(self._files.values(), key=lambda item: item.path.name):
+            log_file.counts.clear()
+            del log_file.run_starts[:], log_file.run_ends[:]
+            for i, key in enumerate(log_file.hashes):
+                log_file.set_visible(i, self._count_copy(log_file, key))
+
+    @staticmethod
+    def _text_pattern(text: str) -> re.Pattern:
+        """
+        Регулярное выражение по байтам UTF-8 (после bytes.lower()) для поиска текста без учёта регистра.
+        Варианты регистра не-ASCII символа с общим началом кодировки (кириллица) задаются классом
+        последнего байта, например "о" -> \\xd0[\\x9e\\xbe].
+        """
+        parts = []
+        for char in text:
+            variants = sorted({variant.encode("utf-8").lower() for variant in (char, char.lower(), char.upper())})
+            if len(variants) == 1:
+                parts.append(re.escape(variants[0]))
+            elif len({variant[:-1] for variant in variants}) == 1 and len({len(v) for v in variants}) == 1:
+                parts.append(re.escape(variants[0][:-1]) + b"[" + b"".join(re.escape(v[-1:]) for v in variants) + b"]")
+            else:
+                parts.append(b"(?:" + b"|".join(re.escape(variant) for variant in variants) + b")")
+        return re.compile(b"".join(parts))
+
+    def get_modules(self) -> list[str]:
+        """Имена логгеров из журналов вместе с их родительскими модулями (для фильтра по модулю)"""
+        with self._lock:
+            modules = set()
+            for name in self._names:
+                parts = name.split(".")
+                modules.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+        return sorted(modules)
+
+    def get_stats(self) -> dict:
+        """Файлов, записей и байт в индексе"""
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "entries": sum(log_file.visible.count(1) for log_file in self._files.values()),
+                "bytes": sum(log_file.size for log_file in self._files.values()),
+            }
+
+    @log_exception
+    @tracing.traced()
+    def query(self, since: datetime | None = None, until: datetime | None = None, min_level: int = 0,
+              module: str | None = None, text: str | None = None, limit: int = 500) -> tuple[int, list[LogEntry]]:
+        """
+        Поиск записей журнала. Перед поиском индекс обновляется дописанными байтами.
+        :param since: Начало интервала времени
+        :param until: Конец интервала времени
+        :param min_level: Минимальный уровень (logging.INFO и т.п.)
+        :param module: Имя логгера или родительского модуля ("GeoOffice.services")
+        :param text: Текст для поиска без учёта регистра
+        :param limit: Максимальное количество возвращаемых записей
+        :return: (количество найденных записей, последние найденные записи от новых к старым)
+        """
+        self.refresh()
+        since_ts = since.timestamp() if since is not None else float("-inf")
+        until_ts = until.timestamp() if until is not None else float("inf")
+        pattern = self._text_pattern(text) if text else None
+
+        with self._lock:
+            allowed = None
+            if module:
+                allowed = {i for i, name in enumerate(self._names)
+                           if name == module or name.startswith(module + ".")}
+            total = 0
+            found: list[tuple[float, _LogFile, int]] = []
+            for log_file in self._files.values():
+                times = log_file.times
+                if not times:
+                    continue
+                lo = bisect.bisect_left(times, since_ts)
+                hi = bisect.bisect_right(times, until_ts)
+                if lo >= hi:
+                    continue
+                matches = self._match_file(log_file, lo, hi, since_ts, until_ts, min_level, allowed, pattern, limit)
+                total += matches[0]
+                found.extend((times[i], log_file, i) for i in matches[1])
+
+            found.sort(key=lambda item: item[0], reverse=True)
+            entries = self._read_entries(found[:limit])
+        return total, entries
+
+    def _match_file(self, log_file: _LogFile, lo: int, hi: int, since_ts: float, until_ts: float,
+                    min_level: int, allowed: set | None, pattern: re.Pattern | None,
+                    limit: int) -> tuple[int, deque]:
+        times, levels, names = log_file.times, log_file.levels, log_file.names
+        last: deque = deque(maxlen=limit)
+        total = 0
+
+        def accept(i: int) -> bool:
+            return (since_ts <= times[i] <= until_ts and levels[i] >= min_level
+                    and (allowed is None or names[i] in allowed))
+
+        if pattern is None:
+            for run_lo, run_hi in log_file.runs(lo, hi):
+                for i in range(run_lo, run_hi):
+                    if accept(i):
+                        total += 1
+                        last.append(i)
+            return total, last
+
+        starts, ends = log_file.starts, log_file.ends
+        try:
+            with open(log_file.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for run_lo, run_hi in log_file.runs(lo, hi):
+                    while run_lo < run_hi:
+                        # Порция из целых записей не больше CHUNK_SIZE (но не меньше одной записи)
+                        chunk_hi = bisect.bisect_right(starts, starts[run_lo] + self.CHUNK_SIZE, run_lo + 1, run_hi)
+                        offset = starts[run_lo]
+                        chunk = mm[offset:ends[chunk_hi - 1]].lower()
+                        previous = -1
+                        for match in pattern.finditer(chunk):
+                            i = bisect.bisect_right(starts, offset + match.start(), run_lo, chunk_hi) - 1
+                            if i != previous and accept(i):
+                                total += 1
+                                last.append(i)
+                            previous = i
+                        run_lo = chunk_hi
+        except (OSError, ValueError) as e:
+            logger.warning("Не удалось прочитать журнал %s: %s", log_file.path, e)
+        return total, last
+
+    @staticmethod
+    def _read_entries(found: list[tuple[float, _LogFile, int]]) -> list[LogEntry]:
+        by_file: dict[int, list] = {}
+        for position, (_, log_file, i) in enumerate(found):
+            by_file.setdefault(id(log_file), []).append((position, log_file, i))
+
+        entries: list[LogEntry | None] = [None] * len(found)
+        for items in by_file.values():
+            log_file = items[0][1]
+            try:
+                with open(log_file.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for position, _, i in items:
+                        entries[position] = LogIndexService._parse_entry(
+                            mm[log_file.starts[i]:log_file.ends[i]], log_file.path.name)
+            except (OSError, ValueError) as e:
+                logger.warning("Не удалось прочитать журнал %s: %s", log_file.path, e)
+        return [entry for entry in entries if entry is not None]
+
+    @staticmethod
+    def _parse_entry(data: bytes, source: str) -> LogEntry | None:
+        match = HEADER_RE.match(data)
+        if match is None:
+            return None
+        return LogEntry(
+            timestamp=datetime(*map(int, match.group(1, 2, 3, 4, 5, 6))),
+            level=match.group(8).decode(),
+            logger=match.group(7).decode("utf-8", "replace"),
+            location=match.group(9).decode("utf-8", "replace"),
+            function=match.group(10).decode("utf-8", "replace"),
+            message=data[match.end():].decode("utf-8", "replace").rstrip("\r\n"),
+            source=source,
+        )
@@ -0,0 +1,247 @@
+import heapq
+import re
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+
+from utils.logger_config import get_logger
+
+logger = get_logger("services.project_search_index")
+
+# Раскладки клавиатуры QWERTY/ЙЦУКЕН: "cjcys" -> "сосны", "ыщыты" -> "sosny"
+_LAYOUT_EN = "qwertyuiop[]asdfghjkl;'zxcvbnm,.`"
+_LAYOUT_RU = "йцукенгшщзхъфывапролджэячсмитьбюё"
+_EN_TO_RU = str.maketrans(_LAYOUT_EN, _LAYOUT_RU)
+_RU_TO_EN = str.maketrans(_LAYOUT_RU, _LAYOUT_EN)
+
+# Транслитерация: сначала сочетания букв, затем одиночные буквы
+_LAT_TO_CYR = [("shch", "щ"), ("sch", "щ"), ("zh", "ж"), ("kh", "х"), ("ts", "ц"), ("ch", "ч"), ("sh", "ш"),
+               ("yu", "ю"), ("ya", "я"), ("yo", "е"), ("ye", "е"), ("a", "а"), ("b", "б"), ("v", "в"),
+               ("g", "г"), ("d", "д"), ("e", "е"), ("z", "з"), ("i", "и"), ("y", "ы"), ("k", "к"), ("l", "л"),
+               ("m", "м"), ("n", "н"), ("o", "о"), ("p", "п"), ("r", "р"), ("s", "с"), ("t", "т"), ("u", "у"),
+               ("f", "ф"), ("h", "х"), ("c", "ц"), ("j", "й"), ("w", "в"), ("x", "кс"), ("q", "к")]
+_LAT_TO_CYR_RE = re.compile("|".join(latin for latin, _ in _LAT_TO_CYR))
+_LAT_TO_CYR_MAP = dict(_LAT_TO_CYR)
+_CYR_TO_LAT = str.maketrans({"а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z",
+                             "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+                             "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+                             "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya"})
+_LATIN_RE = re.compile("[a-z]")
+_CYRILLIC_RE = re.compile("[а-я]")
+_SEPARATORS_RE = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, "ё" -> "е", разделители (пробелы, дефисы, точки) -> один пробел"""
+    return _SEPARATORS_RE.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+def query_variants(query: str) -> list[str]:
+    """
+    Варианты запроса: исходный, набранный в другой раскладке и транслитерированный.
+    :param query: Нормализованный запрос
+    :return: Варианты без повторов, исходный первым
+    """
+    variants = [query]
+    if _LATIN_RE.search(query):
+        variants.append(normalize(query.translate(_EN_TO_RU)))
+        variants.append(_LAT_TO_CYR_RE.sub(lambda m: _LAT_TO_CYR_MAP[m.group()], query))
+    if _CYRILLIC_RE.search(query):
+        variants.append(normalize(query.translate(_RU_TO_EN)))
+        variants.append(query.translate(_CYR_TO_LAT))
+    return list(dict.fromkeys(variant for variant in variants if variant))
+
+
+def _grams(text: str, complete: bool = True) -> set[str]:
+    """
+    Триграммы слов текста с пробелом по краям слова (" со", "сос", ..., "ны ").
+    :param complete: Последнее слово завершено; иначе оно считается началом слова (запрос при наборе)
+    """
+    grams = set()
+    words = text.split()
+    for i, word in enumerate(words):
+        padded = f" {word} " if complete or i < len(words) - 1 else f" {word}"
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class _Document:
+    __slots__ = ("id", "number", "name", "customer", "modified", "title", "fields", "words", "text", "grams")
+
+    def __init__(self, project_id: int, number: str, name: str, customer: str, address: str, modified: float):
+        self.id = project_id
+        self.number = number
+        self.name = name
+        self.customer = customer
+        self.modified = modified
+        self.title = normalize(f"{number} {name}")
+        self.fields = (self.title, normalize(customer), normalize(address))
+        self.words = self.title.split()
+        self.text = f"{self.title} {self.fields[1]}"  # номер, название и заказчик для поиска по вхождению
+        self.grams = frozenset(_grams(" ".join(self.fields)))
+
+    def result(self) -> tuple:
+        return self.id, self.number, self.name, self.customer
+
+
+class ProjectSearchIndex:
+    """
+    Индекс объектов в памяти для ранжированного нечёткого поиска по номеру, названию, заказчику и адресу.
+    Запрос раскладывается на триграммы слов; кандидаты отбираются по редким триграммам запроса
+    (частые, вроде " ул", почти не различают объекты) и оцениваются долей общих триграмм с бонусами
+    за точное вхождение и начало слова в номере или названии. Допускаются опечатки, другой порядок слов,
+    неверная раскладка клавиатуры ("cjcys" -> "сосны") и транслитерация. Лучшие результаты выбираются
+    ограниченной кучей (heapq.nlargest), объекты добавляются и обновляются по одному.
+    """
+    FIELD_BONUS = (1.0, 0.5, 0.4)  # точное вхождение запроса: номер и название, заказчик, адрес
+    PREFIX_BONUS = 0.2  # слово запроса - начало слова номера или названия
+    MIN_OVERLAP = 0.34  # минимальная доля общих триграмм без точного вхождения
+    RELATIVE_CUT = 0.4  # результаты с оценкой ниже доли от лучшей отбрасываются
+
+    def __init__(self):
+        self._docs: dict[int, _Document] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._recent: list[tuple] | None = None  # все объекты от новых к старым (пустой запрос)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, projects: Iterable[tuple]) -> None:
+        """
+        Построение индекса заново.
+        :param projects: Кортежи (project_id, number, name, customer, address, modified_timestamp)
+        """
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            for project in projects:
+                self._add(_Document(*project))
+            self._recent = None
+        logger.info("Индекс поиска объектов построен: объектов %s, триграмм %s", len(self._docs), len(self._postings))
+
+    def update(self, project: tuple) -> None:
+        """
+        Добавление или обновление объекта.
+        :param project: Кортеж (project_id, number, name, customer, address, modified_timestamp)
+        """
+        with self._lock:
+            self._remove(project[0])
+            self._add(_Document(*project))
+            self._recent = None
+
+    def remove(self, project_id: int) -> None:
+        """Удаление объекта из индекса"""
+        with self._lock:
+            self._remove(project_id)
+            self._recent = None
+
+    def _add(self, doc: _Document) -> None:
+        self._docs[doc.id] = doc
+        for gram in doc.grams:
+            self._postings.setdefault(gram, set()).add(doc.id)
+
+    def _remove(self, project_id: int) -> None:
+        doc = self._docs.pop(project_id, None)
+        if doc is None:
+            return
+        for gram in doc.grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(project_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 200,
+               stop_event: Optional[threading.Event] = None) -> list[tuple] | None:
+        """
+        Ранжированный поиск.
+        :param query: Поисковый запрос
+        :param limit: Максимальное количество результатов (пустой запрос - все объекты)
+        :param stop_event: Событие остановки поиска
+        :return: Кортежи (project_id, number, name, customer) от лучших к худшим или None, если поиск остановлен
+        """
+        query = normalize(query)
+        with self._lock:
+            if not query:
+                if self._recent is None:
+                    self._recent = [doc.result() for doc in
+                                    sorted(self._docs.values(), key=lambda doc: doc.modified, reverse=True)]
+                return list(self._recent)
+
+            if len(query) < 3:
+                return self._search_substring(query_variants(query), limit)
+
+            variants = [(variant, _grams(variant, complete=False)) for variant in query_variants(query)]
+
+            candidates = self._candidates(variants, max(2 * limit, 100))
+            if stop_event is not None and stop_event.is_set():
+                return None
+            scored = []
+            for doc_id, k in candidates.items():
+                doc = self._docs[doc_id]
+                score = self._score(doc, *variants[k])
+                if score > 0:
+                    scored.append((score, doc.modified, doc_id))
+            best = heapq.nlargest(limit, scored)
+            if not best:
+                return []
+            cut = best[0][0] * self.RELATIVE_CUT
+            return [self._docs[doc_id].result() for score, _, doc_id in best if score >= cut]
+
+    def _search_substring(self, variants: list[str], limit: int) -> list[tuple]:
+        """
+        Поиск коротких запросов ("ш", "24", "ос") по вхождению в номер, название и заказчика, в том числе
+        в середине слова: у таких запросов нет триграмм. Сначала объекты с вхождением исходного запроса,
+        затем других вариантов (раскладка, транслитерация), внутри - от изменённых последними.
+        """
+        results: list[tuple] = []
+        seen: set[int] = set()
+        for variant in variants:
+            if len(results) >= limit:
+                break
+            found = [doc for doc in self._docs.values() if variant in doc.text and doc.id not in seen]
+            for doc in heapq.nlargest(limit - len(results), found, key=lambda doc: doc.modified):
+                seen.add(doc.id)
+                results.append(doc.result())
+        return results
+
+    def _candidates(self, variants: list[tuple[str, set[str]]], count: int) -> dict[int, int]:
+        """
+        Объекты с наибольшим числом общих редких триграмм с вариантами запроса.
+        :return: Словарь {project_id: индекс варианта запроса с наибольшей долей общих триграмм}
+        """
+        best: dict[int, tuple[float, int]] = {}
+        frequent = max(len(self._docs) // 5, 50)
+        for k, (_, grams) in enumerate(variants):
+            postings = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+            if not postings:
+                continue
+            # Частые триграммы учитываются, только если редких в запросе нет
+            selected = [posting for posting in postings if len(posting) <= frequent] or postings[:2]
+            counts: Counter = Counter()
+            for posting in selected:
+                counts.update(posting)
+            # При равном числе общих триграмм предпочитаются изменённые последними, как и при ранжировании
+            docs = self._docs
+            top = heapq.nlargest(count, counts.items(), key=lambda item: (item[1], docs[item[0]].modified, item[0]))
+            for doc_id, common in top:
+                ratio = common / len(selected)
+                if doc_id not in best or ratio > best[doc_id][0]:
+                    best[doc_id] = (ratio, k)
+        return {doc_id: k for doc_id, (_, k) in best.items()}
+
+    def _score(self, doc: _Document, variant: str, grams: set[str]) -> float:
+        if not grams:
+            return 0.0
+        overlap = len(grams & doc.grams) / len(grams)
+        bonus = 0.0
+        for field, field_bonus in zip(doc.fields, self.FIELD_BONUS):
+            if variant in field:
+                bonus = max(bonus, field_bonus)
+        if bonus == 0.0 and overlap < self.MIN_OVERLAP:
+            return 0.0
+        for word in variant.split():
+            if any(doc_word.startswith(word) for doc_word in doc.words):
+                bonus += self.PREFIX_BONUS
+        return overlap + bonus
@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.project_search_index import ProjectSearchIndex, normalize, query_variants
+from utils import tracing
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.project_search_service")
+
+
+class ProjectSearchService:
+    """
+    Конвейер поиска объектов для строки поиска.
+    Откладывает запрос на время набора текста (debounce) и ищет по индексу ProjectSearchIndex в памяти:
+    индекс строится из базы данных при первом поиске, затем дополняется проектами, изменёнными с момента
+    последней проверки (не чаще раза в refresh секунд), и изменениями из интерфейса (update_project).
+    Вместе с результатами в фоновом потоке вычисляются фрагменты заголовка "номер название",
+    совпадающие со словами запроса, поэтому интерфейсу остаётся только отрисовать выделение.
+    """
+
+    def __init__(self, app, debounce: float = 0.25, refresh: float = 30.0, limit: int = 200):
+        """
+        Инициализация конвейера поиска.
+        :param app: Экземпляр основного приложения (используется app.database_service)
+        :param debounce: Пауза после последнего изменения запроса перед поиском (в секундах)
+        :param refresh: Интервал проверки изменений проектов в базе данных (в секундах)
+        :param limit: Максимальное количество результатов непустого запроса
+        """
+        self._app = app
+        self._debounce = debounce
+        self._refresh = refresh
+        self._limit = limit
+        self._index = ProjectSearchIndex()
+        self._lock = threading.Lock()
+        self._built = False
+        self._checked_at = 0.0  # time.monotonic() последней проверки базы данных
+        self._modified_since: datetime | None = None  # время последней проверки базы данных
+        self.hits = 0
+        self.misses = 0
+        logger.info("Инициализирован конвейер поиска объектов")
+
+    @staticmethod
+    def highlight_spans(words: list[str], text: str) -> tuple[tuple[int, int], ...]:
+        """
+        Непересекающиеся вхождения слов запроса в текст без учёта регистра.
+        :param words: Слова запроса в нижнем регистре
+        :param text: Текст
+        :return: Кортеж (начало, конец) вхождений по возрастанию
+        """
+        lowered = text.lower().replace("ё", "е")
+        if not words or len(lowered) != len(text):
+            # Смещения нижнего регистра не совпадают с исходным текстом (редкие символы) - без выделения
+            return ()
+        found = []
+        for word in words:
+            start = lowered.find(word)
+            while start >= 0:
+                found.append((start, start + len(word)))
+                start = lowered.find(word, start + len(word))
+        spans: list[tuple[int, int]] = []
+        for start, end in sorted(found):
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+            else:
+                spans.append((start, end))
+        return tuple(spans)
+
+    def _with_spans(self, query: str, results: list[tuple]) -> list[tuple]:
+        # Выделяются слова того варианта запроса (раскладка, транслитерация), который есть в заголовке
+        variants = [variant.split() for variant in query_variants(normalize(query))]
+        with_spans = []
+        for project_id, number, name, customer in results:
+            title = f"{number} {name}"
+            spans = ()
+            for words in variants:
+                spans = self.highlight_spans(words, title)
+                if spans:
+                    break
+            with_spans.append((project_id, number, name, customer, spans))
+        return with_spans
+
+    @log_exception
+    @tracing.traced()
+    def search(self, query: str, stop_event: Optional[threading.Event] = None) -> list[tuple] | None:
+        """
+        Поиск объектов. Вызывается в фоновой задаче.
+        :param query: Поисковый запрос
+        :param stop_event: Событие остановки задачи (новый символ в строке поиска)
+        :return: Список кортежей (project_id, number, name, customer, spans) от лучших к худшим (пустой
+            запрос - все объекты от изменённых последними) или None, если поиск отменён,
+            spans - смещения (начало, конец) совпадений с запросом в строке f"{number} {name}"
+        """
+        if stop_event is not None and stop_event.wait(self._debounce):
+            return None
+        self._sync()
+        results = self._index.search(query, self._limit, stop_event)
+        if results is None:
+            return None
+        return self._with_spans(query, results)
+
+    @log_exception
+    def warm_up(self) -> None:
+        """Построение индекса в фоновой задаче после подключения к базе данных, до первого поиска"""
+        self._sync()
+
+    def _sync(self) -> None:
+        """Построение индекса при первом поиске и загрузка изменённых проектов не чаще раза в refresh секунд"""
+        with self._lock:
+            if self._built and time.monotonic() - self._checked_at < self._refresh:
+                self.hits += 1
+                return
+            self.misses += 1
+            # Запас на изменения, сохранённые во время проверки, и на точность времени в базе данных
+            checked = datetime.now() - timedelta(seconds=1)
+            with tracing.span("project_search.sync"):
+                if not self._built:
+                    self._index.build(self._app.database_service.get_search_documents())
+                else:
+                    for project in self._app.database_service.get_search_documents(self._modified_since):
+                        self._index.update(project)
+                    if self._app.database_service.count_projects() != len(self._index):
+                        # Удалённые проекты не видны по времени изменения
+                        logger.debug("Количество проектов изменилось, перестроение индекса поиска")
+                        self._index.build(self._app.database_service.get_search_documents())
+            self._built = True
+            self._checked_at = time.monotonic()
+            self._modified_since = checked
+
+    @log_exception
+    def update_project(self, project_id: int) -> None:
+        """
+        Добавление или обновление проекта в индексе (после импорта или перемещения проекта).
+        :param project_id: id проекта
+        """
+        with self._lock:
+            if not self._built:
+                return
+        project = self._app.database_service.get_project_from_id(project_id)
+        modified = project.modified_date.timestamp() if isinstance(project.modified_date, datetime) else 0.0
+        self._index.update((project.id, project.number, project.name, project.customer, project.address, modified))
+
+    def remove_project(self, project_id: int) -> None:
+        """Удаление проекта из индекса"""
+        self._index.remove(project_id)
+
+    def invalidate(self) -> None:
+        """Перестроить индекс при следующем поиске (после смены базы данных)"""
+        with self._lock:
+            self._built = False
+            self._modified_since = None
@@ -1,15 +1,18 @@
 import os
 import re
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 import json
 
+from models.project_manifest_model import MARKER_NAME, ProjectManifest
 from models.project_model import Project
-from services.database_service import DatabaseService
 from utils.file_utils import FileUtils
 from utils.logger_config import log_exception, get_logger
 
+if TYPE_CHECKING:
+    from services.database_service import DatabaseService
+
 logger = get_logger("services.project_service")
 
 
@@ -19,9 +22,14 @@ class ProjectService:
     Обеспечивает загрузку, сохранение, поиск и управление данными проектов.
     """
     
-    def __init__(self, database_service: DatabaseService):
-        """Инициализация сервиса проектов"""
+    def __init__(self, database_service: 'DatabaseService', storage_path: str | Path | None = None):
+        """
+        Инициализация сервиса проектов.
+        :param database_service: Сервис базы данных
+        :param storage_path: Папка хранилища приложения (реестр uuid манифестов для поиска перемещённых проектов)
+        """
         self.database_service = database_service
+        self._registry_file = Path(storage_path) / "project_manifests.json" if storage_path else None
         logger.info(f"Инициализирован сервис проектов.")
 
     @log_exception
@@ -36,33 +44,154 @@ class ProjectService:
         project_data['modified_date'] = datetime.fromisoformat(project_data['modified_date'])
         return Project(**project_data)
 
+    @staticmethod
     @log_exception
-    def diff_projects(self, projects_dirpath: str | Path) -> dict[str, list[str]]:
+    def read_manifest(project_dir: str | Path) -> ProjectManifest | None:
         """
-        Сканирование директории проектов и определение наличия проектов в базе данных.
-        :return: ...
+        Чтение манифеста из маркера папки проекта.
+        :param project_dir: Папка проекта
+        :return: Манифест или None, если маркер пустой (старый формат) или отсутствует
+        """
+        try:
+            text = (Path(project_dir) / MARKER_NAME).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Не удалось прочитать маркер проекта {project_dir}: {e}")
+            return None
+        return ProjectManifest.from_text(text)
+
+    @staticmethod
+    @log_exception
+    def write_manifest(project_dir: str | Path, manifest: ProjectManifest) -> None:
+        """
+        Запись манифеста в маркер папки проекта.
+        :param project_dir: Папка проекта
+        :param manifest: Манифест проекта
         """
+        (Path(project_dir) / MARKER_NAME).write_text(manifest.to_json(), encoding="utf-8")
+        logger.debug("Записан манифест проекта: %s", project_dir)
 
-        projects_in_files = []
+    def _load_registry(self) -> dict[str, int]:
+        """Реестр {uuid манифеста: id проекта} из хранилища приложения"""
+        if self._registry_file is None:
+            return {}
+        return (FileUtils.load_json(self._registry_file) or {}).get("projects", {})
 
-        if not isinstance(projects_dirpath, Path):
-            projects_dirpath = Path(projects_dirpath)
+    def _save_registry(self, registry: dict[str, int]) -> None:
+        if self._registry_file is not None:
+            FileUtils.save_json({"projects": registry}, self._registry_file)
+
+    def register_manifests(self, projects: dict[str, int]) -> None:
+        """
+        Запомнить uuid манифестов проектов базы данных в реестре.
+        :param projects: Словарь {uuid манифеста: id проекта}
+        """
+        registry = self._load_registry()
+        changed = {uuid: project_id for uuid, project_id in projects.items() if registry.get(uuid) != project_id}
+        if changed:
+            registry.update(changed)
+            self._save_registry(registry)
+
+    def _register(self, manifest: ProjectManifest) -> None:
+        """Запомнить uuid манифеста проекта базы данных в реестре"""
+        self.register_manifests({manifest.uuid: manifest.project_id})
+
+    @log_exception
+    def backfill_manifest(self, projects_root: str | Path, path: str, project_id: int) -> ProjectManifest:
+        """
+        Запись манифеста в маркер проекта базы данных, созданного до появления манифестов
+        (пустой маркер или манифест без id этого проекта). uuid существующего манифеста сохраняется.
+        Выполняется заданием очереди заданий (ProjectManifestJobHandler), а не при проверке различий.
+        :param projects_root: Корень каталога проектов
+        :param path: Путь к папке проекта (относительно каталога проектов)
+        :param project_id: id проекта
+        :return: Манифест маркера (записанный или уже содержащий id проекта)
+        """
+        project_dir = Path(projects_root) / path
+        manifest = self.read_manifest(project_dir)
+        if manifest is not None and manifest.project_id == project_id:
+            return manifest
+        project = self.database_service.get_project_from_id(project_id)
+        backfilled = ProjectManifest(number=project.number, name=project.name, customer=project.customer,
+                                     status=project.status, project_id=project.id)
+        if manifest is not None:
+            backfilled.uuid = manifest.uuid
+        self.write_manifest(project_dir, backfilled)
+        return backfilled
+
+    def _compare_with_database(self, manifests: dict[str, ProjectManifest | None]) -> dict[str, Any]:
+        """
+        Сравнение найденных в файловой системе проектов с базой данных. Маркеры проектов не изменяются:
+        проекты базы данных без манифеста (созданные до появления манифестов) возвращаются в without_manifest,
+        а uuid манифестов проектов базы данных запоминается в реестре хранилища приложения.
+        Папка, которой нет в базе данных, считается перемещённым проектом, если uuid её манифеста
+        известен по реестру (или манифест ссылается на id проекта), а прежний путь проекта не найден.
+        Папка с uuid проекта, найденного на своём месте, - копия, а не перемещение.
+        :param manifests: Манифесты по путям папок проектов (относительно каталога проектов)
+        :return: Словарь с результатами сравнения; without_manifest - список [путь, id проекта]
+        """
+        projects = {p.path: p for p in list(self.database_service.get_all_projects())}
+        paths_by_id = {project.id: path for path, project in projects.items()}
+        projects_in_files = set(manifests)
+        in_files_and_database = projects_in_files & set(projects)
 
-        for item in projects_dirpath.rglob(".geo_office_project"):
-            projects_in_files.append(item.parent.relative_to(projects_dirpath))
+        registry = self._load_registry()
+        registry_changed = False
+        uuids_in_place = set()
+        without_manifest = []
+        for path in sorted(in_files_and_database):
+            project, manifest = projects[path], manifests[path]
+            if manifest is not None:
+                uuids_in_place.add(manifest.uuid)
+            if manifest is None or manifest.project_id != project.id:
+                without_manifest.append([path, project.id])
+                continue
+            if registry.get(manifest.uuid) != project.id:
+                registry[manifest.uuid] = project.id
+                registry_changed = True
+        if registry_changed:
+            self._save_registry(registry)
 
-        projects_in_files = set([str(path) for path in projects_in_files])
-        projects_in_database = set(p.path for p in list(self.database_service.get_all_projects()))
+        only_in_files = projects_in_files - set(projects)
+        only_in_database = set(projects) - projects_in_files
+        moved = []
+        for new_path in sorted(only_in_files):
+            manifest = manifests[new_path]
+            if manifest is None or manifest.uuid in uuids_in_place:
+                continue
+            project_id = registry.get(manifest.uuid, manifest.project_id)
+            old_path = paths_by_id.get(project_id)
+            if old_path in only_in_database:
+                moved.append([old_path, new_path, project_id])
+                only_in_database.discard(old_path)
+        only_in_files -= {new_path for _, new_path, _ in moved}
 
         return {
-            "only_in_files": list(projects_in_files - projects_in_database),
-            "only_in_database": list(projects_in_database - projects_in_files),
-            "in_files_and_database": list(projects_in_files & projects_in_database)
+            "only_in_files": list(only_in_files),
+            "only_in_database": list(only_in_database),
+            "in_files_and_database": list(in_files_and_database),
+            "moved": moved,
+            "without_manifest": without_manifest,
         }
 
+    @log_exception
+    def diff_projects(self, projects_dirpath: str | Path) -> dict[str, Any]:
+        """
+        Сканирование директории проектов и определение наличия проектов в базе данных.
+        Манифесты маркеров читаются в том же проходе.
+        :return: ...
+        """
+        if not isinstance(projects_dirpath, Path):
+            projects_dirpath = Path(projects_dirpath)
+
+        manifests = {}
+        for item in projects_dirpath.rglob(MARKER_NAME):
+            manifests[str(item.parent.relative_to(projects_dirpath))] = self.read_manifest(item.parent)
+
+        return self._compare_with_database(manifests)
+
     @log_exception
     def diff_projects_with_progress(self, projects_dirpath: str | Path,
-                                    progress, stop_event) -> dict[str, list[str]] | None:
+                                    progress, stop_event) -> dict[str, Any] | None:
         """
         То же, что diff_projects, но с поддержкой прогресса и отмены.
         :param projects_dirpath: Корень каталога проектов
@@ -77,47 +206,83 @@ class ProjectService:
 
         # Подсчёт общего количества файлов-маркеров для корректного прогресса
         total = 0
-        for _ in projects_dirpath.rglob(".geo_office_project"):
+        for _ in projects_dirpath.rglob(MARKER_NAME):
             total += 1
         if total == 0:
             progress(0.4, "В файловой системе ничего не найдено")
 
-        # Сканирование с обновлением прогресса
-        projects_in_files_list = []
+        # Сканирование с чтением манифестов и обновлением прогресса
+        manifests = {}
         seen = 0
-        for item in projects_dirpath.rglob(".geo_office_project"):
+        for item in projects_dirpath.rglob(MARKER_NAME):
             if stop_event is not None and stop_event.is_set():
                 return None
-            projects_in_files_list.append(item.parent.relative_to(projects_dirpath))
+            manifests[str(item.parent.relative_to(projects_dirpath))] = self.read_manifest(item.parent)
             seen += 1
             if total > 0 and (seen % 50 == 0):
                 progress(min(0.5, 0.1 + 0.4 * (seen / total)), f"Сканирование... {seen}/{total}")
 
         progress(0.6, "Загрузка проектов из базы данных...")
-        projects_in_files = set([str(path) for path in projects_in_files_list])
-        projects_in_database = set(p.path for p in list(self.database_service.get_all_projects()))
-
-        only_in_files = list(projects_in_files - projects_in_database)
-        only_in_database = list(projects_in_database - projects_in_files)
-        in_both = list(projects_in_files & projects_in_database)
+        result = self._compare_with_database(manifests)
 
         progress(1.0, "Готово")
-        return {
-            "only_in_files": only_in_files,
-            "only_in_database": only_in_database,
-            "in_files_and_database": in_both,
-        }
+        return result
 
     @log_exception
-    def create_project(self, number: str, name: str, customer: str = "") -> Project:
+    def create_project(self, projects_root: str | Path, path: str, number: str, name: str,
+                       customer: str = "", chief_engineer: str = "", status: str = "active",
+                       address: str = "") -> Project:
         """
-        Создать новый проект.
+        Создать новый проект: папку с маркером-манифестом и запись в базе данных.
+        :param projects_root: Корень каталога проектов
+        :param path: Путь к папке проекта (относительно каталога проектов)
         :param number: Номер проекта
         :param name: Название проекта
         :param customer: Заказчик
+        :param chief_engineer: Главный инженер проекта
+        :param status: Статус проекта
+        :param address: Адрес объекта
         :return: Созданный проект
         """
-        pass
+        project_dir = Path(projects_root) / path
+        project_dir.mkdir(parents=True, exist_ok=True)
+        project = self.database_service.create_project(number=number, name=name, customer=customer,
+                                                       chief_engineer=chief_engineer, status=status,
+                                                       address=address, path=path)
+        manifest = ProjectManifest(number=number, name=name, customer=customer, status=status,
+                                   project_id=project.id)
+        self.write_manifest(project_dir, manifest)
+        self._register(manifest)
+        return self.get_project(project.id)
+
+    @log_exception
+    def import_project(self, projects_root: str | Path, path: str) -> Project | None:
+        """
+        Добавить в базу данных проект, найденный в файловой системе, по его манифесту.
+        :param projects_root: Корень каталога проектов
+        :param path: Путь к папке проекта (относительно каталога проектов)
+        :return: Добавленный проект или None, если маркер не содержит манифеста
+        """
+        project_dir = Path(projects_root) / path
+        manifest = self.read_manifest(project_dir)
+        if manifest is None:
+            return None
+        project = self.database_service.create_project(number=manifest.number, name=manifest.name,
+                                                       customer=manifest.customer, chief_engineer="",
+                                                       status=manifest.status or "active", address="", path=path)
+        manifest.project_id = project.id
+        self.write_manifest(project_dir, manifest)
+        self._register(manifest)
+        return self.get_project(project.id)
+
+    @log_exception
+    def move_project(self, project_id: int, new_path: str) -> None:
+        """
+        Обновить путь проекта после переименования или переноса папки.
+        :param project_id: id проекта
+        :param new_path: Новый путь к папке проекта (относительно каталога проектов)
+        """
+        self.database_service.update_project_path(project_id, new_path)
 
     @log_exception
     def update_project(self, number: str, **kwargs) -> bool:
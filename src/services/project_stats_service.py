@@ -0,0 +1,265 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from models.project_stats_model import ProjectStats
+from services.file_index_service import FileIndexService
+from utils.file_utils import FileUtils
+from utils import tracing
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.project_stats_service")
+
+
+class ProjectStatsService:
+    """
+    Сервис статистики занимаемого места по папкам проектов.
+    Обходит папки проектов параллельно через os.scandir и хранит результаты в хранилище приложения.
+    Повторно сканируются проекты, у которых изменился отпечаток папок (добавление, удаление или
+    переименование файла на любой глубине), и проекты, просканированные раньше rescan_after секунд назад
+    (изменение содержимого файла не меняет mtime папок). При обходе также обновляется индекс имён файлов (FileIndexService), если он передан.
+    """
+
+    def __init__(self, storage_path: str | Path, file_index: FileIndexService | None = None,
+                 max_workers: int = 8, save_every: int = 25, rescan_after: float = 24 * 3600):
+        """
+        Инициализация сервиса статистики.
+        :param storage_path: Папка хранилища приложения
+        :param file_index: Индекс имён файлов, обновляемый при сканировании
+        :param max_workers: Количество параллельных потоков обхода
+        :param save_every: Через сколько просканированных проектов сохранять результаты
+        :param rescan_after: Через сколько секунд проект сканируется повторно при неизменном отпечатке
+        """
+        self._store_file = Path(storage_path) / "project_stats.json"
+        self._file_index = file_index
+        self._max_workers = max_workers
+        self._save_every = save_every
+        self._rescan_after = rescan_after
+        self._stats: dict[str, ProjectStats] | None = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        logger.info("Инициализирован сервис статистики проектов")
+
+    def _load(self) -> dict[str, ProjectStats]:
+        with self._lock:
+            if self._stats is None:
+                self._stats = {}
+                data = FileUtils.load_json(self._store_file) or {}
+                for path, item in data.get("projects", {}).items():
+                    try:
+                        self._stats[path] = ProjectStats.from_dict(item)
+                    except TypeError as e:
+                        logger.warning(f"Пропущена некорректная запись статистики {path}: {e}")
+            return self._stats
+
+    @log_exception
+    def save(self) -> bool:
+        """Сохранение статистики в хранилище приложения"""
+        stats = self._load()
+        with self._lock:
+            self._unsaved = 0
+            data = {"projects": {path: item.to_dict() for path, item in stats.items()}}
+        return FileUtils.save_json(data, self._store_file)
+
+    def get(self, project_path: str) -> ProjectStats | None:
+        """
+        Получить статистику проекта без обращения к папке проекта.
+        :param project_path: Путь к папке проекта (Project.path)
+        :return: Статистика или None, если проект ещё не сканировался
+        """
+        return self._load().get(project_path)
+
+    def get_summary(self, top: int = 5) -> dict[str, Any]:
+        """
+        Сводная статистика по всем просканированным проектам.
+        :param top: Количество самых больших проектов в сводке
+        :return: Словарь со сводкой
+        """
+        stats = list(self._load().values())
+        largest = sorted(stats, key=lambda s: s.total_size, reverse=True)[:top]
+        return {
+            "projects_count": len(stats),
+            "total_size": sum(s.total_size for s in stats),
+            "files_count": sum(s.files_count for s in stats),
+            "largest": largest,
+        }
+
+    @staticmethod
+    def _signature(project_dir: Path) -> list:
+        """
+        Отпечаток папки: количество папок и записей и наибольший mtime среди всех папок проекта.
+        mtime папки меняется при добавлении, удалении и переименовании записей в ней, поэтому
+        отпечаток учитывает изменения на любой глубине. Файлы при этом не читаются (stat только папок).
+        """
+        dirs = entries = 0
+        max_mtime = os.stat(project_dir).st_mtime
+        stack = [str(project_dir)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        entries += 1
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs += 1
+                            max_mtime = max(max_mtime, entry.stat(follow_symlinks=False).st_mtime)
+                            stack.append(entry.path)
+            except OSError:
+                if current == str(project_dir):
+                    raise  # папка проекта недоступна
+                # Недоступная вложенная папка пропускается так же, как при обходе (_walk)
+        return [dirs, entries, max_mtime]
+
+    @staticmethod
+    def _walk(project_dir: Path, project_path: str, signature: list,
+              stop_event: Optional[threading.Event],
+              files: list | None = None) -> ProjectStats | None:
+        """
+        Обход папки проекта через os.scandir без рекурсии.
+        Если передан список files, в него добавляются (относительный путь, имя, расширение, размер, mtime).
+        """
+        stats = ProjectStats(path=project_path, signature=signature)
+        stack = [str(project_dir)]
+        while stack:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        counter = stats.extensions.setdefault(ext, [0, 0])
+                        counter[0] += 1
+                        counter[1] += st.st_size
+                        stats.files_count += 1
+                        stats.total_size += st.st_size
+                        if files is not None:
+                            files.append((os.path.relpath(entry.path, project_dir), entry.name, ext,
+                                          st.st_size, st.st_mtime))
+                        if stats.last_modified_time is None or st.st_mtime > stats.last_modified_time:
+                            stats.last_modified_time = st.st_mtime
+                            stats.last_modified_file = os.path.relpath(entry.path, project_dir)
+            except OSError as e:
+                logger.warning(f"Ошибка чтения папки {current}: {e}")
+        stats.scanned_at = time.time()
+        return stats
+
+    def _scan_project(self, projects_root: Path, project_path: str, force: bool,
+                      stop_event: Optional[threading.Event]) -> tuple[ProjectStats, list | None] | None:
+        """
+        Сканирование одного проекта.
+        :return: (статистика, список файлов для индекса) или None, если проект не изменился
+                 или сканирование отменено
+        """
+        project_dir = projects_root / project_path
+        signature = self._signature(project_dir)
+        previous = self.get(project_path)
+        if not force and previous is not None and previous.signature == signature \
+                and time.time() - previous.scanned_at < self._rescan_after \
+                and (self._file_index is None or self._file_index.get_signature(project_path) == signature):
+            return None
+        files = [] if self._file_index is not None else None
+        stats = self._walk(project_dir, project_path, signature, stop_event, files)
+        return (stats, files) if stats is not None else None
+
+    @log_exception
+    @tracing.traced()
+    def scan_projects(self, projects_root: str | Path, project_paths: list[str],
+                      progress: Callable[[float, Optional[str]], None],
+                      stop_event: Optional[threading.Event], force: bool = False) -> dict[str, Any] | None:
+        """
+        Параллельное сканирование папок проектов с сохранением промежуточных результатов.
+        :param projects_root: Корень каталога проектов
+        :param project_paths: Пути проектов (Project.path)
+        :param progress: Callable(value: float [0..1], message: Optional[str])
+        :param stop_event: threading.Event для отмены
+        :param force: Сканировать все проекты независимо от отпечатка
+        :return: Сводная статистика или None, если отменено
+        """
+        projects_root = Path(projects_root)
+        self._load()
+        total = len(project_paths)
+        done = rescanned = 0
+        progress(0.0, "Сканирование папок объектов...")
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="ProjectStats") as executor:
+            futures = {executor.submit(self._scan_project, projects_root, path, force, stop_event): path
+                       for path in project_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                if stop_event is not None and stop_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.save()
+                    return None
+                done += 1
+                try:
+                    scanned = future.result()
+                except OSError as e:
+                    logger.warning(f"Папка объекта недоступна {path}: {e}")
+                    scanned = None
+                if scanned is not None:
+                    self._store(path, *scanned)
+                    rescanned += 1
+                if total > 0:
+                    progress(done / total, f"Сканирование... {done}/{total}")
+
+        logger.info(f"Статистика проектов обновлена: пересканировано {rescanned} из {total}")
+        progress(1.0, "Готово")
+        return self.finish_scan(project_paths)
+
+    def _store(self, project_path: str, stats: ProjectStats, files: list | None) -> None:
+        """Сохранение результата сканирования проекта с периодической записью на диск"""
+        with self._lock:
+            self._stats[project_path] = stats
+            self._unsaved += 1
+            save_due = self._unsaved >= self._save_every
+        if self._file_index is not None:
+            self._file_index.replace_project(project_path, stats.signature, files)
+        if save_due:
+            self.save()
+
+    @log_exception
+    @tracing.traced()
+    def update_project(self, projects_root: str | Path, project_path: str,
+                       stop_event: Optional[threading.Event] = None, force: bool = False) -> bool:
+        """
+        Сканирование одного проекта (шаг задания сканирования в JobQueueService).
+        :param projects_root: Корень каталога проектов
+        :param project_path: Путь проекта (Project.path)
+        :param stop_event: threading.Event для отмены
+        :param force: Сканировать проект независимо от отпечатка
+        :return: True если проект пересканирован
+        """
+        self._load()
+        try:
+            scanned = self._scan_project(Path(projects_root), project_path, force, stop_event)
+        except OSError as e:
+            logger.warning(f"Папка объекта недоступна {project_path}: {e}")
+            return False
+        if scanned is None:
+            return False
+        self._store(project_path, *scanned)
+        return True
+
+    @log_exception
+    @tracing.traced()
+    def finish_scan(self, project_paths: list[str]) -> dict[str, Any]:
+        """
+        Завершение сканирования: запись статистики и удаление из индекса файлов отсутствующих проектов.
+        :param project_paths: Пути всех проектов
+        :return: Сводная статистика
+        """
+        self.save()
+        if self._file_index is not None:
+            self._file_index.retain_projects(set(project_paths))
+        return self.get_summary()
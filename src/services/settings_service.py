@@ -0,0 +1,96 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from services.background_service import TaskPriority
+from utils.file_utils import FileUtils
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("services.settings_service")
+
+
+class SettingsService:
+    """
+    Хранилище файла настроек приложения (settings.json).
+    save() только отмечает настройки изменёнными и планирует запись через delay секунд, поэтому
+    серия изменений (перемещение или изменение размера окна) записывается на диск один раз и не в потоке
+    интерфейса. Запись пропускается, если содержимое файла не изменилось, и выполняется атомарно
+    (временный файл и os.replace). При закрытии приложения несохранённые изменения записываются flush().
+    """
+    TASK_NAME = "settings_save"
+
+    def __init__(self, settings_file: str | Path, background_service, serialize: Callable[[], dict[str, Any]],
+                 delay: float = 0.5):
+        """
+        :param settings_file: Файл настроек
+        :param background_service: BackgroundService (отложенная запись)
+        :param serialize: Callable, возвращающий текущие настройки в виде словаря
+        :param delay: Максимальная задержка записи изменений (в секундах)
+        """
+        self._settings_file = Path(settings_file)
+        self._background_service = background_service
+        self._serialize = serialize
+        self._delay = delay
+        self._written: str | None = None  # содержимое файла после последней записи или чтения
+        self._dirty = False
+        self._pending = False  # запись запланирована в BackgroundService
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.skipped = 0
+
+    @log_exception
+    def load(self) -> dict[str, Any] | None:
+        """
+        Чтение файла настроек.
+        :return: Словарь настроек или None, если файла нет или он повреждён
+        """
+        if not self._settings_file.exists():
+            logger.warning(f"Файл настроек не найден: {self._settings_file}")
+            return None
+        try:
+            text = self._settings_file.read_text(encoding="utf-8")
+            data = json.loads(text)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Ошибка чтения файла настроек {self._settings_file}: {e}")
+            return None
+        self._written = text
+        return data
+
+    def save(self) -> None:
+        """Отметить настройки изменёнными: запись выполнится не позже чем через delay секунд"""
+        self._dirty = True
+        # Если запись уже запланирована, изменение попадёт в неё
+        if not self._pending:
+            self._pending = self._background_service.schedule_once(self.TASK_NAME, self._scheduled_flush,
+                                                                   self._delay, priority=TaskPriority.BATCH)
+
+    def _scheduled_flush(self) -> None:
+        self._pending = False
+        self.flush()
+
+    @log_exception
+    def flush(self) -> bool:
+        """
+        Записать несохранённые изменения.
+        :return: True, если файл записан
+        """
+        written = False
+        with self._lock:
+            # Изменения, внесённые во время записи, записываются следующим проходом
+            while self._dirty:
+                self._dirty = False
+                text = json.dumps(self._serialize(), ensure_ascii=False, indent=2)
+                if text == self._written:
+                    self.skipped += 1
+                    continue
+                if not FileUtils.write_text_atomic(text, self._settings_file):
+                    logger.error("Ошибка сохранения настроек")
+                    self._dirty = True  # повторная попытка при следующем сохранении или закрытии
+                    return written
+                self._written = text
+                self.writes += 1
+                written = True
+        if written:
+            logger.info("Настройки успешно сохранены")
+        return written
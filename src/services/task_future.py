@@ -0,0 +1,195 @@
+import threading
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Optional
+
+from utils.logger_config import get_logger
+
+logger = get_logger("services.task_future")
+
+ProgressCallback = Callable[[float, Optional[str]], None]
+
+
+class ProgressAggregator:
+    """
+    Объединение прогресса нескольких подзадач в один с учётом весов подзадач.
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback], weights: list[float]):
+        """
+        :param callback: Callable(value: float [0..1], message: Optional[str]) для общего прогресса
+        :param weights: Веса подзадач
+        """
+        self._callback = callback
+        self._weights = weights
+        self._total_weight = sum(weights) or 1.0
+        self._values = [0.0] * len(weights)
+        self._lock = threading.Lock()
+
+    def part(self, index: int) -> ProgressCallback:
+        """
+        Callable прогресса подзадачи.
+        :param index: Номер подзадачи
+        """
+        def progress(value: float, message: Optional[str] = None) -> None:
+            with self._lock:
+                self._values[index] = min(max(float(value), 0.0), 1.0)
+                total = sum(w * v for w, v in zip(self._weights, self._values)) / self._total_weight
+            if self._callback is not None:
+                self._callback(total, message)
+        return progress
+
+
+class TaskFuture:
+    """
+    Результат фоновой задачи BackgroundService.
+    Поддерживает продолжения (then), объединение (gather) и отмену, которая передаётся всем дочерним задачам.
+    """
+
+    def __init__(self, service, name: str, stop_event: Optional[threading.Event] = None):
+        """
+        :param service: BackgroundService, в котором выполняются продолжения
+        :param name: Имя задачи
+        :param stop_event: Событие остановки задачи
+        """
+        self._service = service
+        self.name = name
+        self.stop_event = stop_event or threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._result: Any = None
+        self._exception: BaseException | None = None
+        self._cancelled = False
+        self._callbacks: list[Callable[['TaskFuture'], None]] = []
+        self._children: list['TaskFuture'] = []
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Отменить задачу и все дочерние задачи (продолжения и объединённые задачи)"""
+        self.stop_event.set()
+        with self._lock:
+            children = list(self._children)
+        for child in children:
+            child.cancel()
+
+    def add_child(self, child: 'TaskFuture') -> None:
+        """Добавить дочернюю задачу, которая отменяется вместе с этой"""
+        with self._lock:
+            self._children.append(child)
+        if self.stop_event.is_set():
+            child.cancel()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """
+        Дождаться результата задачи.
+        :raises CancelledError: Если задача отменена
+        :raises TimeoutError: Если задача не завершилась за timeout
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Задача {self.name} не завершилась за {timeout} с")
+        if self._cancelled:
+            raise CancelledError(self.name)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self) -> BaseException | None:
+        return self._exception
+
+    def add_done_callback(self, callback: Callable[['TaskFuture'], None]) -> None:
+        """Вызвать callback(future) после завершения задачи (сразу, если она уже завершена)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _complete(self, result: Any = None, exception: BaseException | None = None,
+                  cancelled: bool = False) -> None:
+        with self._lock:
+            if self._done.is_set():
+                return
+            self._result, self._exception, self._cancelled = result, exception, cancelled
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.exception(f"Ошибка в обработчике завершения задачи {self.name}: {e}")
+
+    def set_result(self, result: Any) -> None:
+        self._complete(result=result)
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._complete(exception=exception)
+
+    def set_cancelled(self) -> None:
+        self._complete(cancelled=True)
+
+    def then(self, task_func: Callable[[Any, ProgressCallback, threading.Event], Any],
+             task_name: str | None = None, progress: Optional[ProgressCallback] = None,
+             priority=None) -> 'TaskFuture':
+        """
+        Запустить следующую задачу после успешного завершения этой, без возврата в поток интерфейса.
+        :param task_func: Функция task_func(previous_result, progress, stop_event)
+        :param task_name: Имя следующей задачи
+        :param progress: Callable прогресса следующей задачи
+        :param priority: Класс приоритета (по умолчанию NORMAL)
+        :return: TaskFuture следующей задачи
+        """
+        child = TaskFuture(self._service, task_name or f"{self.name}:then")
+        self.add_child(child)
+
+        def on_done(parent: 'TaskFuture') -> None:
+            if parent.cancelled() or child.stop_event.is_set():
+                child.set_cancelled()
+            elif parent.exception() is not None:
+                child.set_exception(parent.exception())
+            else:
+                kwargs = {"priority": priority} if priority is not None else {}
+                self._service.submit(child.name, lambda p, s: task_func(parent.result(), p, s),
+                                     progress=progress, future=child, **kwargs)
+
+        self.add_done_callback(on_done)
+        return child
+
+
+def gather(service, futures: list[TaskFuture], name: str = "gather") -> TaskFuture:
+    """
+    Объединить задачи: результат - список результатов в исходном порядке.
+    При ошибке или отмене одной задачи остальные отменяются. Отмена объединения отменяет все задачи.
+    :param service: BackgroundService
+    :param futures: Объединяемые задачи
+    :param name: Имя объединения
+    :return: TaskFuture объединения
+    """
+    parent = TaskFuture(service, name)
+    for future in futures:
+        parent.add_child(future)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(future: TaskFuture) -> None:
+        if future.cancelled() or future.exception() is not None:
+            parent.cancel()
+            if future.cancelled():
+                parent.set_cancelled()
+            else:
+                parent.set_exception(future.exception())
+            return
+        with lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            parent.set_result([f.result() for f in futures])
+
+    if not futures:
+        parent.set_result([])
+    for future in futures:
+        future.add_done_callback(on_done)
+    return parent
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import flet as ft
+
+from utils.logger_config import get_logger
+from utils.stall_watchdog import get_stall_watchdog
+
+logger = get_logger("services.ui_update_service")
+
+
+class UiUpdateService:
+    """
+    Планировщик обновлений интерфейса.
+    Фоновые задачи помечают изменённые контролы (или всю страницу), а один поток отправляет
+    не больше одного page.update() за кадр. Так несколько задач, одновременно сообщающих прогресс,
+    не отправляют каждая свой дифф страницы по каналу Flet.
+    """
+
+    def __init__(self, app, fps: int = 30):
+        """
+        Инициализация планировщика.
+        :param app: Экземпляр основного приложения (используется app.page)
+        :param fps: Максимальная частота обновлений в секунду
+        """
+        self._app = app
+        self._frame = 1.0 / fps
+        self._dirty: dict[int, ft.Control] = {}
+        self._full_update = False
+        self._last_flush = 0.0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self.flushes = 0
+        self.requests = 0
+
+    def request_update(self, *controls: ft.Control, immediate: bool = False) -> None:
+        """
+        Запросить обновление интерфейса.
+        :param controls: Изменённые контролы; без аргументов обновляется вся страница
+        :param immediate: Отправить обновление сразу, не дожидаясь следующего кадра
+        """
+        with self._cond:
+            self.requests += 1
+            if controls:
+                for control in controls:
+                    self._dirty[id(control)] = control
+            else:
+                self._full_update = True
+            if not immediate:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True, name="UiUpdateService")
+                    self._thread.start()
+                self._cond.notify()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Отправить накопленные изменения одним page.update()"""
+        with self._cond:
+            if not self._full_update and not self._dirty:
+                return
+            controls = [] if self._full_update else list(self._dirty.values())
+            self._dirty.clear()
+            self._full_update = False
+            self._last_flush = time.monotonic()
+        page = self._app.page
+        if page is None:
+            return
+        try:
+            with get_stall_watchdog().watch("page.update"):
+                page.update(*controls)
+            self.flushes += 1
+        except Exception as e:
+            logger.error(f"Ошибка обновления интерфейса: {e}")
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._full_update and not self._dirty:
+                    self._cond.wait()
+                delay = self._last_flush + self._frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
@@ -1,4 +1,6 @@
+import threading
 from pathlib import Path
+from typing import Callable, Optional
 
 import ezdxf
 from openpyxl import Workbook
@@ -41,8 +43,46 @@ class ExtractTable:
 
         wb.save(path)
 
-    def extraction(self):
-        for file in self._input_dir.glob("*.dxf"):
-            data, xls_filename = self._dxf_parse(file)
-            data.insert(0, self._columns)
-            self._xls_write(data, self._output_dir / (xls_filename + '.xlsx'))
\ No newline at end of file
+    def extraction(self, progress: Optional[Callable[[float, Optional[str]], None]] = None,
+                   stop_event: Optional[threading.Event] = None) -> int:
+        files = sorted(self._input_dir.glob("*.dxf"))
+        for idx, file in enumerate(files):
+            if stop_event is not None and stop_event.is_set():
+                return idx
+            if progress is not None:
+                progress(idx / len(files), f"Обработка {file.name} ({idx + 1}/{len(files)})")
+            self.extract_file(file)
+        return len(files)
+
+    def extract_file(self, dxf_filepath: Path) -> str:
+        """
+        Извлечение таблицы из одного DXF файла.
+        :param dxf_filepath: Путь к DXF файлу
+        :return: Имя созданного XLSX файла
+        """
+        data, xls_filename = self._dxf_parse(dxf_filepath)
+        data.insert(0, self._columns)
+        self._xls_write(data, self._output_dir / (xls_filename + '.xlsx'))
+        return xls_filename + '.xlsx'
+
+
+def extract_tables(progress: Callable[[float, Optional[str]], None], stop_event: threading.Event,
+                   structure: tuple, input_dir: Path, output_dir: Path) -> int:
+    """
+    Извлечение таблиц из всех DXF файлов папки.
+    Функция уровня модуля для запуска в пуле процессов (BackgroundDialogRunner.run(process=True)).
+    :return: Количество обработанных файлов
+    """
+    return ExtractTable(structure=structure, input_dir=input_dir, output_dir=output_dir).extraction(
+        progress, stop_event)
+
+
+def extract_table_file(progress: Callable[[float, Optional[str]], None], stop_event: threading.Event,
+                       structure: tuple, dxf_filepath: Path, output_dir: Path) -> str:
+    """
+    Извлечение таблицы из одного DXF файла.
+    Функция уровня модуля для запуска в пуле процессов (шаг задания в JobQueueService).
+    :return: Имя созданного XLSX файла
+    """
+    return ExtractTable(structure=structure, input_dir=dxf_filepath.parent, output_dir=output_dir).extract_file(
+        dxf_filepath)
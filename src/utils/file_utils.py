@@ -23,14 +23,42 @@ class FileUtils:
         :param filename: Имя файла для сохранения
         :return: True, если успешно, иначе False
         """
-        logger.debug(f"Сохранение JSON файла: {filename}")
+        logger.debug("Сохранение JSON файла: %s", filename)
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения файла {filename}: {str(e)}")
+            return False
+        if FileUtils.write_text_atomic(text, filename):
             logger.info(f"JSON файл сохранен: {filename}")
             return True
+        return False
+
+    @staticmethod
+    @log_exception
+    def write_text_atomic(text: str, filename: str | Path) -> bool:
+        """
+        Атомарная запись текстового файла: текст записывается во временный файл рядом с целевым,
+        который затем заменяет целевой (os.replace). При сбое во время записи прежний файл остаётся целым.
+        :param text: Содержимое файла
+        :param filename: Имя файла
+        :return: True, если успешно, иначе False
+        """
+        filename = Path(filename)
+        tmp_file = filename.with_name(f"{filename.name}.tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, filename)
+            return True
         except Exception as e:
             logger.error(f"Ошибка сохранения файла {filename}: {str(e)}")
+            try:
+                tmp_file.unlink(missing_ok=True)
+            except OSError:
+                pass
             return False
     
     @staticmethod
@@ -42,7 +70,7 @@ class FileUtils:
         :return: Словарь с данными или None, если ошибка
         """
         """Загрузка данных из JSON файла"""
-        logger.debug(f"Загрузка JSON файла: {filename}")
+        logger.debug("Загрузка JSON файла: %s", filename)
         try:
             if os.path.exists(filename):
                 with open(filename, 'r', encoding='utf-8') as f:
@@ -63,10 +91,10 @@ class FileUtils:
     @log_exception
     def ensure_directory(path: str) -> bool:
         """Создание директории, если она не существует"""
-        logger.debug(f"Проверка/создание директории: {path}")
+        logger.debug("Проверка/создание директории: %s", path)
         try:
             Path(path).mkdir(parents=True, exist_ok=True)
-            logger.debug(f"Директория готова: {path}")
+            logger.debug("Директория готова: %s", path)
             return True
         except Exception as e:
             logger.error(f"Ошибка создания директории {path}: {str(e)}")
@@ -77,7 +105,7 @@ class FileUtils:
     def get_file_extension(filename: str) -> str:
         """Получение расширения файла"""
         ext = os.path.splitext(filename)[1].lower()
-        logger.debug(f"Получение расширения файла {filename}: {ext}")
+        logger.debug("Получение расширения файла %s: %s", filename, ext)
         return ext
     
     @staticmethod
@@ -85,7 +113,7 @@ class FileUtils:
     def is_valid_file(filename: str, allowed_extensions: list) -> bool:
         """Проверка валидности файла по расширению"""
         ext = FileUtils.get_file_extension(filename)
-        logger.debug(f"Проверка валидности файла {filename} по расширению: {ext in allowed_extensions}")
+        logger.debug("Проверка валидности файла %s по расширению: %s", filename, ext in allowed_extensions)
         return ext in allowed_extensions
     
     @staticmethod
@@ -93,7 +121,7 @@ class FileUtils:
     def file_exists(file_path: str) -> bool:
         """Проверка существования файла"""
         exists = os.path.exists(file_path)
-        logger.debug(f"Проверка файла {file_path}: {'существует' if exists else 'не существует'}")
+        logger.debug("Проверка файла %s: %s", file_path, 'существует' if exists else 'не существует')
         return exists
     
     @staticmethod
@@ -102,12 +130,21 @@ class FileUtils:
         """Получение размера файла в байтах"""
         try:
             size = os.path.getsize(file_path)
-            logger.debug(f"Размер файла {file_path}: {size} байт")
+            logger.debug("Размер файла %s: %s байт", file_path, size)
             return size
         except Exception as e:
             logger.error(f"Ошибка получения размера файла {file_path}: {str(e)}")
             return 0
 
+    @staticmethod
+    def format_size(size: int | float) -> str:
+        """Форматирование размера в байтах в человекочитаемый вид"""
+        for unit in ("Б", "КБ", "МБ", "ГБ"):
+            if abs(size) < 1024:
+                return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} ТБ"
+
     @staticmethod
     @log_exception
     def open_in_explorer(path):
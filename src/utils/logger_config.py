@@ -1,10 +1,16 @@
 """
 Модуль для настройки логирования приложения GeoOffice
 """
+import atexit
+import functools
 import logging
 import logging.handlers
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -19,6 +25,22 @@ except ImportError:
     COLORS_AVAILABLE = False
     Fore = Style = None
 
+# Уровень логирования по умолчанию (DEBUG, INFO, ...). Без переменной: DEBUG при разработке, INFO в сборке
+LOG_LEVEL_ENV = "GEOOFFICE_LOG_LEVEL"
+# Уровни отдельных модулей: "services.database_service=INFO,pages=WARNING"
+LOG_LEVELS_ENV = "GEOOFFICE_LOG_LEVELS"
+# Профиль вызовов функций, отмеченных log_exception и log_function_call
+PROFILE_ENV = "GEOOFFICE_PROFILE"
+
+
+def _parse_level(value: str) -> int | None:
+    """Уровень логирования по имени или числу, None если значение не распознано"""
+    value = value.strip().upper()
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else None
+
 
 class ColoredFormatter(logging.Formatter):
     """Форматтер с цветами для консоли"""
@@ -44,20 +66,44 @@ class ColoredFormatter(logging.Formatter):
         return f"{color}{formatted}{reset}"
 
 
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Обработчик, передающий запись в очередь без форматирования.
+    Стандартный QueueHandler форматирует сообщение в вызывающем потоке, здесь подстановка аргументов
+    и форматирование выполняются в потоке записи QueueListener (очередь не покидает процесс).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """Передаёт записи из дочерних процессов логгерам текущего процесса (с теми же именами)"""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
 class GeoOfficeLogger:
     """
     Класс для настройки логирования приложения GeoOffice.
     Позволяет настраивать форматтеры, обработчики, логгеры для модулей и получать логгер для нужного модуля.
+    Записи передаются через очередь одному фоновому потоку записи (QueueListener), поэтому вызов логгера
+    в потоке интерфейса или фоновой задачи не форматирует сообщение и не пишет в файлы.
     """
     
     def __init__(self, app_name="GeoOffice"):
         self.app_name = app_name
         self.log_dir = Path(os.getenv("FLET_APP_STORAGE_DATA")) / "logs"
         self.log_dir.mkdir(exist_ok=True)
+        self.handlers: list[logging.Handler] = []
+        self.listener: logging.handlers.QueueListener | None = None
+        self.worker_queue: "multiprocessing.Queue | None" = None
+        self.worker_listener: logging.handlers.QueueListener | None = None
         
         # Создаем основной логгер приложения
         self.logger = logging.getLogger(app_name)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(self.default_level())
         
         # Очищаем существующие обработчики
         self.logger.handlers.clear()
@@ -101,7 +147,7 @@ class GeoOfficeLogger:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.DEBUG)     # Устанавливаем уровень для консоли (по умолчанию INFO)
         console_handler.setFormatter(self.simple_formatter)
-        self.logger.addHandler(console_handler)
+        self.handlers.append(console_handler)
         
         # 2. Обработчик для основного файла логов (DEBUG и выше)
         main_log_file = self.log_dir / f"{self.app_name.lower()}.log"
@@ -113,7 +159,7 @@ class GeoOfficeLogger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(self.detailed_formatter)
-        self.logger.addHandler(file_handler)
+        self.handlers.append(file_handler)
         
         # 3. Обработчик для ошибок (ERROR и выше)
         error_log_file = self.log_dir / f"{self.app_name.lower()}_errors.log"
@@ -125,7 +171,7 @@ class GeoOfficeLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(self.detailed_formatter)
-        self.logger.addHandler(error_handler)
+        self.handlers.append(error_handler)
         
         # 4. Обработчик для ежедневных логов
         daily_log_file = self.log_dir / f"{self.app_name.lower()}_{datetime.now().strftime('%Y%m%d')}.log"
@@ -138,36 +184,44 @@ class GeoOfficeLogger:
         )
         daily_handler.setLevel(logging.INFO)
         daily_handler.setFormatter(self.detailed_formatter)
-        self.logger.addHandler(daily_handler)
+        self.handlers.append(daily_handler)
+
+        # Единственный обработчик логгера - очередь, записью занимается фоновый поток
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(LazyQueueHandler(log_queue))
+        self.listener = logging.handlers.QueueListener(log_queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    @staticmethod
+    def default_level() -> int:
+        """
+        Уровень логирования по умолчанию: из переменной GEOOFFICE_LOG_LEVEL,
+        иначе INFO в собранном приложении и DEBUG при разработке.
+        """
+        level = _parse_level(os.getenv(LOG_LEVEL_ENV, ""))
+        if level is not None:
+            return level
+        return logging.INFO if getattr(sys, "frozen", False) else logging.DEBUG
     
     def setup_module_loggers(self):
         """
         Настройка логгеров для различных модулей приложения (pages, services, utils, models, files, data).
+        Логгеры модулей наследуют уровень приложения, отдельные уровни задаются переменной GEOOFFICE_LOG_LEVELS
+        (например "services.database_service=INFO,pages=WARNING"). Отсеянный по уровню вызов логгера
+        не создаёт запись и не подставляет аргументы сообщения.
         """
+        for module_name in ("pages", "services", "utils", "models", "files", "data"):
+            logging.getLogger(f"{self.app_name}.{module_name}").setLevel(logging.NOTSET)
 
-        # Логгер для страниц
-        pages_logger = logging.getLogger(f"{self.app_name}.pages")
-        pages_logger.setLevel(logging.DEBUG)
-        
-        # Логгер для сервисов
-        services_logger = logging.getLogger(f"{self.app_name}.services")
-        services_logger.setLevel(logging.DEBUG)
-        
-        # Логгер для утилит
-        utils_logger = logging.getLogger(f"{self.app_name}.utils")
-        utils_logger.setLevel(logging.DEBUG)
-        
-        # Логгер для моделей
-        models_logger = logging.getLogger(f"{self.app_name}.models")
-        models_logger.setLevel(logging.DEBUG)
-        
-        # Логгер для файловых операций
-        file_logger = logging.getLogger(f"{self.app_name}.files")
-        file_logger.setLevel(logging.DEBUG)
-        
-        # Логгер для операций с данными
-        data_logger = logging.getLogger(f"{self.app_name}.data")
-        data_logger.setLevel(logging.DEBUG)
+        for item in os.getenv(LOG_LEVELS_ENV, "").split(","):
+            if not item.strip():
+                continue
+            module_name, _, value = item.partition("=")
+            level = _parse_level(value)
+            if not module_name.strip() or level is None:
+                self.logger.warning("Неверный уровень логирования в %s: %r", LOG_LEVELS_ENV, item)
+                continue
+            self.get_logger(module_name.strip()).setLevel(level)
     
     def get_logger(self, module_name=None):
         """
@@ -199,6 +253,66 @@ class GeoOfficeLogger:
         self.logger.info(f"Завершение приложения {self.app_name}")
         self.logger.info(f"Дата и время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.logger.info("=" * 60)
+        self.stop()
+
+    def get_worker_queue(self) -> multiprocessing.Queue:
+        """
+        Очередь записей дочерних процессов (пул процессов BackgroundService). Записи из неё передаются
+        логгерам этого процесса, поэтому файлы журналов открывает и ротирует только основной процесс.
+        :return: Очередь multiprocessing для setup_worker_logging
+        """
+        if self.worker_queue is None:
+            self.worker_queue = multiprocessing.Queue()
+            self.worker_listener = logging.handlers.QueueListener(self.worker_queue, _ForwardHandler())
+            self.worker_listener.start()
+        return self.worker_queue
+
+    def stop(self):
+        """
+        Остановка фонового потока записи: оставшиеся в очереди записи дописываются в файлы.
+        Последующие записи выполняются обработчиками синхронно.
+        """
+        if self.worker_listener is not None:
+            self.worker_listener.stop()
+            self.worker_listener = None
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        self.logger.handlers.clear()
+        for handler in self.handlers:
+            self.logger.addHandler(handler)
+
+
+class WorkerLogger(GeoOfficeLogger):
+    """
+    Логирование в дочернем процессе: файлы журналов не открываются, записи передаются основному процессу
+    через очередь (GeoOfficeLogger.get_worker_queue). Без очереди записи уровня WARNING и выше
+    выводятся в stderr (logging.lastResort).
+    """
+
+    def __init__(self, app_name="GeoOffice", log_queue: "multiprocessing.Queue | None" = None):
+        self.app_name = app_name
+        self.log_dir = None
+        self.handlers = []
+        self.listener = None
+        self.worker_queue = None
+        self.worker_listener = None
+        self.logger = logging.getLogger(app_name)
+        self.logger.setLevel(self.default_level())
+        self.logger.handlers.clear()
+        if log_queue is not None:
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self.setup_module_loggers()
+
+    def get_worker_queue(self):
+        raise RuntimeError("Очередь записей дочерних процессов доступна только в основном процессе")
+
+    def log_startup(self):
+        pass
+
+    def log_shutdown(self):
+        pass
 
 
 # Глобальный экземпляр логгера
@@ -212,11 +326,57 @@ def setup_logging(app_name="GeoOffice"):
     :return: Экземпляр GeoOfficeLogger
     """
     global _app_logger
+    if multiprocessing.current_process().name != "MainProcess":
+        # Дочерний процесс (в том числе повторный импорт __main__ при запуске spawn, имя процесса
+        # к этому моменту уже задано) не открывает файлы журналов
+        return setup_worker_logging(app_name=app_name)
+    if _app_logger is not None:
+        # Повторная настройка: очередь предыдущего экземпляра дописывается, его файлы закрываются
+        _app_logger.stop()
+        for handler in _app_logger.handlers:
+            handler.close()
     _app_logger = GeoOfficeLogger(app_name)
     _app_logger.log_startup()
     return _app_logger
 
 
+def setup_worker_logging(log_queue: "multiprocessing.Queue | None" = None, app_name="GeoOffice"):
+    """
+    Настройка логирования дочернего процесса (initializer пула процессов).
+    :param log_queue: Очередь записей основного процесса (get_worker_log_queue)
+    :param app_name: Имя приложения
+    :return: Экземпляр WorkerLogger
+    """
+    global _app_logger
+    _app_logger = WorkerLogger(app_name, log_queue)
+    return _app_logger
+
+
+def get_worker_log_queue() -> multiprocessing.Queue:
+    """
+    Очередь, через которую дочерние процессы передают записи журналов основному процессу.
+    :return: Очередь multiprocessing для setup_worker_logging
+    """
+    if _app_logger is None:
+        setup_logging()
+    return _app_logger.get_worker_queue()
+
+
+def shutdown_logging():
+    """
+    Завершение логирования приложения: запись о завершении и остановка фонового потока записи.
+    """
+    if _app_logger is not None and _app_logger.listener is not None:
+        _app_logger.log_shutdown()
+
+
+@atexit.register
+def _stop_logging_at_exit():
+    # Дописывает очередь, если приложение завершилось без shutdown_logging
+    if _app_logger is not None:
+        _app_logger.stop()
+
+
 def get_logger(module_name=None):
     """
     Получить логгер для указанного модуля.
@@ -229,36 +389,140 @@ def get_logger(module_name=None):
     return _app_logger.get_logger(module_name)
 
 
+_profile_enabled = os.getenv(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+_profile: dict[str, list] = {}  # функция -> [вызовы, суммарное время, максимальное время, исключения]
+_profile_lock = threading.Lock()
+
+
+def enable_profile(enabled: bool = True) -> None:
+    """
+    Включение профиля вызовов функций, отмеченных log_exception и log_function_call
+    (также включается переменной GEOOFFICE_PROFILE).
+    :param enabled: Включить или выключить сбор профиля
+    """
+    global _profile_enabled
+    _profile_enabled = enabled
+
+
+def is_profile_enabled() -> bool:
+    """Профиль вызовов включён"""
+    return _profile_enabled
+
+
+def _record_call(name: str, duration: float, failed: bool) -> None:
+    with _profile_lock:
+        entry = _profile.get(name)
+        if entry is None:
+            _profile[name] = [1, duration, duration, int(failed)]
+            return
+        entry[0] += 1
+        entry[1] += duration
+        if duration > entry[2]:
+            entry[2] = duration
+        entry[3] += failed
+
+
+def get_profile() -> list[dict]:
+    """
+    Профиль вызовов, отсортированный по суммарному времени.
+    Время функции включает вложенные вызовы других отмеченных функций.
+    :return: Список {"name", "calls", "total", "max", "errors"} (время в секундах)
+    """
+    with _profile_lock:
+        rows = [{"name": name, "calls": calls, "total": total, "max": longest, "errors": errors}
+                for name, (calls, total, longest, errors) in _profile.items()]
+    return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+
+def reset_profile() -> None:
+    """Очистка профиля вызовов"""
+    with _profile_lock:
+        _profile.clear()
+
+
+def dump_profile(path: str | Path | None = None, top: int = 20) -> Path | None:
+    """
+    Запись профиля вызовов в текстовый файл и вывод самых затратных функций в лог.
+    :param path: Файл профиля (по умолчанию logs/profile_<время>.txt)
+    :param top: Количество функций в логе
+    :return: Путь к файлу или None, если профиль пуст
+    """
+    rows = get_profile()
+    if not rows:
+        return None
+    logger = get_logger()
+    if path is None:
+        path = _app_logger.log_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    path = Path(path)
+    lines = [f"{'calls':>10} {'total, ms':>12} {'mean, ms':>10} {'max, ms':>10} {'errors':>7}  function"]
+    for row in rows:
+        lines.append(f"{row['calls']:>10} {row['total'] * 1000:>12.1f} {row['total'] / row['calls'] * 1000:>10.3f} "
+                     f"{row['max'] * 1000:>10.1f} {row['errors']:>7}  {row['name']}")
+    try:
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    except OSError as e:
+        logger.error("Не удалось записать профиль вызовов: %s", e)
+        return None
+    logger.info("Профиль вызовов записан: %s\n%s", path, "\n".join(lines[:top + 1]))
+    return path
+
+
 def log_function_call(func):
     """
     Декоратор для логирования вызовов функций.
+    Логгер определяется один раз при декорировании, при включённом профиле вызов учитывается в профиле.
     :param func: Функция для обёртывания
     :return: Обёрнутая функция
     """
+    logger = get_logger(func.__module__)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger(func.__module__)
-        logger.debug(f"Вызов функции: {func.__name__}")
+        logger.debug("Вызов функции: %s", func.__name__)
+        started = time.perf_counter() if _profile_enabled else None
+        failed = False
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"Функция {func.__name__} выполнена успешно")
+            logger.debug("Функция %s выполнена успешно", func.__name__)
             return result
         except Exception as e:
-            logger.error(f"Ошибка в функции {func.__name__}: {str(e)}")
+            failed = True
+            logger.error("Ошибка в функции %s: %s", func.__name__, e)
             raise
+        finally:
+            if started is not None:
+                _record_call(name, time.perf_counter() - started, failed)
     return wrapper
 
 
 def log_exception(func):
     """
     Декоратор для логирования исключений в функции.
+    Логгер определяется один раз при декорировании: без исключения и профиля обёртка стоит одного try.
+    При включённом профиле вызов учитывается в профиле (количество, время, исключения).
     :param func: Функция для обёртывания
     :return: Обёрнутая функция
     """
+    logger = get_logger(func.__module__)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger(func.__module__)
+        if not _profile_enabled:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.exception("Исключение в %s: %s", func.__name__, e)
+                raise
+        started = time.perf_counter()
+        failed = False
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            logger.exception(f"Исключение в {func.__name__}: {str(e)}")
+            failed = True
+            logger.exception("Исключение в %s: %s", func.__name__, e)
             raise
+        finally:
+            _record_call(name, time.perf_counter() - started, failed)
     return wrapper
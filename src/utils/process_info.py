@@ -0,0 +1,60 @@
+import ctypes
+import os
+import platform
+import threading
+
+from utils.logger_config import get_logger
+
+logger = get_logger("utils.process_info")
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    """PROCESS_MEMORY_COUNTERS из psapi.h"""
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+class ProcessInfo:
+    """
+    Сведения о текущем процессе для монитора в строке состояния без сторонних зависимостей.
+    """
+
+    @staticmethod
+    def get_rss() -> int | None:
+        """
+        Объём физической памяти процесса (RSS, на Windows - рабочий набор).
+        :return: Размер в байтах или None, если получить не удалось
+        """
+        try:
+            system = platform.system()
+            if system == "Windows":
+                counters = _ProcessMemoryCounters()
+                counters.cb = ctypes.sizeof(counters)
+                handle = ctypes.windll.kernel32.GetCurrentProcess()
+                if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                    return counters.WorkingSetSize
+                return None
+            if system == "Linux":
+                with open("/proc/self/statm", encoding="ascii") as f:
+                    return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            # macOS: текущий RSS недоступен без сторонних библиотек, используется пиковый
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except Exception as e:
+            logger.debug("Не удалось получить объём памяти процесса: %s", e)
+            return None
+
+    @staticmethod
+    def get_thread_count() -> int:
+        """Количество потоков Python в процессе"""
+        return threading.active_count()
@@ -0,0 +1,211 @@
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from utils.logger_config import get_logger
+
+logger = get_logger("utils.stall_watchdog")
+
+
+class StallWatchdog:
+    """
+    Сторож задержек интерфейса.
+    Следит за обработчиками событий, отмеченными track_stalls (или watch), и за циклом событий Flet
+    (периодический heartbeat через page.run_task). Если обработчик или heartbeat не завершается дольше
+    порога, сторож снимает стеки всех потоков (sys._current_frames) до окончания задержки и записывает
+    их в папку logs/stalls в свёрнутом формате flame graph: "поток;функция (файл:строка);... количество".
+    """
+
+    def __init__(self):
+        self._threshold = 1.0
+        self._log_dir: Path | None = None
+        self._on_stall: Callable[[float, float, str], None] | None = None
+        self._sample_interval = 0.02
+        self._max_samples = 250
+        self._page = None
+        self._active: dict[int, tuple[str, int, float]] = {}  # токен -> (имя, поток, время начала)
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self._beat_sent: float | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.enabled = False
+
+    def configure(self, log_dir: str | Path, threshold: float = 1.0,
+                  on_stall: Optional[Callable[[float, float, str], None]] = None) -> None:
+        """
+        Настройка сторожа.
+        :param log_dir: Папка логов (отчёты записываются в подпапку stalls)
+        :param threshold: Порог задержки (в секундах)
+        :param on_stall: Callable(время начала, длительность, имя) при обнаружении и окончании задержки
+        """
+        self._log_dir = Path(log_dir) / "stalls"
+        self._threshold = threshold
+        self._on_stall = on_stall
+
+    def start(self, page=None) -> None:
+        """
+        Запуск потока сторожа.
+        :param page: Страница Flet для heartbeat цикла событий
+        """
+        self._page = page
+        if self._thread is not None:
+            return
+        self.enabled = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="StallWatchdog")
+        self._thread.start()
+        logger.info(f"Сторож задержек интерфейса запущен, порог {self._threshold:.1f} с")
+
+    def stop(self) -> None:
+        """Остановка потока сторожа"""
+        self.enabled = False
+        self._stop_event.set()
+        self._thread = None
+
+    @contextmanager
+    def watch(self, name: str):
+        """
+        Отметка обработчика события для отслеживания задержек.
+        :param name: Имя обработчика в отчёте
+        """
+        if not self.enabled:
+            yield
+            return
+        token = next(self._tokens)
+        started = time.monotonic()
+        self._active[token] = (name, threading.get_ident(), started)
+        try:
+            yield
+        finally:
+            del self._active[token]
+            duration = time.monotonic() - started
+            if duration >= self._threshold:
+                self._report(time.time() - duration, duration, name)
+
+    def _report(self, at: float, duration: float, name: str) -> None:
+        logger.warning(f"Задержка интерфейса {duration:.2f} с: {name}")
+        if self._on_stall is not None:
+            try:
+                self._on_stall(at, duration, name)
+            except Exception as e:
+                logger.error(f"Ошибка в обработчике задержки интерфейса: {e}")
+
+    async def _beat(self) -> None:
+        self._beat_sent = None
+
+    def _send_beat(self) -> None:
+        if self._page is None or self._beat_sent is not None:
+            return
+        self._beat_sent = time.monotonic()
+        try:
+            self._page.run_task(self._beat)
+        except Exception:
+            # Страница ещё не подключена или уже закрыта
+            self._beat_sent = None
+
+    def _loop(self) -> None:
+        poll = max(self._threshold / 4, 0.05)
+        reported: set = set()
+        while not self._stop_event.wait(poll):
+            self._send_beat()
+            now = time.monotonic()
+            stalled = [(token, name, thread_id, started)
+                       for token, (name, thread_id, started) in list(self._active.items())
+                       if now - started >= self._threshold and token not in reported]
+            beat_sent = self._beat_sent
+            if beat_sent is not None and now - beat_sent >= self._threshold and ("beat", beat_sent) not in reported:
+                stalled.append((("beat", beat_sent), "цикл событий Flet", None, beat_sent))
+            reported &= set(self._active) | {("beat", self._beat_sent)}
+            for token, name, thread_id, started in stalled:
+                reported.add(token)
+                self._sample(token, name, thread_id, started)
+
+    def _is_stalled(self, token) -> bool:
+        if isinstance(token, tuple):
+            return self._beat_sent == token[1]
+        return token in self._active
+
+    @staticmethod
+    def _collapse(frame, thread_name: str) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def _sample(self, token, name: str, thread_id: int | None, started: float) -> None:
+        """Снятие стеков всех потоков до окончания задержки и запись отчёта"""
+        stacks: Counter[str] = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        while samples < self._max_samples and self._is_stalled(token):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_id:
+                    continue
+                thread_name = names.get(ident, str(ident)).replace(";", ":").replace(" ", "_")
+                if ident == thread_id:
+                    thread_name += "[stalled]"
+                stacks[self._collapse(frame, thread_name)] += 1
+            samples += 1
+            time.sleep(self._sample_interval)
+
+        duration = time.monotonic() - started
+        path = self._write(name, stacks)
+        logger.warning(f"Задержка интерфейса {duration:.2f} с ({name}), снято стеков: {samples}"
+                       + (f", отчёт: {path}" if path else ""))
+        if thread_id is None and self._on_stall is not None:
+            # Для отмеченных обработчиков длительность сообщает watch по завершении
+            self._on_stall(time.time() - duration, duration, name)
+
+    def _write(self, name: str, stacks: Counter) -> Path | None:
+        if self._log_dir is None or not stacks:
+            return None
+        try:
+            self._log_dir.mkdir(parents=True, exist_ok=True)
+            safe_name = "".join(c if c.isalnum() else "_" for c in name)[:40]
+            path = self._log_dir / f"stall_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_name}.txt"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            return path
+        except OSError as e:
+            logger.error(f"Не удалось записать отчёт о задержке интерфейса: {e}")
+            return None
+
+
+_watchdog = StallWatchdog()
+
+
+def get_stall_watchdog() -> StallWatchdog:
+    """Общий сторож задержек интерфейса приложения"""
+    return _watchdog
+
+
+def track_stalls(func):
+    """
+    Декоратор обработчика события интерфейса: задержка дольше порога попадает в отчёт StallWatchdog.
+    Пока сторож не запущен, накладные расходы - одна проверка флага.
+    :param func: Обработчик
+    :return: Обёрнутый обработчик
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _watchdog.enabled:
+            return func(*args, **kwargs)
+        with _watchdog.watch(name):
+            return func(*args, **kwargs)
+    return wrapper
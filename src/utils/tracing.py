@@ -0,0 +1,125 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from utils.logger_config import get_logger
+
+logger = get_logger("utils.tracing")
+
+# Включение трассировки переменной окружения (действует с момента импорта, включая фазы импорта модулей)
+TRACE_ENV = "GEOOFFICE_TRACE"
+
+_enabled = os.getenv(TRACE_ENV, "").lower() in ("1", "true", "yes", "on")
+_events: deque[dict[str, Any]] = deque(maxlen=200_000)
+_origin = time.perf_counter()
+_pid = os.getpid()
+_null_span = nullcontext()
+
+
+def is_enabled() -> bool:
+    """Трассировка включена"""
+    return _enabled
+
+
+def enable() -> None:
+    """Включить трассировку (из настроек Diagnostics.trace)"""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        logger.info("Трассировка включена")
+
+
+@contextmanager
+def _record(name: str, args: dict[str, Any]):
+    thread = threading.current_thread()
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield
+    finally:
+        end_wall = time.perf_counter()
+        args["cpu_ms"] = round((time.thread_time() - start_cpu) * 1000, 3)
+        _events.append({
+            "name": name,
+            "ph": "X",
+            "ts": round((start_wall - _origin) * 1_000_000, 1),
+            "dur": round((end_wall - start_wall) * 1_000_000, 1),
+            "pid": _pid,
+            "tid": thread.ident,
+            "args": args,
+        })
+
+
+def span(name: str, **args: Any):
+    """
+    Интервал трассировки (вложенные интервалы одного потока отображаются друг под другом).
+    При выключенной трассировке возвращает общий пустой контекст.
+    :param name: Имя интервала
+    :param args: Дополнительные сведения для просмотрщика трассы
+    """
+    if not _enabled:
+        return _null_span
+    return _record(name, args)
+
+
+def traced(name: str | None = None):
+    """
+    Декоратор: вызов функции записывается интервалом трассировки.
+    При выключенной трассировке накладные расходы - одна проверка флага.
+    :param name: Имя интервала (по умолчанию - имя функции с классом)
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _record(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export(path: str | Path | None = None) -> Path | None:
+    """
+    Запись собранных интервалов в формате Chrome trace (chrome://tracing, Perfetto).
+    :param path: Файл трассы (по умолчанию logs/trace_<время>.json в хранилище приложения)
+    :return: Путь к файлу или None, если записывать нечего
+    """
+    if not _events:
+        return None
+    if path is None:
+        storage = os.getenv("FLET_APP_STORAGE_DATA")
+        if storage is None:
+            return None
+        path = Path(storage) / "logs" / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path = Path(path)
+    events = list(_events)
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    metadata = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+                for tid in {event["tid"] for event in events}]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    except OSError as e:
+        logger.error(f"Не удалось записать трассу: {e}")
+        return None
+    _events.clear()
+    logger.info(f"Трасса записана: {path} (интервалов: {len(events)})")
+    return path
+
+
+@atexit.register
+def _export_at_exit() -> None:
+    if _enabled:
+        export()
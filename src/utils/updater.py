@@ -1,44 +1,152 @@
+import re
+import time
+from pathlib import Path
+
 import requests
 import flet as ft
 import webbrowser
 
-from utils.logger_config import log_exception
+from utils.file_utils import FileUtils
+from utils.logger_config import get_logger, log_exception
+
+logger = get_logger("utils.updater")
 
 
 class Updater:
-    def __init__(self, repo: str, current_version: str):
+    """
+    Проверка обновлений через API релизов GitHub.
+    Проверка выполняется в фоновой задаче не чаще check_interval: последний известный релиз и его ETag
+    хранятся в файле кэша, повторный запрос отправляется с If-None-Match и при ответе 304 не передаёт данные.
+    Баннер показывается только если подтверждена более новая версия.
+    """
+    TASK_NAME = "update_check"
+    # Кэш считается устаревшим немного раньше check_interval, чтобы периодическая проверка,
+    # сработавшая чуть раньше истечения кэша, не откладывала запрос ещё на целый интервал
+    FRESHNESS_TOLERANCE = 0.05
+
+    def __init__(self, repo: str, current_version: str, cache_file: str | Path | None = None,
+                 api_url: str = "https://api.github.com", check_interval: float = 24 * 3600,
+                 timeout: float = 5.0):
         """
         :param repo: "owner/repo" (например "myorg/geooffice")
         :param current_version: текущая версия программы (строка)
+        :param cache_file: Файл кэша последнего известного релиза
+        :param api_url: Адрес API релизов (для проверки с тестовым сервером)
+        :param check_interval: Минимальный интервал между запросами к API (в секундах)
+        :param timeout: Таймаут запроса (в секундах)
         """
         self.repo = repo
         self.current_version = current_version
+        self._cache_file = Path(cache_file) if cache_file is not None else None
+        self._api_url = api_url.rstrip("/")
+        self._check_interval = check_interval
+        self._timeout = timeout
+        self._notified_version: str | None = None
+
+    @staticmethod
+    def parse_version(version: str) -> tuple[int, ...]:
+        """
+        Разбор версии в кортеж чисел для сравнения ("v1.10.2" -> (1, 10, 2)).
+        :param version: Строка версии
+        """
+        return tuple(int(part) for part in re.findall(r"\d+", version))
+
+    def is_newer(self, version: str) -> bool:
+        """Версия новее текущей"""
+        latest, current = self.parse_version(version), self.parse_version(self.current_version)
+        return bool(latest) and latest > current
+
+    def _load_cache(self) -> dict:
+        if self._cache_file is None or not self._cache_file.exists():
+            return {}
+        return FileUtils.load_json(self._cache_file) or {}
+
+    def _save_cache(self, cache: dict) -> None:
+        if self._cache_file is not None:
+            FileUtils.save_json(cache, self._cache_file)
+
+    def _next_check_at(self, cache: dict) -> float:
+        """Время, начиная с которого сохранённый релиз считается устаревшим (timestamp)"""
+        return cache.get("checked_at", 0) + self._check_interval * (1 - self.FRESHNESS_TOLERANCE)
 
     @log_exception
-    def check_update(self):
-        """Проверка обновлений через GitHub API"""
-        url = f"https://api.github.com/repos/{self.repo}/releases/latest"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        latest_version = data["tag_name"].lstrip("v")
-        assets = data.get("assets", [])
-        download_url = assets[0]["browser_download_url"] if assets else None
-
-        if latest_version != self.current_version:
+    def fetch_latest_release(self, force: bool = False) -> dict | None:
+        """
+        Последний релиз: из кэша, если он свежее check_interval, иначе условным запросом к API.
+        :param force: Запросить API независимо от времени последней проверки
+        :return: {"version": ..., "download_url": ...} или None, если релиз неизвестен
+        """
+        cache = self._load_cache()
+        release = cache.get("release")
+        if not force and release is not None and time.time() < self._next_check_at(cache):
+            logger.debug("Проверка обновлений пропущена: используется сохранённый релиз")
+            return release
+
+        url = f"{self._api_url}/repos/{self.repo}/releases/latest"
+        headers = {"Accept": "application/vnd.github+json"}
+        if release is not None and cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        try:
+            response = requests.get(url, headers=headers, timeout=self._timeout)
+        except requests.RequestException as e:
+            logger.warning(f"Не удалось проверить обновления: {e}")
+            return release
+
+        if response.status_code == 304:
+            logger.debug("Релиз не изменился (304 Not Modified)")
+        elif response.status_code == 200:
+            data = response.json()
+            assets = data.get("assets", [])
+            release = {
+                "version": data["tag_name"].lstrip("v"),
+                "download_url": assets[0]["browser_download_url"] if assets else data.get("html_url"),
+            }
+            cache["etag"] = response.headers.get("ETag")
+            cache["release"] = release
+        else:
+            logger.warning(f"Не удалось проверить обновления: HTTP {response.status_code}")
+            return release
+        cache["checked_at"] = time.time()
+        self._save_cache(cache)
+        return release
+
+    @log_exception
+    def check_update(self, force: bool = False) -> dict:
+        """Проверка наличия новой версии"""
+        release = self.fetch_latest_release(force)
+        if release is not None and self.is_newer(release["version"]):
             return {
                 "update_available": True,
-                "latest_version": latest_version,
-                "download_url": download_url,
+                "latest_version": release["version"],
+                "download_url": release["download_url"],
             }
         return {"update_available": False}
 
+    def start(self, page: ft.Page, background_service, initial_delay: float = 5.0) -> None:
+        """
+        Запуск периодической проверки обновлений в фоне (после показа первого экрана).
+        Первая проверка назначается на момент устаревания сохранённого релиза, поэтому проверки
+        идут с интервалом check_interval от времени последнего запроса к API, в том числе между запусками.
+        :param page: Страница Flet для баннера
+        :param background_service: BackgroundService
+        :param initial_delay: Минимальная задержка первой проверки после запуска (в секундах)
+        """
+        cache = self._load_cache()
+        if cache.get("release") is not None:
+            initial_delay = max(initial_delay, self._next_check_at(cache) - time.time())
+        background_service.start_periodic_task(self.TASK_NAME, lambda: self.show_update_dialog(page),
+                                               initial_delay=initial_delay,
+                                               interval=max(self._check_interval, 60.0), jitter=0)
+
     @log_exception
     def show_update_dialog(self, page: ft.Page):
-        """Показ баннера в Flet при наличии новой версии"""
+        """Показ баннера в Flet при наличии новой версии (один раз за сеанс для каждой версии)"""
         info = self.check_update()
 
-        if not info.get("update_available"):
+        if not info.get("update_available") or info["latest_version"] == self._notified_version:
             return  # обновлений нет
+        self._notified_version = info["latest_version"]
+        logger.info(f"Доступна новая версия {info['latest_version']}")
 
         def download(e):
             if info["download_url"]:
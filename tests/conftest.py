@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Модули приложения импортируются из src, журналы пишутся во временную папку
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("FLET_APP_STORAGE_DATA", tempfile.mkdtemp(prefix="geooffice_tests_"))
+os.environ.setdefault("GEOOFFICE_LOG_LEVEL", "WARNING")
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from services.background_service import BackgroundService, TaskPolicy
+
+
+def test_first_periodic_run_is_not_jittered():
+    background = BackgroundService(app=None)
+    started = threading.Event()
+    scheduled_at = time.monotonic()
+    background.start_periodic_task("periodic", started.set, initial_delay=0.2, interval=3600, jitter=0.5)
+    try:
+        # Отклонение в долю интервала (до 30 минут) не применяется к первому запуску
+        assert started.wait(2.0)
+        assert time.monotonic() - scheduled_at >= 0.2
+    finally:
+        background.stop_task("periodic")
+
+
+def test_delayed_task_waits_for_running_task_with_same_name():
+    background = BackgroundService(app=None)
+    release = threading.Event()
+    delayed = threading.Event()
+    background.start_task("save", lambda: release.wait(2.0), policy=TaskPolicy.REPLACE)
+    assert background.schedule_once("save", delayed.set, delay=0.05)
+
+    time.sleep(0.3)
+    assert not delayed.is_set()
+    release.set()
+    # Отложенный запуск выполняется после задачи с тем же именем, а не теряется
+    assert delayed.wait(2.0)
+
+
+def test_rejected_start_keeps_running_task_current():
+    background = BackgroundService(app=None)
+    release = threading.Event()
+    records = []
+
+    def task():
+        records.append(background.current_task())
+        release.wait(2.0)
+
+    assert background.start_task("dialog", task)
+    time.sleep(0.1)
+    assert not background.start_task("dialog", task, policy=TaskPolicy.REJECT)
+    # Результат выполняющейся задачи не отбрасывается из-за отклонённого повторного запуска
+    assert background.is_current(records[0])
+    release.set()
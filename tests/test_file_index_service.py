@@ -0,0 +1,25 @@
+from services.file_index_service import FileIndexService
+from services.project_stats_service import ProjectStatsService
+
+
+def test_nested_file_reaches_index(tmp_path):
+    nested = tmp_path / "projects" / "P1" / "Раздел" / "Чертежи" / "2024"
+    nested.mkdir(parents=True)
+    (nested / "план.dwg").write_bytes(b"x")
+    file_index = FileIndexService(tmp_path)
+    service = ProjectStatsService(tmp_path, file_index)
+    service.update_project(tmp_path / "projects", "P1")
+    assert file_index.search("схема") == []
+
+    (nested / "схема_сетей.dwg").write_bytes(b"y")
+    service.update_project(tmp_path / "projects", "P1")
+
+    found = file_index.search("схема")
+    assert [(project, name) for project, _, name, _, _ in found] == [("P1", "схема_сетей.dwg")]
+
+
+def test_search_by_extension(tmp_path):
+    file_index = FileIndexService(tmp_path)
+    file_index.replace_project("P1", [0, 0, 0.0], [("a/план.dwg", "план.dwg", ".dwg", 1, 1.0),
+                                                    ("a/план.pdf", "план.pdf", ".pdf", 1, 2.0)])
+    assert [name for _, _, name, _, _ in file_index.search("план .pdf")] == ["план.pdf"]
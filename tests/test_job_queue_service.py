@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from models.job_model import Job
+from services.job_queue_service import JobHandler, JobQueueService
+
+
+class FlakyHandler(JobHandler):
+    """Элемент "b" завершается ошибкой при первой попытке, элемент "c" приостанавливает задание"""
+    kind = "flaky"
+
+    def __init__(self):
+        self.attempts: dict[str, int] = {}
+        self.pause: threading.Event | None = None
+
+    def items(self, params):
+        return ["a", "b", "c"]
+
+    def process(self, params, item, stop_event):
+        self.attempts[item] = self.attempts.get(item, 0) + 1
+        if item == "b" and self.attempts[item] == 1:
+            raise OSError("папка недоступна")
+        if item == "c" and self.pause is not None:
+            self.pause.set()
+        return item.upper()
+
+
+def test_job_handler_is_abstract():
+    with pytest.raises(TypeError):
+        JobHandler()
+
+
+def test_failed_items_are_retried_on_resume(tmp_path):
+    service = JobQueueService(tmp_path)
+    handler = FlakyHandler()
+    service.register_handler(handler)
+    job_id = service.create_job(FlakyHandler.kind, "Проверка", {})
+
+    handler.pause = threading.Event()
+    assert service.run_job(job_id, lambda *args: None, handler.pause) is None
+    assert service.get_job(job_id).state == Job.PAUSED
+
+    handler.pause = None
+    result = service.run_job(job_id, lambda *args: None, threading.Event())
+    assert result == {"a": "A", "b": "B", "c": "C"}
+    assert handler.attempts == {"a": 1, "b": 2, "c": 2}
+    assert service.get_job(job_id).state == Job.DONE
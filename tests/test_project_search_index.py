@@ -0,0 +1,76 @@
+import pytest
+
+from services.project_search_index import ProjectSearchIndex, query_variants
+
+PROJECTS = [
+    (1, "2024-001", "Жилой дом в д. Сосны", "ООО Стройинвест", "ул. Лесная, 5", 3.0),
+    (2, "2023-045", "Реконструкция очистных сооружений", "ОАО Минскводоканал", "ул. Заводская, 1", 2.0),
+    (3, "2022-010", "Школа", "УКС Мингорисполкома", "пр. Мира, 12", 1.0),
+]
+
+
+@pytest.fixture
+def index():
+    index = ProjectSearchIndex()
+    index.build(PROJECTS)
+    return index
+
+
+def _ids(results):
+    return [item[0] for item in results]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("24", [1]),  # середина номера "2024-001"
+    ("45", [2]),  # середина номера "2023-045"
+    ("ос", [1]),  # середина слова "Сосны"
+    ("ст", [1, 2]),  # "Стройинвест", "очистных"
+    ("го", [3]),  # середина слова заказчика "Мингорисполкома"
+    ("ш", [3]),
+    ("5", [2]),
+])
+def test_short_query_matches_inside_words(index, query, expected):
+    assert sorted(_ids(index.search(query))) == expected
+
+
+def test_short_query_uses_keyboard_layout_variant(index):
+    # "jc" - "ос", набранное в английской раскладке
+    assert _ids(index.search("jc")) == [1]
+
+
+def test_short_query_prefers_original_variant(index):
+    index.update((4, "2021-002", "Склад", "IP Ivanov", "ул. Садовая", 9.0))
+    # "ш" в английской раскладке - "i": объекты с исходным запросом идут первыми
+    assert _ids(index.search("ш")) == [3, 4]
+
+
+def test_layout_typo_and_word_order(index):
+    assert _ids(index.search("cjcys"))[0] == 1
+    assert _ids(index.search("очистнх"))[0] == 2
+    assert _ids(index.search("сооружений реконструкция"))[0] == 2
+    assert _ids(index.search("rekonstruktsiya"))[0] == 2
+
+
+def test_empty_query_returns_all_newest_first(index):
+    assert _ids(index.search("")) == [1, 2, 3]
+
+
+def test_incremental_update_and_remove(index):
+    index.update((3, "2022-010", "Детский сад", "УКС", "пр. Мира, 12", 4.0))
+    assert _ids(index.search("школа")) == []
+    assert _ids(index.search("детский")) == [3]
+    index.remove(3)
+    assert _ids(index.search("детский")) == []
+    assert len(index) == 2
+
+
+def test_query_variants():
+    assert query_variants("cjcys") == ["cjcys", "сосны", "цйцыс"]
+    assert query_variants("сосны") == ["сосны", "cjcys", "sosny"]
+
+
+def test_ties_at_candidate_cutoff_prefer_recent_projects():
+    index = ProjectSearchIndex()
+    # Все объекты одинаково совпадают с запросом, поэтому в кандидаты должны попасть изменённые последними
+    index.build([(project_id, f"{project_id:04d}", "Склад", "", "", float(project_id)) for project_id in range(1, 501)])
+    assert _ids(index.search("склад", limit=5)) == [500, 499, 498, 497, 496]
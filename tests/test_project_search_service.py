@@ -0,0 +1,56 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from services.background_service import BackgroundService, TaskPolicy, TaskPriority
+from services.project_search_service import ProjectSearchService
+
+
+class SlowDatabase:
+    """База данных, чтение проектов которой занимает delay секунд"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_search_documents(self, modified_since=None):
+        time.sleep(self.delay)
+        return [(1, "24-001", "Жилой дом в д. Сосны", "ООО Строй", "ул. Лесная", 1.0),
+                (2, "24-002", "Школа", "ОАО Минск", "пр. Мира", 2.0)]
+
+    def count_projects(self):
+        return 2
+
+
+def test_new_keystrokes_restart_search_without_blocking():
+    search_service = ProjectSearchService(SimpleNamespace(database_service=SlowDatabase(0.3)), debounce=0.05)
+    background = BackgroundService(app=None)
+    delivered = []
+    finished = threading.Event()
+
+    def type_query(query: str) -> float:
+        """Запуск поиска так же, как строка поиска: новая задача заменяет выполняющуюся"""
+        stop_event = threading.Event()
+
+        def task():
+            results = search_service.search(query, stop_event)
+            if results is not None and not stop_event.is_set():
+                delivered.append((query, [item[0] for item in results]))
+                finished.set()
+
+        started = time.perf_counter()
+        background.start_task("project_search", task, priority=TaskPriority.INTERACTIVE,
+                              policy=TaskPolicy.REPLACE, stop_event=stop_event)
+        return time.perf_counter() - started
+
+    try:
+        durations = [type_query("с")]
+        time.sleep(0.1)  # первый поиск уже читает базу данных
+        for query in ("со", "сос", "сосн", "сосны"):
+            durations.append(type_query(query))
+
+        assert finished.wait(3.0)
+        time.sleep(0.2)  # отменённые поиски не должны доставить результат позже
+        assert max(durations) < 0.05
+        assert delivered == [("сосны", [1])]
+    finally:
+        background.shutdown()
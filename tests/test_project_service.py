@@ -0,0 +1,94 @@
+import threading
+from types import SimpleNamespace
+
+from models.project_manifest_model import MARKER_NAME
+from services.job_handlers import ProjectManifestJobHandler
+from services.job_queue_service import JobQueueService
+from services.project_service import ProjectService
+
+
+class FakeDatabase:
+    def __init__(self, *projects):
+        self.projects = list(projects)
+
+    def get_all_projects(self):
+        return self.projects
+
+    def get_project_from_id(self, project_id):
+        return next(project for project in self.projects if project.id == project_id)
+
+
+def _project(project_id, path):
+    return SimpleNamespace(id=project_id, path=path, number=f"24-{project_id:03d}", name="Объект",
+                           customer="Заказчик", status="active")
+
+
+def _legacy_project(root, path):
+    (root / path).mkdir(parents=True)
+    (root / path / MARKER_NAME).write_text("", encoding="utf-8")
+
+
+def _backfill(service, root, diff, tmp_path):
+    """Запись манифестов заданием очереди заданий, как по кнопке в баннере проверки различий"""
+    job_queue = JobQueueService(tmp_path)
+    job_queue.register_handler(ProjectManifestJobHandler(service))
+    job_id = job_queue.create_job(ProjectManifestJobHandler.kind, "Запись манифестов проектов",
+                                  {"projects_root": str(root), "projects": dict(diff["without_manifest"])})
+    return job_queue.run_job(job_id, lambda value, message=None: None, threading.Event())
+
+
+def test_diff_is_read_only_and_reports_legacy_markers(tmp_path):
+    root = tmp_path / "projects"
+    _legacy_project(root, "A")
+    service = ProjectService(FakeDatabase(_project(1, "A")), tmp_path)
+
+    assert service.diff_projects(root)["without_manifest"] == [["A", 1]]
+    assert (root / "A" / MARKER_NAME).read_text(encoding="utf-8") == ""
+
+
+def test_existing_project_gets_manifest_and_move_is_detected(tmp_path):
+    root = tmp_path / "projects"
+    _legacy_project(root, "2024/Объект 1")
+    service = ProjectService(FakeDatabase(_project(1, "2024/Объект 1")), tmp_path)
+
+    diff = service.diff_projects(root)
+    assert diff["in_files_and_database"] == ["2024/Объект 1"]
+    assert _backfill(service, root, diff, tmp_path) == 1
+    assert service.diff_projects(root)["without_manifest"] == []
+    manifest = service.read_manifest(root / "2024/Объект 1")
+    assert manifest.project_id == 1 and manifest.number == "24-001"
+
+    (root / "2025").mkdir()
+    (root / "2024/Объект 1").rename(root / "2025/Объект 1")
+    diff = service.diff_projects(root)
+    assert diff["moved"] == [["2024/Объект 1", "2025/Объект 1", 1]]
+    assert diff["only_in_files"] == [] and diff["only_in_database"] == []
+
+
+def test_uuid_pairs_move_when_project_id_is_stale(tmp_path):
+    root = tmp_path / "projects"
+    _legacy_project(root, "A")
+    service = ProjectService(FakeDatabase(_project(7, "A")), tmp_path)
+    _backfill(service, root, service.diff_projects(root), tmp_path)
+
+    # Маркер перенесённой папки ссылается на чужой id, проект определяется по uuid из реестра
+    manifest = service.read_manifest(root / "A")
+    manifest.project_id = 999
+    service.write_manifest(root / "A", manifest)
+    (root / "A").rename(root / "B")
+
+    assert service.diff_projects(root)["moved"] == [["A", "B", 7]]
+
+
+def test_copied_folder_is_not_a_move(tmp_path):
+    root = tmp_path / "projects"
+    _legacy_project(root, "A")
+    service = ProjectService(FakeDatabase(_project(1, "A"), _project(2, "Old")), tmp_path)
+    _backfill(service, root, service.diff_projects(root), tmp_path)
+    (root / "Copy").mkdir()
+    (root / "Copy" / MARKER_NAME).write_text((root / "A" / MARKER_NAME).read_text(encoding="utf-8"),
+                                             encoding="utf-8")
+
+    diff = service.diff_projects(root)
+    assert diff["moved"] == []
+    assert diff["only_in_files"] == ["Copy"]
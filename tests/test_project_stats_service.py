@@ -0,0 +1,42 @@
+from services.project_stats_service import ProjectStatsService
+
+
+def _make_project(root):
+    nested = root / "P1" / "Раздел" / "Чертежи" / "2024"
+    nested.mkdir(parents=True)
+    (nested / "план.dwg").write_bytes(b"x" * 10)
+    return nested
+
+
+def test_unchanged_project_is_not_rescanned(tmp_path):
+    _make_project(tmp_path / "projects")
+    service = ProjectStatsService(tmp_path / "storage")
+    assert service.update_project(tmp_path / "projects", "P1")
+    assert not service.update_project(tmp_path / "projects", "P1")
+
+
+def test_nested_file_changes_signature(tmp_path):
+    nested = _make_project(tmp_path / "projects")
+    service = ProjectStatsService(tmp_path / "storage")
+    service.update_project(tmp_path / "projects", "P1")
+
+    (nested / "разрез.dwg").write_bytes(b"y" * 5)
+
+    assert service.update_project(tmp_path / "projects", "P1")
+    stats = service.get("P1")
+    assert stats.files_count == 2
+    assert stats.total_size == 15
+
+
+def test_stale_project_is_rescanned(tmp_path):
+    _make_project(tmp_path / "projects")
+    service = ProjectStatsService(tmp_path / "storage", rescan_after=0)
+    service.update_project(tmp_path / "projects", "P1")
+    assert service.update_project(tmp_path / "projects", "P1")
+
+
+def test_force_rescans_unchanged_project(tmp_path):
+    _make_project(tmp_path / "projects")
+    service = ProjectStatsService(tmp_path / "storage")
+    service.update_project(tmp_path / "projects", "P1")
+    assert service.update_project(tmp_path / "projects", "P1", force=True)
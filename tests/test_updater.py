@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("flet")
+
+from utils.updater import Updater  # noqa: E402
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Тестовый сервер API релизов: последний релиз v2.0.0 с ETag"""
+    ETAG = '"release-2"'
+    requests: list[str | None] = []
+
+    def do_GET(self):
+        ReleaseHandler.requests.append(self.headers.get("If-None-Match"))
+        if self.path != "/repos/owner/repo/releases/latest":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"tag_name": "v2.0.0", "html_url": "https://example.com/release",
+                           "assets": []}).encode()
+        self.send_response(200)
+        self.send_header("ETag", self.ETAG)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    ReleaseHandler.requests = []
+    server = HTTPServer(("127.0.0.1", 0), ReleaseHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_release_is_cached_and_revalidated_with_etag(tmp_path, api_url):
+    updater = Updater("owner/repo", "1.0.0", cache_file=tmp_path / "update.json", api_url=api_url,
+                      check_interval=3600)
+
+    assert updater.check_update() == {"update_available": True, "latest_version": "2.0.0",
+                                      "download_url": "https://example.com/release"}
+    assert updater.check_update()["update_available"]
+    assert ReleaseHandler.requests == [None]  # второй вызов - из кэша
+
+    assert updater.fetch_latest_release(force=True)["version"] == "2.0.0"
+    assert ReleaseHandler.requests == [None, ReleaseHandler.ETAG]  # условный запрос, ответ 304
+
+
+def test_check_just_before_cache_expiry_is_not_skipped(tmp_path, api_url):
+    cache_file = tmp_path / "update.json"
+    updater = Updater("owner/repo", "1.0.0", cache_file=cache_file, api_url=api_url, check_interval=3600)
+    updater.fetch_latest_release()
+
+    # Периодическая проверка сработала за 10 секунд до истечения кэша
+    cache = json.loads(cache_file.read_text(encoding="utf-8"))
+    cache["checked_at"] = time.time() - 3600 + 10
+    cache_file.write_text(json.dumps(cache), encoding="utf-8")
+
+    updater.fetch_latest_release()
+    assert len(ReleaseHandler.requests) == 2
+
+
+def test_periodic_check_is_scheduled_without_jitter(tmp_path):
+    calls = []
+
+    class Background:
+        def start_periodic_task(self, task_name, task_func, **kwargs):
+            calls.append(kwargs)
+
+    Updater("owner/repo", "1.0.0", cache_file=tmp_path / "update.json", check_interval=3600).start(
+        page=None, background_service=Background())
+    assert calls == [{"initial_delay": 5.0, "interval": 3600, "jitter": 0}]